@@ -4,11 +4,11 @@ Aplicación principal de SIF-GPT - Sistema de PQRS
 """
 
 from flask import Flask, render_template, request, jsonify
-from src.services.pqrs_orchestrator_service import PQRSOrchestratorService
-from src.services.audio_service import AudioServiceFactory
+from src.services.service_container import services
 from src.controllers.historico_controller import historico_bp
 from src.controllers.pqrs_controller import pqrs_bp
 from src.utils.logger import logger
+from src.utils.json_provider import HistoricoJSONProvider
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -17,6 +17,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 app = Flask(__name__)
+app.json = HistoricoJSONProvider(app)
 
 # Configuración
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -26,17 +27,21 @@ app.secret_key = os.environ.get('SECRET_KEY', 'sif-gpt-secret-key-2024')
 app.register_blueprint(historico_bp, url_prefix='/api/historico')
 app.register_blueprint(pqrs_bp, url_prefix='/api/pqrs')
 
-# Inicializar servicios con API key por defecto para pruebas
-try:
-    openai_api_key = os.environ.get('OPENAI_API_KEY', 'test-key-for-development')
-    pqrs_orchestrator = PQRSOrchestratorService(openai_api_key)
-    # Crear AudioService usando la factory
-    audio_service = AudioServiceFactory.create_openai_service(openai_api_key)
+# Servicios compartidos con los blueprints: una sola instancia de cada uno por proceso
+pqrs_orchestrator = services.orchestrator
+if pqrs_orchestrator:
     logger.info("Servicios inicializados correctamente")
-except Exception as e:
-    logger.warning(f"No se pudo inicializar servicios: {e}")
-    pqrs_orchestrator = None
-    audio_service = None
+
+# Precarga del histórico y los prompts en segundo plano (ver /api/ready)
+services.warmup.start()
+
+@app.after_request
+def agregar_version_historico(response):
+    """Reporta en cada respuesta la versión del snapshot del histórico publicado"""
+    version = services.pqrs_repository.snapshot_version
+    if version:
+        response.headers['X-Historico-Version'] = version
+    return response
 
 @app.route('/')
 def index():
@@ -50,13 +55,26 @@ def health_check():
         "status": "healthy",
         "service": "SIF-GPT PQRS System",
         "version": "2.0.0",
+        "historico_version": services.pqrs_repository.snapshot_version,
         "features": {
             "historico": "✅ Disponible (Unificado)",
             "pqrs_orchestrator": "✅ Disponible" if pqrs_orchestrator else "❌ No disponible",
-            "audio_service": "✅ Disponible" if audio_service else "❌ No disponible"
+            "audio_service": "✅ Disponible" if pqrs_orchestrator and pqrs_orchestrator.audio_service else "❌ No disponible"
         }
     })
 
+@app.route('/api/ready')
+def readiness_check():
+    """Disponibilidad para recibir tráfico: 503 hasta que termina la precarga"""
+    # Las tareas que agotaron sus reintentos se vuelven a lanzar en segundo plano
+    services.warmup.reintentar_fallidas()
+    estado = services.warmup.estado()
+    return jsonify({
+        "ready": estado["listo"],
+        "historico_version": services.pqrs_repository.snapshot_version,
+        "warmup": estado
+    }), 200 if estado["listo"] else 503
+
 @app.route('/test/historico')
 def test_historico():
     """Endpoint de prueba para el servicio histórico unificado"""
@@ -216,10 +234,8 @@ def debug_pqrs():
         
         # Probar clasificación directamente
         from src.services.pqrs_classifier_service import PQRSClassifierService
-        from src.repositories.pqrs_repository import PromptRepository
         
-        prompt_repo = PromptRepository()
-        classifier = PQRSClassifierService(pqrs_orchestrator.openai_client, prompt_repo)
+        classifier = PQRSClassifierService(services.openai_client, services.prompt_repository)
         
         result = classifier.classify_pqrs(message)
         
@@ -239,38 +255,38 @@ def debug_pqrs():
 
 @app.route('/debug/excel')
 def debug_excel():
-    """Endpoint de debug para verificar datos del Excel"""
+    """Endpoint de debug para verificar datos del Excel (columnas originales resueltas como alias del histórico cargado)"""
     try:
-        import pandas as pd
+        from src.models.historico_columnas import COLUMNAS_EXCEL
         
-        # Cargar Excel directamente
-        df = pd.read_excel('input/historico/historico2.xlsx')
+        # Consulta al repositorio configurado (en memoria, particionado o SQLite)
+        repositorio = services.pqrs_repository
         
         # Buscar registros específicos
         test_radicados = ['202510292228', '202510291196', '202510293082']
+        encontrados = repositorio.get_historico_by_radicados(test_radicados)
         resultados = {}
         
         for radicado in test_radicados:
-            # Búsqueda en columna original
-            original_search = df[df['DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF'].astype(str) == radicado]
-            
-            if len(original_search) > 0:
-                row = original_search.iloc[0]
+            registro = encontrados.get(radicado)
+            if registro is not None:
+                # Los nombres originales del Excel apuntan a los campos normalizados
+                valor = lambda columna: getattr(registro, COLUMNAS_EXCEL[columna])
                 resultados[radicado] = {
                     "encontrado": True,
-                    "estado": row['ESTADO'],
-                    "asunto": str(row['ASUNTO DE LA PETICIÓN'])[:100],
-                    "solicitante": row['SOLICITANTE'],
-                    "unidad": row['UNIDAD'],
-                    "primer_nombre": row['PRIMERNOMBRE'],
-                    "primer_apellido": row['PRIMERAPELLIDO']
+                    "estado": valor('ESTADO'),
+                    "asunto": str(valor('ASUNTO DE LA PETICIÓN'))[:100],
+                    "solicitante": valor('SOLICITANTE'),
+                    "unidad": valor('UNIDAD'),
+                    "primer_nombre": valor('PRIMERNOMBRE'),
+                    "primer_apellido": valor('PRIMERAPELLIDO')
                 }
             else:
                 resultados[radicado] = {"encontrado": False}
         
         return jsonify({
             "success": True,
-            "total_registros": len(df),
+            "total_registros": repositorio.get_aggregates().total_registros,
             "resultados_debug": resultados
         })
         
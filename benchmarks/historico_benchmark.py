@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de carga del histórico de PQRS
+
+Uso:
+    python benchmarks/historico_benchmark.py carga [--excel RUTA] [--repeticiones N] [--formato arrow|parquet]
+    python benchmarks/historico_benchmark.py workers [--excel RUTA] [--workers N] [--formato arrow|parquet]
+    python benchmarks/historico_benchmark.py ingesta [--excel RUTA] [--lote N]
+    python benchmarks/historico_benchmark.py memoria [--excel RUTA]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.config import config
+from src.models.historico_columnas import COLUMNAS_EXCEL
+from src.repositories.historico_cache import HistoricoSnapshotCache
+from src.repositories.pqrs_repository import PQRSRepository
+
+
+def _crear_repositorio(excel_path: Path, cache_dir: Path, cache_habilitada: bool,
+                       formato: str = 'arrow') -> PQRSRepository:
+    """Crea un repositorio aislado apuntando al Excel y a una caché temporal"""
+    repositorio = PQRSRepository()
+    repositorio.historico_excel_path = excel_path
+    repositorio.snapshot_cache = HistoricoSnapshotCache(cache_dir, cache_habilitada, formato)
+    repositorio.watch_interval = 0
+    return repositorio
+
+
+def _pico_rss() -> float:
+    """Pico de RSS del proceso actual en MB"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _memoria_proceso() -> Dict[str, float]:
+    """RSS y PSS del proceso actual en MB (PSS reparte las páginas compartidas; solo Linux)"""
+    memoria = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for linea in f:
+                campo, _, valor = linea.partition(':')
+                if campo in ('Rss', 'Pss'):
+                    memoria[campo.lower()] = int(valor.split()[0]) / 1024
+    except OSError:
+        import resource
+        memoria['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return memoria
+
+
+def _medir(descripcion: str, funcion, repeticiones: int) -> float:
+    """Ejecuta la función varias veces y reporta el mejor tiempo"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    mejor = min(tiempos)
+    print(f"{descripcion:<40} mejor={mejor * 1000:10.1f} ms  promedio={sum(tiempos) / len(tiempos) * 1000:10.1f} ms")
+    return mejor
+
+
+def benchmark_carga(excel_path: Path, repeticiones: int, formato: str):
+    """Compara la carga desde Excel contra la carga desde el snapshot columnar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+
+        def cargar_excel():
+            _crear_repositorio(excel_path, cache_dir, False)._load_historico()
+
+        def cargar_snapshot():
+            repositorio = _crear_repositorio(excel_path, cache_dir, True, formato)
+            repositorio._load_historico()
+            assert repositorio._historico_source == 'snapshot'
+
+        # Construir el snapshot una vez antes de medir
+        _crear_repositorio(excel_path, cache_dir, True, formato)._load_historico()
+
+        tiempo_excel = _medir("Excel (read_excel + normalización)", cargar_excel, repeticiones)
+        tiempo_snapshot = _medir(f"Snapshot columnar ({formato})", cargar_snapshot, repeticiones)
+        print(f"Aceleración: {tiempo_excel / tiempo_snapshot:.1f}x")
+
+
+def _worker_carga(excel_path: Path, cache_dir: Path, formato: str, resultados):
+    """Carga el histórico en un proceso aparte, recorre las columnas de texto y reporta su memoria"""
+    base = _memoria_proceso()
+    df = _crear_repositorio(excel_path, cache_dir, True, formato)._load_historico()
+    for columna in ('texto_pqrs', 'seguimiento', 'observacion'):
+        if columna in df.columns:
+            df[columna].str.len().sum()
+    memoria = _memoria_proceso()
+    resultados.put({campo: memoria[campo] - base.get(campo, 0) for campo in memoria})
+
+
+def benchmark_workers(excel_path: Path, workers: int, formato: str):
+    """Memoria que agrega cada worker al cargar el mismo snapshot (simula un servidor WSGI multiproceso)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        _crear_repositorio(excel_path, cache_dir, True, formato)._load_historico()
+
+        contexto = multiprocessing.get_context('spawn')
+        resultados = contexto.Queue()
+        procesos = [contexto.Process(target=_worker_carga, args=(excel_path, cache_dir, formato, resultados))
+                    for _ in range(workers)]
+        for proceso in procesos:
+            proceso.start()
+        medidas = [resultados.get() for _ in procesos]
+        for proceso in procesos:
+            proceso.join()
+
+        for i, memoria in enumerate(medidas, 1):
+            detalle = '  '.join(f"{campo.upper()}={valor:8.1f} MB" for campo, valor in sorted(memoria.items(), reverse=True))
+            print(f"Worker {i} ({formato}): {detalle}")
+
+
+def _worker_ingesta(excel_path: Path, streaming: bool, lote: int, resultados):
+    """Construye el snapshot desde Excel en un proceso nuevo y reporta tiempo y pico de RSS"""
+    base = _pico_rss()
+    with tempfile.TemporaryDirectory() as tmp:
+        repositorio = _crear_repositorio(excel_path, Path(tmp), True)
+        repositorio.excel_streaming = streaming
+        repositorio.excel_chunk_rows = lote
+        inicio = time.perf_counter()
+        df = repositorio._load_historico()
+        resultados.put({'segundos': time.perf_counter() - inicio, 'registros': len(df),
+                        'pico': _pico_rss(), 'base': base, 'final': _memoria_proceso().get('rss', 0)})
+
+
+def benchmark_ingesta(excel_path: Path, lote: int):
+    """Pico de memoria al construir el snapshot: read_excel completo contra lectura por lotes"""
+    contexto = multiprocessing.get_context('spawn')
+    for descripcion, streaming in (("read_excel completo", False), (f"Streaming por lotes ({lote} filas)", True)):
+        resultados = contexto.Queue()
+        proceso = contexto.Process(target=_worker_ingesta, args=(excel_path, streaming, lote, resultados))
+        proceso.start()
+        medida = resultados.get()
+        proceso.join()
+        print(f"{descripcion:<40} {medida['segundos'] * 1000:10.1f} ms  registros={medida['registros']}  "
+              f"pico RSS={medida['pico']:8.1f} MB (base {medida['base']:.1f} MB, final {medida['final']:.1f} MB)")
+
+
+def benchmark_memoria(excel_path: Path):
+    """
+    Memoria del histórico normalizado: columnas renombradas con alias contra
+    el esquema anterior, que guardaba además cada columna original del Excel
+    (con sus tipos crudos) y una copia de nombre_completo.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        repositorio = _crear_repositorio(excel_path, Path(tmp), True)
+        df = repositorio._load_historico()
+        ahora = df.memory_usage(deep=True).sum()
+
+        # Columnas que el esquema anterior duplicaba, con el tipo con que se guardaban
+        encabezado = set(pd.read_excel(excel_path, nrows=0).columns.astype(str))
+        fuente = HistoricoSnapshotCache.prepare_frame(repositorio._read_source_frame())
+        duplicadas = [nuevo for original, nuevo in COLUMNAS_EXCEL.items()
+                      if original in encabezado and nuevo in fuente.columns]
+        antes = ahora + fuente[duplicadas].memory_usage(deep=True, index=False).sum()
+        if 'nombre' in df.columns:
+            antes += df['nombre'].memory_usage(deep=True, index=False)
+            duplicadas.append('nombre_completo')
+
+        megas = 1024 * 1024
+        print(f"Registros: {len(df)}")
+        print(f"{'Columnas duplicadas (antes)':<40} {len(df.columns) + len(duplicadas):6d} columnas  {antes / megas:10.1f} MB")
+        print(f"{'Renombradas con alias (ahora)':<40} {len(df.columns):6d} columnas  {ahora / megas:10.1f} MB")
+        print(f"Reducción: {(1 - ahora / antes) * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del histórico de PQRS")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    carga = subparsers.add_parser('carga', help="Tiempo de carga Excel vs snapshot columnar")
+    carga.add_argument('--excel', type=Path, default=config.HISTORICO_EXCEL)
+    carga.add_argument('--repeticiones', type=int, default=3)
+    carga.add_argument('--formato', choices=sorted(HistoricoSnapshotCache.FORMATS), default='arrow')
+
+    workers = subparsers.add_parser('workers', help="Memoria por worker cargando el mismo snapshot")
+    workers.add_argument('--excel', type=Path, default=config.HISTORICO_EXCEL)
+    workers.add_argument('--workers', type=int, default=4)
+    workers.add_argument('--formato', choices=sorted(HistoricoSnapshotCache.FORMATS), default='arrow')
+
+    ingesta = subparsers.add_parser('ingesta', help="Pico de RSS al construir el snapshot desde Excel")
+    ingesta.add_argument('--excel', type=Path, default=config.HISTORICO_EXCEL)
+    ingesta.add_argument('--lote', type=int, default=config.HISTORICO_EXCEL_CHUNK_ROWS)
+
+    memoria = subparsers.add_parser('memoria', help="Memoria del histórico con alias de columnas vs columnas duplicadas")
+    memoria.add_argument('--excel', type=Path, default=config.HISTORICO_EXCEL)
+
+    args = parser.parse_args()
+    if args.comando == 'carga':
+        benchmark_carga(args.excel, args.repeticiones, args.formato)
+    elif args.comando == 'workers':
+        benchmark_workers(args.excel, args.workers, args.formato)
+    elif args.comando == 'ingesta':
+        benchmark_ingesta(args.excel, args.lote)
+    elif args.comando == 'memoria':
+        benchmark_memoria(args.excel)
+
+
+if __name__ == '__main__':
+    main()
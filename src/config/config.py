@@ -30,6 +30,54 @@ class Config:
     # Configuración de archivos
     HISTORICO_EXCEL = HISTORICO_DIR / 'historico2.xlsx'
     
+    # Configuración de la caché columnar del histórico (snapshot normalizado)
+    HISTORICO_CACHE_ENABLED = os.getenv('HISTORICO_CACHE_ENABLED', 'True').lower() == 'true'
+    HISTORICO_CACHE_DIR = Path(os.getenv('HISTORICO_CACHE_DIR', str(HISTORICO_DIR / 'cache')))
+    # Formato del snapshot: 'arrow' (IPC mapeado en memoria y compartido entre procesos) o 'parquet' (comprimido)
+    HISTORICO_CACHE_FORMAT = os.getenv('HISTORICO_CACHE_FORMAT', 'arrow').lower()
+    
+    # Lectura del Excel por lotes de filas (openpyxl en modo solo lectura) para acotar la memoria de la carga
+    HISTORICO_EXCEL_STREAMING = os.getenv('HISTORICO_EXCEL_STREAMING', 'True').lower() == 'true'
+    HISTORICO_EXCEL_CHUNK_ROWS = int(os.getenv('HISTORICO_EXCEL_CHUNK_ROWS', '5000'))
+    
+    # Segundos entre revisiones del Excel para recargar el histórico en caliente (0 deshabilita)
+    HISTORICO_WATCH_INTERVAL = float(os.getenv('HISTORICO_WATCH_INTERVAL', '30'))
+    
+    # Recargas incrementales: solo se aplican las filas nuevas y los cambios de estado/seguimiento
+    HISTORICO_INGESTA_INCREMENTAL = os.getenv('HISTORICO_INGESTA_INCREMENTAL', 'True').lower() == 'true'
+    
+    # Backend de almacenamiento del histórico: 'pandas' (en memoria), 'sqlite' (archivo local indexado)
+    # o 'particionado' (archivos Arrow por mes de radicación, cargados bajo demanda)
+    HISTORICO_BACKEND = os.getenv('HISTORICO_BACKEND', 'pandas').lower()
+    HISTORICO_SQLITE_PATH = Path(os.getenv('HISTORICO_SQLITE_PATH', str(HISTORICO_CACHE_DIR / 'historico.sqlite3')))
+    HISTORICO_PARTICIONES_DIR = Path(os.getenv('HISTORICO_PARTICIONES_DIR', str(HISTORICO_CACHE_DIR / 'particiones')))
+    # Combinaciones de particiones que se conservan cargadas (con sus índices) en memoria
+    HISTORICO_PARTICIONES_MAX_CARGADAS = int(os.getenv('HISTORICO_PARTICIONES_MAX_CARGADAS', '8'))
+    
+    # Paginación por cursor de las búsquedas del histórico (registros por página y máximo permitido)
+    HISTORICO_TAMANO_PAGINA = int(os.getenv('HISTORICO_TAMANO_PAGINA', '100'))
+    HISTORICO_TAMANO_PAGINA_MAX = int(os.getenv('HISTORICO_TAMANO_PAGINA_MAX', '1000'))
+    
+    # Caché de resultados de consultas del histórico (entradas máximas, 0 deshabilita; vigencia en segundos)
+    HISTORICO_CACHE_CONSULTAS_MAX = int(os.getenv('HISTORICO_CACHE_CONSULTAS_MAX', '256'))
+    HISTORICO_CACHE_CONSULTAS_TTL = float(os.getenv('HISTORICO_CACHE_CONSULTAS_TTL', '300'))
+    
+    # Precarga al arrancar (histórico, índices y prompts) antes de reportar el worker listo en /api/ready
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'True').lower() == 'true'
+    # Índices del histórico que se construyen en paralelo durante la precarga
+    WARMUP_WORKERS = int(os.getenv('WARMUP_WORKERS', '4'))
+    # Reintentos de una tarea de precarga fallida y segundos antes del primero (se duplican en cada uno)
+    WARMUP_REINTENTOS = int(os.getenv('WARMUP_REINTENTOS', '2'))
+    WARMUP_ESPERA_REINTENTO = float(os.getenv('WARMUP_ESPERA_REINTENTO', '2'))
+    
+    # Formatos explícitos para columnas fecha_* que llegan como texto (se prueban en orden)
+    HISTORICO_DATE_FORMATS = [
+        formato.strip() for formato in os.getenv(
+            'HISTORICO_DATE_FORMATS',
+            '%Y-%m-%d %H:%M:%S;%Y-%m-%d;%d/%m/%Y %H:%M:%S;%d/%m/%Y %H:%M;%d/%m/%Y'
+        ).split(';') if formato.strip()
+    ]
+    
     # Configuración de prompts
     PROMPT_FILES = {
         'estructura_json': PROMPTS_DIR / 'estructura_json.txt',
@@ -5,8 +5,8 @@ Combina funcionalidades básicas y avanzadas en un solo controlador
 """
 
 from flask import Blueprint, request, jsonify
-from src.services.historico_query_service import HistoricoQueryService
-from src.repositories.pqrs_repository import PQRSRepository
+from src.models.historico_rows import CAMPOS
+from src.services.service_container import services
 from src.utils.logger import logger
 import json
 import pandas as pd
@@ -15,9 +15,7 @@ from datetime import datetime
 # Crear blueprint para consultas históricas unificado
 historico_bp = Blueprint('historico', __name__)
 
-# Inicializar servicios
-pqrs_repository = PQRSRepository()
-historico_service = HistoricoQueryService(pqrs_repository)
+# El servicio y el repositorio del histórico son los compartidos del proceso (ver ServiceContainer)
 
 @historico_bp.route('/consulta', methods=['POST'])
 def consultar_historico():
@@ -44,11 +42,11 @@ def consultar_historico():
         
         # Realizar consulta
         if tipo_consulta == 'estadisticas':
-            resultado = historico_service.consultar_estadisticas()
+            resultado = services.historico_service.consultar_estadisticas()
         elif tipo_consulta == 'ayuda':
-            resultado = historico_service.obtener_ayuda_consultas()
+            resultado = services.historico_service.obtener_ayuda_consultas()
         else:
-            resultado = historico_service.consulta_inteligente(consulta)
+            resultado = services.historico_service.consulta_inteligente(consulta, data.get('fields'))
         
         return jsonify(resultado)
         
@@ -64,7 +62,7 @@ def consultar_historico():
 def consultar_por_radicado(numero_radicado):
     """Endpoint para consultar PQRS por número de radicado"""
     try:
-        resultado = historico_service.consultar_por_radicado(numero_radicado)
+        resultado = services.historico_service.consultar_por_radicado(numero_radicado, request.args.get('fields'))
         return jsonify(resultado)
         
     except Exception as e:
@@ -89,7 +87,8 @@ def buscar_por_texto():
             }), 400
         
         texto = data['texto']
-        resultado = historico_service.buscar_por_texto(texto)
+        resultado = services.historico_service.buscar_por_texto(texto, data.get('tamano_pagina'), data.get('cursor'),
+                                                       data.get('fields'))
         return jsonify(resultado)
         
     except Exception as e:
@@ -114,7 +113,8 @@ def buscar_por_nombre():
             }), 400
         
         nombre = data['nombre']
-        resultado = historico_service.buscar_por_nombre(nombre)
+        resultado = services.historico_service.buscar_por_nombre(nombre, data.get('tamano_pagina'), data.get('cursor'),
+                                                        data.get('fields'))
         return jsonify(resultado)
         
     except Exception as e:
@@ -141,12 +141,12 @@ def consulta_avanzada():
         filtros_validos = {
             'texto', 'radicado', 'nombre', 'fecha_inicio', 'fecha_fin',
             'clasificacion', 'estado', 'unidad', 'barrio', 'limit',
-            'ordenar_por', 'orden'
+            'ordenar_por', 'orden', 'tamano_pagina', 'cursor', 'fields'
         }
         
         filtros = {k: v for k, v in data.items() if k in filtros_validos and v}
         
-        if not filtros:
+        if not set(filtros) - {'fields'}:
             return jsonify({
                 "success": False,
                 "error": "Filtros requeridos",
@@ -154,7 +154,7 @@ def consulta_avanzada():
             }), 400
         
         # Ejecutar consulta avanzada
-        resultado = historico_service.consulta_avanzada(filtros)
+        resultado = services.historico_service.consulta_avanzada(filtros)
         
         return jsonify(resultado)
         
@@ -186,7 +186,7 @@ def obtener_sugerencias():
                 "mensaje": "El texto debe tener al menos 2 caracteres"
             }), 400
         
-        sugerencias = historico_service.obtener_sugerencias_busqueda(texto)
+        sugerencias = services.historico_service.obtener_sugerencias_busqueda(texto)
         
         return jsonify({
             "success": True,
@@ -229,6 +229,14 @@ def obtener_filtros_disponibles():
                 "limit": "Límite de resultados (número)",
                 "ordenar_por": "Campo para ordenar resultados",
                 "orden": "Orden de resultados ('asc' o 'desc')"
+            },
+            "paginacion": {
+                "tamano_pagina": "Registros por página (búsquedas por texto y nombre; en la consulta avanzada reemplaza a 'limit')",
+                "cursor": "Valor 'paginacion.cursor_siguiente' de la respuesta anterior para obtener la página siguiente"
+            },
+            "proyeccion": {
+                "fields": "Campos de cada registro a devolver, como lista o separados por comas (por defecto todos)",
+                "campos_disponibles": list(CAMPOS)
             }
         }
         
@@ -250,7 +258,7 @@ def obtener_filtros_disponibles():
 def obtener_estadisticas():
     """Endpoint para obtener estadísticas del histórico"""
     try:
-        resultado = historico_service.consultar_estadisticas()
+        resultado = services.historico_service.consultar_estadisticas()
         return jsonify(resultado)
         
     except Exception as e:
@@ -265,7 +273,7 @@ def obtener_estadisticas():
 def obtener_ayuda():
     """Endpoint para obtener ayuda sobre el uso del servicio"""
     try:
-        resultado = historico_service.obtener_ayuda_consultas()
+        resultado = services.historico_service.obtener_ayuda_consultas()
         return jsonify(resultado)
         
     except Exception as e:
@@ -276,12 +284,33 @@ def obtener_ayuda():
             "mensaje": "Error interno del servidor"
         }), 500
 
+@historico_bp.route('/metricas', methods=['GET'])
+def obtener_metricas():
+    """Endpoint con los contadores de la caché de consultas (JSON o texto de Prometheus con ?formato=prometheus)"""
+    try:
+        if request.args.get('formato', '').lower() == 'prometheus':
+            return services.historico_service.cache.prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        
+        return jsonify({
+            "success": True,
+            "cache_consultas": services.historico_service.metricas_cache(),
+            "mensaje": "Métricas de la caché de consultas"
+        })
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "mensaje": "Error interno del servidor"
+        }), 500
+
 @historico_bp.route('/resumen', methods=['GET'])
 def obtener_resumen():
     """Endpoint para obtener un resumen rápido del histórico"""
     try:
         # Obtener estadísticas básicas
-        stats = historico_service.consultar_estadisticas()
+        stats = services.historico_service.consultar_estadisticas()
         
         if stats['success']:
             datos = stats['datos']
@@ -1,25 +1,18 @@
 from flask import Blueprint, request, jsonify
 from typing import Dict, Any
 from src.services.pqrs_orchestrator_service import PQRSOrchestratorService
+from src.services.service_container import services
 from src.utils.logger import logger
-from src.config.config import config
 
 # Crear blueprint para PQRS
 pqrs_bp = Blueprint('pqrs', __name__)
 
-# Inicializar servicios
-try:
-    openai_api_key = config.OPENAI_API_KEY or 'test-key-for-development'
-    pqrs_orchestrator = PQRSOrchestratorService(openai_api_key)
-    # Solo log esencial para controladores
-    pass  # logger.info("Controlador de PQRS inicializado exitosamente")
-except Exception as e:
-    logger.error(f"Error al inicializar controlador de PQRS: {e}")
-    pqrs_orchestrator = None
+# El orquestador es el compartido del proceso (ver ServiceContainer), creado en la primera petición
 
 @pqrs_bp.route('/process-text', methods=['POST'])
 def process_text():
     """Endpoint para procesar PQRS desde texto"""
+    pqrs_orchestrator = services.orchestrator
     if not pqrs_orchestrator:
         return jsonify({
             "success": False,
@@ -65,6 +58,7 @@ def process_text():
 @pqrs_bp.route('/process-audio', methods=['POST'])
 def process_audio():
     """Endpoint para procesar PQRS desde audio"""
+    pqrs_orchestrator = services.orchestrator
     if not pqrs_orchestrator:
         return jsonify({
             "success": False,
@@ -133,6 +127,7 @@ def process_audio():
 @pqrs_bp.route('/transcribe-audio', methods=['POST'])
 def transcribe_audio_only():
     """Endpoint para transcribir solo audio (sin procesar PQRS)"""
+    pqrs_orchestrator = services.orchestrator
     if not pqrs_orchestrator:
         return jsonify({
             "success": False,
@@ -197,6 +192,7 @@ def transcribe_audio_only():
 @pqrs_bp.route('/status', methods=['GET'])
 def get_status():
     """Endpoint para obtener estado del sistema"""
+    pqrs_orchestrator = services.orchestrator
     if not pqrs_orchestrator:
         return jsonify({
             "success": False,
@@ -205,6 +201,7 @@ def get_status():
     
     try:
         status = pqrs_orchestrator.get_system_status()
+        status["contenedor"] = services.estado()
         return jsonify({
             "success": True,
             "status": status
@@ -0,0 +1,14 @@
+"""
+Índices en memoria del histórico del sistema TUNRAG
+"""
+
+from .bitmap_index import BitmapIndex
+from .completion_index import CompletionIndex
+from .date_index import DateIndex
+from .name_index import NameIndex, clave_fonetica
+from .radicado_index import RadicadoIndex, normalizar_radicado
+from .text_index import TextIndex
+from .text_utils import analyze, fold_text
+from .trigram_index import TrigramIndex
+
+__all__ = ['BitmapIndex', 'CompletionIndex', 'DateIndex', 'NameIndex', 'clave_fonetica', 'RadicadoIndex', 'normalizar_radicado', 'TextIndex', 'TrigramIndex', 'analyze', 'fold_text']
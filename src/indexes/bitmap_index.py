@@ -0,0 +1,137 @@
+"""
+Índice de bitmaps por valor para columnas categóricas del histórico
+
+Para cada categoría de una columna codificada (clasificación, estado,
+unidad, barrio...) guarda un bitmap empaquetado con las filas que la
+contienen. Un filtro por subcadena se resuelve sobre las categorías (pocas)
+y la combinación de varios filtros es un AND bit a bit de bitmaps.
+
+Los bitmaps densos ocupan una fila de bits por categoría, así que solo se
+guardan para columnas de pocas categorías; con más, las consultas comparan
+los códigos de la columna (``codes == k``), que ya están en memoria.
+"""
+
+import re
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Por encima de esta cantidad de categorías se usan los códigos en lugar de bitmaps
+MAX_BITMAP_CATEGORIES = 32
+
+
+class BitmapIndex:
+    """Bitmaps empaquetados por categoría de una columna categórica"""
+
+    def __init__(self, series: pd.Series):
+        """Construye el índice desde una serie de dtype category"""
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        self.total_rows = len(series)
+        self.categories = [str(c) for c in series.cat.categories]
+        self.codes = series.cat.codes.to_numpy()
+        self.counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.categories)).astype(np.int64)
+
+        self._bitmaps: Optional[np.ndarray] = None
+        if len(self.categories) <= MAX_BITMAP_CATEGORIES:
+            self._bitmaps = np.zeros((len(self.categories), (self.total_rows + 7) // 8), dtype=np.uint8)
+            for category_id in range(len(self.categories)):
+                self._bitmaps[category_id] = np.packbits(self.codes == category_id)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str) -> 'BitmapIndex':
+        return cls(df[column])
+
+    def updated(self, series: pd.Series, posiciones: np.ndarray) -> Optional['BitmapIndex']:
+        """
+        Índice nuevo tras cambiar las filas indicadas y agregar filas al final.
+
+        Args:
+            series: columna completa ya actualizada; sus categorías deben extender
+                las actuales sin reordenarlas (los códigos existentes se conservan)
+            posiciones: filas existentes cuyo valor cambió
+
+        Returns:
+            El índice actualizado, o None si las categorías no son compatibles
+        """
+        categorias = [str(c) for c in series.cat.categories]
+        if categorias[:len(self.categories)] != self.categories:
+            return None
+
+        resultado = BitmapIndex.__new__(BitmapIndex)
+        resultado.total_rows = len(series)
+        resultado.categories = categorias
+        resultado.codes = series.cat.codes.to_numpy()
+
+        agregadas = np.arange(self.total_rows, resultado.total_rows)
+        anteriores = self.codes[posiciones]
+        nuevos = resultado.codes[np.concatenate([posiciones, agregadas])]
+        counts = np.zeros(len(categorias), dtype=np.int64)
+        counts[:len(self.counts)] = self.counts
+        np.subtract.at(counts, anteriores[anteriores >= 0], 1)
+        np.add.at(counts, nuevos[nuevos >= 0], 1)
+        resultado.counts = counts
+
+        resultado._bitmaps = None
+        if self._bitmaps is not None and len(categorias) <= MAX_BITMAP_CATEGORIES:
+            bitmaps = np.zeros((len(categorias), (resultado.total_rows + 7) // 8), dtype=np.uint8)
+            bitmaps[:self._bitmaps.shape[0], :self._bitmaps.shape[1]] = self._bitmaps
+            # Apagar el bit de la categoría anterior y encender el de la nueva (orden de bits de packbits)
+            validas = anteriores >= 0
+            np.bitwise_and.at(bitmaps, (anteriores[validas], posiciones[validas] >> 3),
+                              ~(np.uint8(0x80) >> (posiciones[validas] & 7).astype(np.uint8)))
+            cambiadas = np.concatenate([posiciones, agregadas])
+            validas = nuevos >= 0
+            np.bitwise_or.at(bitmaps, (nuevos[validas], cambiadas[validas] >> 3),
+                             np.uint8(0x80) >> (cambiadas[validas] & 7).astype(np.uint8))
+            resultado._bitmaps = bitmaps
+        return resultado
+
+    def match_categories(self, patron: str) -> np.ndarray:
+        """Ids de las categorías que contienen el patrón (regex, sin distinguir mayúsculas)"""
+        regex = re.compile(patron, re.IGNORECASE)
+        return np.asarray([i for i, c in enumerate(self.categories) if regex.search(c)], dtype=np.int64)
+
+    def estimate(self, patron: str) -> int:
+        """Cantidad exacta de filas que coinciden con el patrón"""
+        return int(self.counts[self.match_categories(patron)].sum())
+
+    @staticmethod
+    def _coinciden(codes: np.ndarray, category_ids: np.ndarray) -> np.ndarray:
+        """Máscara de los códigos que pertenecen a alguna de las categorías"""
+        if len(category_ids) == 1:
+            return codes == category_ids[0]
+        return np.isin(codes, category_ids)
+
+    def positions(self, category_ids: np.ndarray) -> np.ndarray:
+        """Posiciones ordenadas de las filas con alguna de las categorías"""
+        if self._bitmaps is None:
+            return np.flatnonzero(self._coinciden(self.codes, category_ids))
+        return np.flatnonzero(self.unpack(self.bitmap(category_ids)))
+
+    def contains(self, category_ids: np.ndarray, posiciones: np.ndarray) -> np.ndarray:
+        """Máscara booleana de las filas indicadas que tienen alguna de las categorías"""
+        if self._bitmaps is None:
+            return self._coinciden(self.codes[posiciones], category_ids)
+        return self.test(self.bitmap(category_ids), posiciones)
+
+    def bitmap(self, category_ids: np.ndarray) -> np.ndarray:
+        """Bitmap empaquetado (OR) de las filas con alguna de las categorías"""
+        if self._bitmaps is None:
+            return np.packbits(self._coinciden(self.codes, category_ids))
+        if len(category_ids) == 0:
+            return np.zeros(self._bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self._bitmaps[category_ids], axis=0)
+
+    def bitmap_for(self, patron: str) -> np.ndarray:
+        """Bitmap empaquetado de las filas cuyo valor contiene el patrón"""
+        return self.bitmap(self.match_categories(patron))
+
+    def unpack(self, bitmap: np.ndarray) -> np.ndarray:
+        """Convierte un bitmap empaquetado en máscara booleana por fila"""
+        return np.unpackbits(bitmap, count=self.total_rows).astype(bool)
+
+    @staticmethod
+    def test(bitmap: np.ndarray, posiciones: np.ndarray) -> np.ndarray:
+        """Máscara booleana del bitmap solo para las filas indicadas (sin desempaquetarlo completo)"""
+        return (bitmap[posiciones >> 3] & (np.uint8(0x80) >> (posiciones & 7).astype(np.uint8))) != 0
@@ -0,0 +1,137 @@
+"""
+Índice de autocompletado para sugerencias de búsqueda
+
+Mantiene un arreglo ordenado de llaves (el inicio de cada palabra de cada
+valor, sin tildes ni mayúsculas) y responde por búsqueda binaria. Para los
+prefijos con muchas coincidencias, los k valores más frecuentes se
+precalculan al construir el índice, de modo que cualquier consulta revisa a
+lo sumo unas cientos de llaves.
+"""
+
+import bisect
+import heapq
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+import numpy as np
+import pandas as pd
+from src.indexes.text_utils import STOPWORDS, fold_text
+
+DEFAULT_COMPLETION_COLUMNS = ('nombre', 'clasificacion', 'unidad', 'barrio')
+DEFAULT_TEXT_COLUMN = 'texto_pqrs'
+
+_PALABRA_RE = re.compile(r"\w+")
+
+
+class CompletionIndex:
+    """Autocompletado por prefijo de palabra ordenado por frecuencia"""
+
+    def __init__(self, entradas: Dict[str, int], top_k: int = 20, umbral_precalculo: int = 256):
+        """
+        Construye el índice.
+
+        Args:
+            entradas: texto a sugerir -> frecuencia
+            top_k: cantidad máxima de sugerencias precalculadas por prefijo
+            umbral_precalculo: prefijos con más llaves que esto se precalculan
+        """
+        self.top_k = top_k
+        self.umbral_precalculo = umbral_precalculo
+        self.textos: List[str] = list(entradas)
+        self.frecuencias = np.fromiter(entradas.values(), dtype=np.int64, count=len(entradas))
+
+        # Una llave por cada inicio de palabra del texto plegado
+        pares = []
+        for entrada_id, texto in enumerate(self.textos):
+            plegado = fold_text(texto)
+            for match in _PALABRA_RE.finditer(plegado):
+                pares.append((plegado[match.start():], entrada_id))
+        pares.sort()
+        self._claves = [clave for clave, _ in pares]
+        self._ids = [entrada_id for _, entrada_id in pares]
+
+        self._precalculados: Dict[str, List[int]] = {}
+        self._precalcular(0, len(self._claves), 1)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns=DEFAULT_COMPLETION_COLUMNS,
+                   text_column: str = DEFAULT_TEXT_COLUMN, max_terms: int = 5000) -> 'CompletionIndex':
+        """Construye el índice con valores distintos de columnas y términos frecuentes del texto"""
+        entradas: Counter = Counter()
+        for columna in columns:
+            if columna not in df.columns:
+                continue
+            valores = df[columna].dropna().astype(str).str.strip()
+            for valor, frecuencia in valores[valores != ''].value_counts().items():
+                entradas[valor] += int(frecuencia)
+
+        if text_column in df.columns:
+            # Un término que ya es un valor de columna ('belén' / 'Belén') suma a ese valor
+            existentes = {fold_text(valor): valor for valor in entradas}
+            for termino, frecuencia in cls._terminos_frecuentes(df[text_column].tolist(), max_terms).items():
+                entradas[existentes.get(fold_text(termino), termino)] += frecuencia
+        return cls(dict(entradas))
+
+    @staticmethod
+    def _terminos_frecuentes(textos: Iterable, max_terms: int) -> Dict[str, int]:
+        """Términos del texto libre por frecuencia de documento, con su forma escrita más común"""
+        frecuencia_doc: Counter = Counter()
+        formas: Dict[str, Counter] = {}
+        for texto in textos:
+            if not isinstance(texto, str):
+                continue
+            vistos = set()
+            for palabra in _PALABRA_RE.findall(texto.lower()):
+                if len(palabra) < 3 or palabra.isdigit():
+                    continue
+                plegada = fold_text(palabra)
+                if plegada in STOPWORDS:
+                    continue
+                formas.setdefault(plegada, Counter())[palabra] += 1
+                vistos.add(plegada)
+            frecuencia_doc.update(vistos)
+
+        return {
+            formas[plegada].most_common(1)[0][0]: frecuencia
+            for plegada, frecuencia in frecuencia_doc.most_common(max_terms)
+            if frecuencia > 1
+        }
+
+    def _mejores(self, inicio: int, fin: int, k: int) -> List[int]:
+        """Ids de las k entradas más frecuentes entre las llaves [inicio, fin)"""
+        ids = set(self._ids[inicio:fin])
+        return heapq.nsmallest(k, ids, key=lambda i: (-self.frecuencias[i], self.textos[i]))
+
+    def _precalcular(self, inicio: int, fin: int, longitud: int):
+        """Precalcula recursivamente el top-k de los prefijos con muchas llaves"""
+        pendientes = [(inicio, fin, longitud)]
+        while pendientes:
+            a, b, largo = pendientes.pop()
+            if b - a <= self.umbral_precalculo:
+                continue
+            # Dividir el rango por el prefijo de longitud `largo`
+            i = a
+            while i < b:
+                prefijo = self._claves[i][:largo]
+                if len(prefijo) < largo:
+                    # Llave más corta que el prefijo: ya quedó cubierta en el nivel anterior
+                    i += 1
+                    continue
+                j = bisect.bisect_left(self._claves, prefijo + '\uffff', i, b)
+                if j - i > self.umbral_precalculo:
+                    self._precalculados[prefijo] = self._mejores(i, j, self.top_k)
+                    pendientes.append((i, j, largo + 1))
+                i = j
+
+    def suggest(self, texto: str, k: int = 20) -> List[str]:
+        """Sugerencias cuyo texto tiene una palabra que empieza con el texto dado"""
+        prefijo = fold_text(texto.strip())
+        if not prefijo:
+            return []
+
+        ids = self._precalculados.get(prefijo)
+        if ids is None or k > self.top_k:
+            inicio = bisect.bisect_left(self._claves, prefijo)
+            fin = bisect.bisect_left(self._claves, prefijo + '\uffff', inicio)
+            ids = self._mejores(inicio, fin, k)
+        return [self.textos[i] for i in ids[:k]]
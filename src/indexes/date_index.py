@@ -0,0 +1,159 @@
+"""
+Índice ordenado de fechas del histórico
+
+Guarda las posiciones de fila ordenadas por fecha (las fechas vacías se
+excluyen), de modo que una ventana de fechas se resuelve con dos
+``searchsorted`` y un slice en lugar de una máscara booleana sobre todo el
+histórico. El mismo orden sirve para recorrer los registros por fecha y
+tomar los primeros k de un conjunto de filas sin ordenarlo.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class DateIndex:
+    """Posiciones de fila ordenadas por una columna de fechas"""
+
+    def __init__(self, fechas: pd.Series):
+        """Construye el índice desde una serie datetime64 en orden de fila"""
+        fechas = pd.to_datetime(fechas, errors='coerce')
+        self.total_rows = len(fechas)
+        valores = fechas.to_numpy(dtype='datetime64[ns]')
+        validos = ~np.isnat(valores)
+        posiciones = np.flatnonzero(validos)
+        orden = np.argsort(valores[validos], kind='stable')
+        self.positions = posiciones[orden].astype(np.int64)
+        self.values = valores[validos][orden]
+        # Orden descendente y filas sin fecha, calculados al primer uso
+        self._descending: Optional[np.ndarray] = None
+        self._null_positions: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = 'fecha_radicacion') -> 'DateIndex':
+        if column not in df.columns:
+            return cls(pd.Series([], dtype='datetime64[ns]'))
+        return cls(df[column])
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def updated(self, fechas: pd.Series, posiciones: np.ndarray) -> 'DateIndex':
+        """
+        Índice nuevo tras cambiar las filas indicadas y agregar filas al final.
+
+        Args:
+            fechas: columna completa ya actualizada (en orden de fila)
+            posiciones: filas existentes cuya fecha pudo cambiar
+        """
+        cambiadas = np.concatenate([np.asarray(posiciones, dtype=np.int64),
+                                    np.arange(self.total_rows, len(fechas), dtype=np.int64)])
+        valores = pd.to_datetime(fechas.iloc[cambiadas], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        validos = ~np.isnat(valores)
+        cambiadas, valores = cambiadas[validos], valores[validos]
+        orden = np.lexsort((cambiadas, valores))
+        cambiadas, valores = cambiadas[orden], valores[orden]
+
+        conservar = ~np.isin(self.positions, posiciones)
+        actuales, actuales_pos = self.values[conservar], self.positions[conservar]
+
+        # Punto de inserción por (fecha, posición): entre fechas iguales manda la posición
+        destino = np.searchsorted(actuales, valores, side='left')
+        fin = np.searchsorted(actuales, valores, side='right')
+        for i in np.flatnonzero(fin > destino):
+            destino[i] += np.searchsorted(actuales_pos[destino[i]:fin[i]], cambiadas[i])
+
+        resultado = DateIndex(pd.Series([], dtype='datetime64[ns]'))
+        resultado.total_rows = len(fechas)
+        resultado.values = np.insert(actuales, destino, valores)
+        resultado.positions = np.insert(actuales_pos, destino, cambiadas)
+        return resultado
+
+    @property
+    def min(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.values[0]) if len(self.values) else None
+
+    @property
+    def max(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.values[-1]) if len(self.values) else None
+
+    def _bounds(self, inicio=None, fin=None):
+        a = 0 if inicio is None else np.searchsorted(self.values, pd.Timestamp(inicio).to_datetime64(), side='left')
+        b = len(self.values) if fin is None else np.searchsorted(self.values, pd.Timestamp(fin).to_datetime64(), side='right')
+        return a, max(a, b)
+
+    def range(self, inicio=None, fin=None) -> np.ndarray:
+        """Posiciones con fecha en [inicio, fin] (extremos opcionales), ordenadas por fecha"""
+        a, b = self._bounds(inicio, fin)
+        return self.positions[a:b]
+
+    def count(self, inicio=None, fin=None) -> int:
+        """Cantidad de registros con fecha en [inicio, fin]"""
+        a, b = self._bounds(inicio, fin)
+        return int(b - a)
+
+    def ordered(self, descending: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(posiciones, fechas) ordenadas por fecha y, en empate, por posición ascendente"""
+        if not descending:
+            return self.positions, self.values
+        if self._descending is None:
+            self._descending = np.lexsort((self.positions, -self.values.view(np.int64)))
+        return self.positions[self._descending], self.values[self._descending]
+
+    @property
+    def null_positions(self) -> np.ndarray:
+        """Posiciones sin fecha, en orden de fila (van al final en cualquier orden)"""
+        if self._null_positions is None:
+            sin_fecha = np.ones(self.total_rows, dtype=bool)
+            sin_fecha[self.positions] = False
+            self._null_positions = np.flatnonzero(sin_fecha)
+        return self._null_positions
+
+    def top(self, candidates: np.ndarray, k: int, descending: bool = False,
+            after: Optional[Tuple[Optional[int], int]] = None) -> np.ndarray:
+        """
+        Primeras ``k`` filas de ``candidates`` en el orden del índice, sin ordenarlas.
+
+        Recorre el orden precalculado por bloques crecientes hasta reunir ``k``
+        filas; las filas sin fecha van al final por posición.
+
+        Args:
+            candidates: posiciones de fila a considerar
+            k: filas a devolver
+            descending: fechas más recientes primero
+            after: (fecha en nanosegundos o None si era nula, posición) de la última fila ya entregada
+        """
+        miembro = np.zeros(self.total_rows, dtype=bool)
+        miembro[candidates] = True
+        posiciones, valores = self.ordered(descending)
+
+        inicio, inicio_nulos = 0, 0
+        if after is not None:
+            clave, fila = after
+            if clave is None:
+                inicio = len(posiciones)
+                inicio_nulos = int(np.searchsorted(self.null_positions, fila, side='right'))
+            else:
+                # Posición del par (fecha, fila) en el orden: fechas iguales ordenadas por fila
+                claves = valores.view(np.int64)
+                if descending:
+                    claves, clave = -claves, -int(clave)
+                a = int(np.searchsorted(claves, clave, side='left'))
+                b = int(np.searchsorted(claves, clave, side='right'))
+                inicio = a + int(np.searchsorted(posiciones[a:b], fila, side='right'))
+
+        tomadas = []
+        faltan = k
+        bloque = max(4 * k, 1024)
+        for orden, desde in ((posiciones, inicio), (self.null_positions, inicio_nulos)):
+            while faltan > 0 and desde < len(orden):
+                trozo = orden[desde:desde + bloque]
+                elegidas = trozo[miembro[trozo]][:faltan]
+                tomadas.append(elegidas)
+                faltan -= len(elegidas)
+                desde += bloque
+                bloque *= 2
+        if not tomadas:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(tomadas).astype(np.int64, copy=False)
@@ -0,0 +1,253 @@
+"""
+Índice difuso y fonético de nombres de solicitantes
+
+Las transcripciones de voz escriben mal los nombres ('Yesica'/'Jessica',
+'Gonzales'/'González', nombres sin tildes). Cada palabra de nombre se
+reduce a una clave fonética del español y las claves se indexan en un
+diccionario de borrados al estilo SymSpell, de modo que los candidatos a
+distancia de edición 1-2 se obtienen con búsquedas en diccionario y no
+recorriendo el histórico.
+"""
+
+import bisect
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from src.indexes.text_utils import fold_text, tokenize
+
+DEFAULT_NAME_COLUMNS = ('primer_nombre', 'segundo_nombre', 'primer_apellido', 'segundo_apellido', 'nombre_completo')
+
+# Partículas que no aportan a la coincidencia de nombres
+_PARTICULAS = frozenset(['de', 'del', 'la', 'las', 'los', 'y'])
+
+# Puntajes por tipo de coincidencia de una palabra
+SCORE_EXACTO = 1.0
+SCORE_FONETICO = 0.9
+SCORE_PREFIJO = 0.8
+SCORE_DISTANCIA = {1: 0.7, 2: 0.5}
+
+
+def clave_fonetica(palabra: str) -> str:
+    """Clave fonética simplificada para nombres en español (palabra ya plegada)"""
+    p = palabra.replace('ñ', 'n')
+    reemplazos = (
+        ('ch', '#'), ('sh', '#'), ('qu', 'k'), ('gue', '%e'), ('gui', '%i'), ('ge', 'je'), ('gi', 'ji'),
+        ('ll', 'y'), ('ph', 'f'), ('ce', 'se'), ('ci', 'si')
+    )
+    for origen, destino in reemplazos:
+        p = p.replace(origen, destino)
+    p = p.replace('h', '').replace('%', 'g')
+    tabla = str.maketrans({'v': 'b', 'w': 'b', 'z': 's', 'x': 's', 'c': 'k', 'q': 'k'})
+    p = p.translate(tabla).replace('#', 'ch')
+    # 'y' final o entre consonantes suena como 'i'
+    if p.endswith('y'):
+        p = p[:-1] + 'i'
+
+    # Colapsar letras repetidas
+    resultado = []
+    for letra in p:
+        if not resultado or resultado[-1] != letra:
+            resultado.append(letra)
+    return ''.join(resultado)
+
+
+def _borrados(palabra: str, distancia: int) -> Set[str]:
+    """Todas las variantes con hasta `distancia` caracteres borrados"""
+    variantes = {palabra}
+    frontera = {palabra}
+    for _ in range(distancia):
+        siguiente = set()
+        for texto in frontera:
+            for i in range(len(texto)):
+                siguiente.add(texto[:i] + texto[i + 1:])
+        variantes |= siguiente
+        frontera = siguiente
+    return variantes
+
+
+def _distancia_edicion(a: str, b: str, maximo: int) -> int:
+    """Distancia de Damerau-Levenshtein (transposiciones adyacentes) acotada"""
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    previa_previa = None
+    previa = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            actual[j] = min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + costo)
+            if (previa_previa is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                actual[j] = min(actual[j], previa_previa[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        previa_previa, previa = previa, actual
+    return previa[-1]
+
+
+def _tokens_nombre(texto) -> List[str]:
+    if not isinstance(texto, str):
+        return []
+    return [t for t in tokenize(fold_text(texto)) if t not in _PARTICULAS and not t.isdigit()]
+
+
+def columnas_nombre(columnas: Iterable[str], preferidas: Tuple[str, ...] = DEFAULT_NAME_COLUMNS) -> List[str]:
+    """Columnas de nombre que se indexan: las preferidas presentes o, si no hay, 'nombre'"""
+    columnas = list(columnas)
+    return [c for c in preferidas if c in columnas] or [c for c in ['nombre'] if c in columnas]
+
+
+def tokens_fila(valores: Iterable) -> Set[str]:
+    """Palabras de nombre (plegadas, sin partículas ni números) de los valores de una fila"""
+    tokens = set()
+    for valor in valores:
+        tokens.update(_tokens_nombre(valor))
+    return tokens
+
+
+class NameIndex:
+    """Índice de nombres con claves fonéticas y diccionario de borrados"""
+
+    def __init__(self, nombres_por_fila: Iterable[Iterable], max_distance: int = 2):
+        """
+        Construye el índice.
+
+        Args:
+            nombres_por_fila: por cada fila, los valores de sus columnas de nombre
+            max_distance: distancia de edición máxima sobre las claves fonéticas
+        """
+        self.max_distance = max_distance
+        filas_por_token: Dict[str, List[int]] = {}
+        self.total_rows = 0
+        for fila, valores in enumerate(nombres_por_fila):
+            self.total_rows += 1
+            for token in tokens_fila(valores):
+                filas_por_token.setdefault(token, []).append(fila)
+
+        # Vocabulario ordenado (permite búsquedas por prefijo con bisect)
+        self.vocabulario: List[str] = sorted(filas_por_token)
+        self._filas = [np.asarray(filas_por_token[t], dtype=np.int64) for t in self.vocabulario]
+        self._token_id = {t: i for i, t in enumerate(self.vocabulario)}
+
+        # Clave fonética -> tokens y diccionario de borrados -> claves
+        self._por_clave: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(self.vocabulario):
+            self._por_clave.setdefault(clave_fonetica(token), []).append(token_id)
+        self._borrados: Dict[str, List[str]] = {}
+        for clave in self._por_clave:
+            for variante in _borrados(clave, self._distancia_para(clave)):
+                self._borrados.setdefault(variante, []).append(clave)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Tuple[str, ...] = DEFAULT_NAME_COLUMNS) -> 'NameIndex':
+        """Construye el índice desde las columnas de nombre presentes en el DataFrame"""
+        presentes = columnas_nombre(df.columns, columns)
+        if not presentes:
+            return cls([[] for _ in range(len(df))])
+        return cls(zip(*(df[c].tolist() for c in presentes)))
+
+    def _distancia_para(self, clave: str) -> int:
+        """Las claves cortas toleran menos errores para evitar ruido"""
+        if len(clave) <= 3:
+            return 0
+        if len(clave) <= 5:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    # Consultas al vocabulario (un backend persistente las resuelve con sus propias tablas)
+
+    def _token_exacto(self, token: str) -> Optional[Hashable]:
+        """Identificador del token si está en el vocabulario"""
+        return self._token_id.get(token)
+
+    def _tokens_prefijo(self, prefijo: str) -> Iterable[Hashable]:
+        """Tokens del vocabulario que empiezan con el prefijo"""
+        inicio = bisect.bisect_left(self.vocabulario, prefijo)
+        fin = bisect.bisect_left(self.vocabulario, prefijo + '\uffff')
+        return range(inicio, fin)
+
+    def _claves_borrados(self, variantes: Set[str]) -> Set[str]:
+        """Claves fonéticas que comparten alguna variante con borrados"""
+        return {clave for variante in variantes for clave in self._borrados.get(variante, ())}
+
+    def _tokens_por_clave(self, claves: Iterable[str]) -> Dict[str, List[Hashable]]:
+        """Tokens del vocabulario de cada clave fonética"""
+        return {clave: self._por_clave[clave] for clave in claves}
+
+    def _filas_tokens(self, tokens: Iterable[Hashable]) -> Dict[Hashable, np.ndarray]:
+        """Filas (ordenadas) de cada token"""
+        return {token: self._filas[token] for token in tokens}
+
+    def _candidatos(self, token: str) -> Dict[Hashable, float]:
+        """Tokens del vocabulario que coinciden con una palabra de la consulta -> puntaje"""
+        candidatos: Dict[Hashable, float] = {}
+
+        def agregar(token_id: Hashable, score: float):
+            if score > candidatos.get(token_id, 0.0):
+                candidatos[token_id] = score
+
+        exacto = self._token_exacto(token)
+        if exacto is not None:
+            agregar(exacto, SCORE_EXACTO)
+
+        # Prefijo de la palabra (consultas incompletas)
+        if len(token) >= 3:
+            for token_id in self._tokens_prefijo(token):
+                agregar(token_id, SCORE_PREFIJO)
+
+        # Coincidencias fonéticas exactas y a distancia de edición (SymSpell)
+        clave = clave_fonetica(token)
+        distancia = self._distancia_para(clave)
+        puntajes_clave = {}
+        for candidata in self._claves_borrados(_borrados(clave, distancia)):
+            d = 0 if candidata == clave else _distancia_edicion(clave, candidata, distancia)
+            if d <= distancia:
+                puntajes_clave[candidata] = SCORE_FONETICO if d == 0 else SCORE_DISTANCIA[d]
+        for candidata, tokens in self._tokens_por_clave(puntajes_clave).items():
+            for token_id in tokens:
+                agregar(token_id, puntajes_clave[candidata])
+        return candidatos
+
+    def search(self, consulta: str, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca filas cuyo nombre coincide con todas las palabras de la consulta.
+
+        Returns:
+            (posiciones, puntajes) ordenados por puntaje descendente y posición.
+        """
+        vacio = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        tokens = list(dict.fromkeys(_tokens_nombre(consulta)))
+        if not tokens:
+            return vacio
+
+        filas = None
+        puntajes = None
+        for token in tokens:
+            candidatos = self._candidatos(token)
+            if not candidatos:
+                return vacio
+            # Mejor puntaje por fila para esta palabra
+            filas_por_token = self._filas_tokens(candidatos)
+            partes = [filas_por_token[t] for t in candidatos]
+            filas_token = np.concatenate(partes)
+            scores_token = np.concatenate([np.full(len(p), candidatos[t]) for t, p in zip(candidatos, partes)])
+            orden = np.lexsort((-scores_token, filas_token))
+            filas_token, scores_token = filas_token[orden], scores_token[orden]
+            primero = np.ones(len(filas_token), dtype=bool)
+            primero[1:] = filas_token[1:] != filas_token[:-1]
+            filas_token, scores_token = filas_token[primero], scores_token[primero]
+
+            if filas is None:
+                filas, puntajes = filas_token, scores_token
+            else:
+                filas, idx_a, idx_b = np.intersect1d(filas, filas_token, assume_unique=True, return_indices=True)
+                puntajes = puntajes[idx_a] + scores_token[idx_b]
+            if len(filas) == 0:
+                return vacio
+
+        # Se ordena con los mismos puntajes float32 que se devuelven como clave del cursor
+        puntajes = (puntajes / len(tokens)).astype(np.float32)
+        orden = np.lexsort((filas, -puntajes))
+        if limit is not None and limit > 0:
+            orden = orden[:limit]
+        return filas[orden].astype(np.int64), puntajes[orden]
@@ -0,0 +1,155 @@
+"""
+Índice de números de radicado del histórico
+
+Los radicados numéricos se guardan como arreglos int64 ordenados (uno por
+cantidad de dígitos) junto con su posición de fila, de modo que las
+búsquedas exactas, por lote, por prefijo y por rango se resuelven con
+búsqueda binaria en O(log n). Como los radicados comienzan con la fecha
+(YYYYMMDD), un prefijo como '20251029' devuelve todo lo radicado ese día.
+"""
+
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+
+def normalizar_radicado(valor) -> Optional[str]:
+    """Normaliza un radicado a texto sin espacios ni sufijo decimal"""
+    if valor is None:
+        return None
+    try:
+        if pd.isna(valor):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).strip()
+    if texto.endswith('.0') and texto[:-2].isdigit():
+        texto = texto[:-2]
+    return texto or None
+
+
+class RadicadoIndex:
+    """Índice ordenado de radicados a posiciones de fila"""
+
+    def __init__(self, radicados: Iterable):
+        """Construye el índice a partir de los radicados en orden de fila"""
+        grupos: Dict[int, List[tuple]] = {}
+        self._otros: Dict[str, List[int]] = {}
+        self.total = 0
+
+        for posicion, valor in enumerate(radicados):
+            self.total += 1
+            texto = normalizar_radicado(valor)
+            if texto is None:
+                continue
+            if texto.isdigit() and texto[0] != '0' and len(texto) <= 18:
+                grupos.setdefault(len(texto), []).append((int(texto), posicion))
+            else:
+                self._otros.setdefault(texto, []).append(posicion)
+
+        # Por cada longitud: llaves ordenadas y posiciones alineadas
+        self._grupos: Dict[int, tuple] = {}
+        for longitud, pares in grupos.items():
+            llaves = np.fromiter((p[0] for p in pares), dtype=np.int64, count=len(pares))
+            posiciones = np.fromiter((p[1] for p in pares), dtype=np.int64, count=len(pares))
+            orden = np.argsort(llaves, kind='stable')
+            self._grupos[longitud] = (llaves[orden], posiciones[orden])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = 'numero_radicado') -> 'RadicadoIndex':
+        """Construye el índice desde la columna de radicados del DataFrame"""
+        if column not in df.columns:
+            return cls([])
+        return cls(df[column].tolist())
+
+    def __len__(self) -> int:
+        return self.total
+
+    def extend(self, radicados: Iterable) -> 'RadicadoIndex':
+        """Índice nuevo con filas agregadas al final (no modifica el actual)"""
+        agregadas = RadicadoIndex(radicados)
+        inicio = self.total
+
+        resultado = RadicadoIndex([])
+        resultado.total = self.total + agregadas.total
+        resultado._otros = dict(self._otros)
+        for texto, posiciones in agregadas._otros.items():
+            resultado._otros[texto] = resultado._otros.get(texto, []) + [inicio + p for p in posiciones]
+
+        resultado._grupos = dict(self._grupos)
+        for longitud, (llaves, posiciones) in agregadas._grupos.items():
+            posiciones = posiciones + inicio
+            if longitud not in resultado._grupos:
+                resultado._grupos[longitud] = (llaves, posiciones)
+                continue
+            # Las posiciones nuevas son mayores que todas las existentes: van después de sus iguales
+            actuales, actuales_pos = resultado._grupos[longitud]
+            destino = np.searchsorted(actuales, llaves, side='right')
+            resultado._grupos[longitud] = (np.insert(actuales, destino, llaves), np.insert(actuales_pos, destino, posiciones))
+        return resultado
+
+    def lookup(self, radicado) -> np.ndarray:
+        """Posiciones (en orden de fila) de un radicado exacto"""
+        texto = normalizar_radicado(radicado)
+        if texto is None:
+            return np.empty(0, dtype=np.int64)
+        if texto in self._otros:
+            return np.asarray(self._otros[texto], dtype=np.int64)
+        if not texto.isdigit() or texto[0] == '0' or len(texto) not in self._grupos:
+            return np.empty(0, dtype=np.int64)
+
+        llaves, posiciones = self._grupos[len(texto)]
+        valor = int(texto)
+        inicio = np.searchsorted(llaves, valor, side='left')
+        fin = np.searchsorted(llaves, valor, side='right')
+        return posiciones[inicio:fin]
+
+    def lookup_many(self, radicados: Iterable) -> Dict[str, np.ndarray]:
+        """Búsqueda por lote: radicado normalizado -> posiciones"""
+        resultado = {}
+        for radicado in radicados:
+            texto = normalizar_radicado(radicado)
+            if texto is not None and texto not in resultado:
+                resultado[texto] = self.lookup(texto)
+        return resultado
+
+    def prefix(self, prefijo: str) -> np.ndarray:
+        """Posiciones de los radicados que comienzan con el prefijo, ordenadas por radicado"""
+        prefijo = normalizar_radicado(prefijo)
+        if prefijo is None:
+            return np.empty(0, dtype=np.int64)
+
+        partes = []
+        if prefijo.isdigit() and prefijo[0] != '0':
+            base = int(prefijo)
+            for longitud in sorted(self._grupos):
+                if longitud < len(prefijo):
+                    continue
+                escala = 10 ** (longitud - len(prefijo))
+                llaves, posiciones = self._grupos[longitud]
+                inicio = np.searchsorted(llaves, base * escala, side='left')
+                fin = np.searchsorted(llaves, (base + 1) * escala, side='left')
+                partes.append(posiciones[inicio:fin])
+
+        otros = [pos for texto, lista in self._otros.items() if texto.startswith(prefijo) for pos in lista]
+        if otros:
+            partes.append(np.asarray(sorted(otros), dtype=np.int64))
+
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+
+    def range(self, inicio, fin) -> np.ndarray:
+        """Posiciones de los radicados numéricos en el rango cerrado [inicio, fin]"""
+        inicio_txt, fin_txt = normalizar_radicado(inicio), normalizar_radicado(fin)
+        if not (inicio_txt and fin_txt and inicio_txt.isdigit() and fin_txt.isdigit()):
+            return np.empty(0, dtype=np.int64)
+
+        desde, hasta = int(inicio_txt), int(fin_txt)
+        partes = []
+        for longitud in sorted(self._grupos):
+            llaves, posiciones = self._grupos[longitud]
+            a = np.searchsorted(llaves, desde, side='left')
+            b = np.searchsorted(llaves, hasta, side='right')
+            partes.append(posiciones[a:b])
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
@@ -0,0 +1,136 @@
+"""
+Índice invertido de texto completo con ranking BM25F
+
+Indexa los campos de texto del histórico (asunto, datos iniciales,
+seguimiento y observación) con normalización en español. Cada término
+guarda su lista de postings con el peso BM25F ya normalizado por longitud
+de campo, de modo que una consulta solo recorre los postings de sus
+términos y no el histórico completo.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.indexes.text_utils import analyze
+
+# Campos indexados y su peso relativo en el ranking
+DEFAULT_FIELD_BOOSTS = {
+    'texto_pqrs': 3.0,
+    'datos_iniciales': 1.5,
+    'seguimiento': 1.0,
+    'observacion': 1.0
+}
+
+
+class TextIndex:
+    """Índice invertido con ranking BM25F por campos"""
+
+    def __init__(self, field_texts: Dict[str, List], field_boosts: Dict[str, float] = None,
+                 k1: float = 1.2, b: float = 0.75):
+        """
+        Construye el índice.
+
+        Args:
+            field_texts: campo -> lista de textos en orden de fila
+            field_boosts: campo -> peso del campo
+            k1, b: parámetros de BM25
+        """
+        self.k1 = k1
+        self.b = b
+        self.field_boosts = dict(field_boosts or DEFAULT_FIELD_BOOSTS)
+        self.total_docs = max((len(textos) for textos in field_texts.values()), default=0)
+
+        # Tokenizar cada campo una sola vez
+        tokens_por_campo = {}
+        longitud_media = {}
+        for campo, textos in field_texts.items():
+            tokens = [analyze(texto) for texto in textos]
+            tokens_por_campo[campo] = tokens
+            total = sum(len(t) for t in tokens)
+            longitud_media[campo] = (total / len(tokens)) if tokens and total else 1.0
+
+        # Frecuencia de término ponderada por campo y normalizada por longitud (BM25F)
+        pesos: Dict[str, Dict[int, float]] = {}
+        for campo, tokens in tokens_por_campo.items():
+            boost = self.field_boosts.get(campo, 1.0)
+            media = longitud_media[campo]
+            for doc, terminos in enumerate(tokens):
+                if not terminos:
+                    continue
+                normalizacion = 1.0 - self.b + self.b * len(terminos) / media
+                for termino, tf in Counter(terminos).items():
+                    postings = pesos.setdefault(termino, {})
+                    postings[doc] = postings.get(doc, 0.0) + boost * tf / normalizacion
+
+        # Postings compactos: documentos ordenados y peso saturado por término
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for termino, postings in pesos.items():
+            docs = np.fromiter(postings.keys(), dtype=np.int32, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            orden = np.argsort(docs)
+            self._postings[termino] = (docs[orden], self.score(tf, len(docs))[orden])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, field_boosts: Dict[str, float] = None) -> 'TextIndex':
+        """Construye el índice desde las columnas de texto presentes en el DataFrame"""
+        boosts = field_boosts or DEFAULT_FIELD_BOOSTS
+        field_texts = {campo: df[campo].tolist() for campo in boosts if campo in df.columns}
+        index = cls(field_texts, boosts)
+        index.total_docs = len(df)
+        return index
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def document_frequency(self, termino: str) -> int:
+        """Cantidad de documentos que contienen el término (ya analizado)"""
+        postings = self._postings_de(termino)
+        return 0 if postings is None else len(postings[0])
+
+    def _postings_de(self, termino: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Documentos (ordenados) y puntaje del término, o None si no aparece"""
+        return self._postings.get(termino)
+
+    def score(self, tf: np.ndarray, document_frequency: int) -> np.ndarray:
+        """Puntaje BM25 saturado de las frecuencias ponderadas de un término"""
+        idf = math.log(1.0 + (self.total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+        return (idf * tf / (self.k1 + tf)).astype(np.float32)
+
+    def search(self, consulta: str, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca los documentos que contienen todos los términos de la consulta.
+
+        Returns:
+            (posiciones, puntajes) ordenados por puntaje descendente y, en empate,
+            por posición de fila.
+        """
+        terminos = list(dict.fromkeys(analyze(consulta)))
+        vacio = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if not terminos:
+            return vacio
+
+        postings = [self._postings_de(termino) for termino in terminos]
+        if any(p is None for p in postings):
+            return vacio
+
+        # Intersección empezando por la lista más corta
+        postings.sort(key=lambda p: len(p[0]))
+        docs, scores = postings[0]
+        scores = scores.astype(np.float64)
+        for otros_docs, otros_scores in postings[1:]:
+            comunes, idx_a, idx_b = np.intersect1d(docs, otros_docs, assume_unique=True, return_indices=True)
+            docs = comunes
+            scores = scores[idx_a] + otros_scores[idx_b]
+            if len(docs) == 0:
+                return vacio
+
+        # Orden por puntaje descendente y posición ascendente, sobre los puntajes
+        # float32 que se devuelven (y que el cursor de paginación usa como clave)
+        scores = scores.astype(np.float32)
+        orden = np.lexsort((docs, -scores))
+        if limit is not None and limit > 0:
+            orden = orden[:limit]
+        return docs[orden].astype(np.int64), scores[orden]
@@ -0,0 +1,72 @@
+"""
+Utilidades de normalización de texto en español para los índices
+
+Incluye plegado de tildes y mayúsculas, tokenización, palabras vacías y un
+stemmer liviano que reduce plurales, género y sufijos frecuentes
+('reparación', 'reparaciones' y 'reparar' comparten la raíz 'repar').
+"""
+
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9ñ]+")
+
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aqui asi aun cada como con contra cual cuando
+de del desde donde dos el ella ellas ello ellos en entre era eran es esa esas ese eso esos esta estaba
+estan estar estas este esto estos fue fueron ha hace hacia han hasta hay la las le les lo los mas me mi
+mis mucho muy nada ni no nos o otra otras otro otros para pero poco por porque que quien se sea segun
+ser si sido sin sobre su sus tal tambien te tiene tienen todo todos tu un una unas uno unos ya y yo
+""".split())
+
+# Sufijos derivativos y verbales, del más largo al más corto
+_SUFIJOS = (
+    'amientos', 'imientos', 'aciones', 'iciones', 'amiento', 'imiento', 'idades',
+    'encias', 'ancias', 'mente', 'acion', 'icion', 'idad', 'encia', 'ancia',
+    'ables', 'ibles', 'able', 'ible', 'istas', 'ista', 'iendo', 'ando',
+    'adas', 'ados', 'idas', 'idos', 'ada', 'ado', 'ida', 'ido', 'ar', 'er', 'ir'
+)
+
+_LONGITUD_MINIMA_RAIZ = 3
+
+
+def fold_text(texto: str) -> str:
+    """Pasa a minúsculas y elimina tildes y diéresis (conserva la ñ)"""
+    texto = texto.lower().replace('ñ', '\x00')
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return texto.replace('\x00', 'ñ')
+
+
+def tokenize(texto: str) -> List[str]:
+    """Tokeniza un texto ya plegado en palabras alfanuméricas"""
+    return _TOKEN_RE.findall(texto)
+
+
+def stem(token: str) -> str:
+    """Stemmer liviano para español"""
+    if token.isdigit() or len(token) <= _LONGITUD_MINIMA_RAIZ:
+        return token
+
+    for sufijo in _SUFIJOS:
+        if token.endswith(sufijo) and len(token) - len(sufijo) >= _LONGITUD_MINIMA_RAIZ:
+            return token[:-len(sufijo)]
+
+    # Plurales
+    if token.endswith('es') and len(token) - 2 >= _LONGITUD_MINIMA_RAIZ and token[-3] not in 'aeiou':
+        token = token[:-2]
+    elif token.endswith('s') and len(token) - 1 >= _LONGITUD_MINIMA_RAIZ:
+        token = token[:-1]
+
+    # Vocal final (género)
+    if token[-1] in 'aeo' and len(token) - 1 >= _LONGITUD_MINIMA_RAIZ:
+        token = token[:-1]
+    return token
+
+
+def analyze(texto) -> List[str]:
+    """Pipeline completo: plegado, tokenización, palabras vacías y stemming"""
+    if not isinstance(texto, str):
+        return []
+    return [stem(token) for token in tokenize(fold_text(texto)) if token not in STOPWORDS]
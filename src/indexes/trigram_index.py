@@ -0,0 +1,100 @@
+"""
+Índice de trigramas para búsquedas por subcadena
+
+Sirve los filtros con semántica de ``str.contains`` (subcadenas arbitrarias,
+sin distinguir mayúsculas) al estilo de pg_trgm: los trigramas del patrón
+se intersectan para obtener valores candidatos y solo esos se verifican con
+la misma expresión regular que usa pandas. El índice trabaja sobre los
+valores distintos de la columna, por lo que las columnas de baja
+cardinalidad (unidad, barrio, estado) se filtran casi sin costo.
+"""
+
+import re
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+_REGEX_METACHARS = set('.^$*+?{}[]\\|()')
+_TRIGRAM_SIZE = 3
+
+
+def _trigramas(texto: str) -> set:
+    return {texto[i:i + _TRIGRAM_SIZE] for i in range(len(texto) - _TRIGRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """Índice de trigramas sobre los valores distintos de una columna"""
+
+    def __init__(self, series: pd.Series):
+        """Construye el índice con la misma representación que ``series.astype(str)``"""
+        textos = series.astype(str)
+        codes, uniques = pd.factorize(textos, use_na_sentinel=True)
+        self.total_rows = len(codes)
+        self.values: List[str] = [str(v) for v in uniques]
+        self._folded = [v.casefold() for v in self.values]
+
+        # Postings trigrama -> ids de valor
+        postings: Dict[str, List[int]] = {}
+        for value_id, texto in enumerate(self._folded):
+            for trigrama in _trigramas(texto):
+                postings.setdefault(trigrama, []).append(value_id)
+        self._postings = {t: np.asarray(ids, dtype=np.int32) for t, ids in postings.items()}
+
+        # Filas por valor en formato CSR (posiciones ordenadas dentro de cada valor)
+        validos = codes >= 0
+        filas = np.flatnonzero(validos)
+        codigos = codes[validos]
+        orden = np.argsort(codigos, kind='stable')
+        self._row_positions = filas[orden].astype(np.int64)
+        self._offsets = np.zeros(len(self.values) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codigos, minlength=len(self.values)), out=self._offsets[1:])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str) -> 'TrigramIndex':
+        return cls(df[column])
+
+    @staticmethod
+    def _es_literal(patron: str) -> bool:
+        return not any(c in _REGEX_METACHARS for c in patron)
+
+    def candidate_values(self, patron: str) -> np.ndarray:
+        """Ids de valores que pueden contener el patrón (superconjunto de las coincidencias)"""
+        folded = patron.casefold()
+        if not self._es_literal(patron) or len(folded) < _TRIGRAM_SIZE:
+            return np.arange(len(self.values), dtype=np.int32)
+
+        listas = []
+        for trigrama in _trigramas(folded):
+            ids = self._postings.get(trigrama)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            listas.append(ids)
+
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for ids in listas[1:]:
+            candidatos = np.intersect1d(candidatos, ids, assume_unique=True)
+            if len(candidatos) == 0:
+                break
+        return candidatos
+
+    def estimate(self, patron: str) -> int:
+        """Cota superior de filas que pueden coincidir (para planificar filtros)"""
+        candidatos = self.candidate_values(patron)
+        return int(np.sum(self._offsets[candidatos + 1] - self._offsets[candidatos]))
+
+    def matching_values(self, patron: str) -> np.ndarray:
+        """Ids de valores que contienen el patrón (regex, sin distinguir mayúsculas)"""
+        candidatos = self.candidate_values(patron)
+        if len(candidatos) == 0:
+            return candidatos
+        regex = re.compile(patron, re.IGNORECASE)
+        return np.asarray([i for i in candidatos if regex.search(self.values[i])], dtype=np.int32)
+
+    def search(self, patron: str) -> np.ndarray:
+        """Posiciones de fila (ordenadas) cuyo valor contiene el patrón"""
+        ids = self.matching_values(patron)
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        partes = [self._row_positions[self._offsets[i]:self._offsets[i + 1]] for i in ids]
+        return np.sort(np.concatenate(partes))
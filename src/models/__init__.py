@@ -3,5 +3,7 @@ Modelos de datos del sistema TUNRAG
 """
 
 from .pqrs_model import PQRSData, PQRSHistorico, AudioTranscription, PQRSClase, PQRSEstado
+from .historico_rows import HistoricoRows, PQRSHistoricoView
 
-__all__ = ['PQRSData', 'PQRSHistorico', 'AudioTranscription', 'PQRSClase', 'PQRSEstado']
+__all__ = ['PQRSData', 'PQRSHistorico', 'AudioTranscription', 'PQRSClase', 'PQRSEstado',
+           'HistoricoRows', 'PQRSHistoricoView']
@@ -0,0 +1,79 @@
+"""
+Esquema de columnas del histórico de PQRS
+
+El histórico normalizado guarda cada columna del Excel una sola vez, con
+su nombre normalizado (p. ej. 'ESTADO' -> 'estado_pqrs'). Los nombres
+originales del Excel y los alternativos de compatibilidad ('nombre_completo')
+no se guardan como columnas duplicadas: se resuelven con un mapa de alias
+hacia la columna que sí existe.
+"""
+
+from typing import Dict, Iterable, Optional
+
+# Columnas del Excel histórico y su nombre normalizado
+COLUMNAS_EXCEL: Dict[str, str] = {
+    # Número de radicado
+    'DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF': 'numero_radicado',
+    'CONTROL DE RADICADO': 'control_radicado',
+    'RAD. RESPUESTA': 'rad_respuesta',
+
+    # Nombre del solicitante
+    'PRIMERNOMBRE': 'primer_nombre',
+    'SEGUNDONOMBRE': 'segundo_nombre',
+    'PRIMERAPELLIDO': 'primer_apellido',
+    'SEGUNDOAPELLIDO': 'segundo_apellido',
+    'SOLICITANTE': 'nombre',
+
+    # Fechas
+    'FECHA RADICACIÓN': 'fecha_radicacion',
+    'FECHA ENTRADA A SIF': 'fecha_entrada_sif',
+    'FECHA RADICADO RESPUESTA': 'fecha_respuesta',
+    'FECHA DE INGRESO': 'fecha_ingreso',
+    'FECHA DE INGRESO A LA BANDEJA': 'fecha_ingreso_bandeja',
+
+    # Texto de la PQRS
+    'ASUNTO DE LA PETICIÓN': 'texto_pqrs',
+    'DATOS INICIALES PQRSD': 'datos_iniciales',
+    'SEGUIMIENTO DE LA PQRSD': 'seguimiento',
+    'OBSERVACIÓN': 'observacion',
+
+    # Clasificación
+    'CLASE DE SOLICITUD': 'clasificacion',
+    'TIPO DE SOLICITUD': 'tipo_solicitud',
+    'TEMA': 'tema',
+
+    # Estado
+    'ESTADO': 'estado_pqrs',
+    'SEMAFORO DIAS': 'semaforo_dias',
+    'OPORTUNIDAD': 'oportunidad',
+
+    # Información adicional
+    'TIPO DOCUMENTO': 'tipo_documento',
+    'NÚMERO DOCUMENTO': 'numero_documento',
+    'CORREO1': 'correo',
+    'CELULAR 1': 'celular',
+    'DIRECCIÓN DEL PETICIONARIO': 'direccion',
+    'BARRIO, VEREDA O SECTOR': 'barrio',
+    'UNIDAD': 'unidad',
+    'AREAS DE INTERVENCIÓN': 'areas_intervencion',
+    'ENLACE': 'enlace',
+    'LÍDER': 'lider'
+}
+
+# Nombres alternativos de columnas normalizadas de versiones anteriores
+COLUMNAS_COMPATIBILIDAD: Dict[str, str] = {
+    'nombre_completo': 'nombre',
+    'asunto_peticion': 'texto_pqrs',
+    'estado': 'estado_pqrs'
+}
+
+# Alias -> columna guardada (nombres del Excel y de compatibilidad)
+ALIAS_COLUMNAS: Dict[str, str] = {**COLUMNAS_EXCEL, **COLUMNAS_COMPATIBILIDAD}
+
+
+def resolver_columna(columnas: Iterable[str], nombre: str) -> Optional[str]:
+    """Columna guardada para un nombre normalizado, original del Excel o alias (None si no existe)"""
+    if nombre in columnas:
+        return nombre
+    destino = ALIAS_COLUMNAS.get(nombre)
+    return destino if destino is not None and destino in columnas else None
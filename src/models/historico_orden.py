@@ -0,0 +1,106 @@
+"""
+Orden total de los resultados del histórico de PQRS
+
+Un resultado se ordena por la clave de una columna (nulos al final) y, en
+empate, por la posición de la fila, de modo que el orden es estable entre
+páginas y entre backends. La paginación por cursor y los repositorios usan
+las mismas claves para continuar un resultado después de una fila.
+"""
+
+from typing import Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def claves_orden(serie: pd.Series) -> np.ndarray:
+    """
+    Claves comparables para ordenar por una columna del histórico.
+
+    Las categóricas se ordenan por código (igual que ``sort_values``), las
+    fechas como datetime64 y los números como decimales; el resto como texto.
+    Los nulos quedan como NaN, NaT o None.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.float64)
+        codigos[codigos < 0] = np.nan
+        return codigos
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        if getattr(serie.dtype, 'tz', None) is not None:
+            serie = serie.dt.tz_convert(None)
+        return serie.to_numpy('datetime64[ns]')
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    texto = serie.astype(str)
+    return np.asarray(texto.where(serie.notna(), None), dtype=object)
+
+
+def ordenar(posiciones: np.ndarray, claves: np.ndarray, descendente: bool = False) -> np.ndarray:
+    """Índices que ordenan por clave (nulos al final) y, en empate, por posición ascendente"""
+    orden = pd.DataFrame({'clave': claves, 'posicion': posiciones}).sort_values(
+        ['clave', 'posicion'], ascending=[not descendente, True], na_position='last', kind='mergesort'
+    )
+    return orden.index.to_numpy()
+
+
+def _claves_numericas(claves: np.ndarray, descendente: bool) -> tuple:
+    """(valores numéricos donde menor va primero, máscara de nulos) equivalentes al orden de ``ordenar``"""
+    nulos = np.asarray(pd.isna(claves), dtype=bool)
+    if claves.dtype.kind == 'M':
+        valores = claves.view(np.int64)
+    elif claves.dtype.kind == 'f':
+        valores = claves
+    else:
+        # Texto: rango de cada valor entre los distintos ordenados
+        valores = np.zeros(len(claves), dtype=np.int64)
+        valores[~nulos] = pd.factorize(claves[~nulos], sort=True)[0]
+    return (-valores if descendente else valores), nulos
+
+
+def primeros(posiciones: np.ndarray, claves: np.ndarray, descendente: bool, k: int) -> np.ndarray:
+    """
+    Índices de las primeras ``k`` filas en el orden de ``ordenar``, sin ordenar el resto.
+
+    Selección parcial (``np.partition``) del umbral de la k-ésima clave: pasan
+    las claves mejores que el umbral y, de las iguales, las de menor posición
+    (``posiciones`` debe venir en orden ascendente). Solo esas k se ordenan.
+    """
+    if k <= 0 or k >= len(posiciones):
+        return ordenar(posiciones, claves, descendente)
+
+    valores, nulos = _claves_numericas(claves, descendente)
+    validos = np.flatnonzero(~nulos)
+    if len(validos) > k:
+        candidatos = valores[validos]
+        umbral = np.partition(candidatos, k - 1)[k - 1]
+        mejores = validos[candidatos < umbral]
+        empates = validos[candidatos == umbral][:k - len(mejores)]
+        elegidos = np.concatenate([mejores, empates])
+        elegidos = elegidos[np.lexsort((posiciones[elegidos], valores[elegidos]))]
+    else:
+        elegidos = validos[np.lexsort((posiciones[validos], valores[validos]))]
+        elegidos = np.concatenate([elegidos, np.flatnonzero(nulos)[:k - len(elegidos)]])
+    return elegidos
+
+
+def posteriores(ids: np.ndarray, claves: Optional[np.ndarray], descendente: bool,
+                despues_de: Tuple[Any, int]) -> np.ndarray:
+    """
+    Máscara de las filas (en cualquier orden) que van después de ``despues_de`` en el orden del resultado.
+
+    ``despues_de`` es la clave (serializable, ver ``CursorHistorico.clave_de``)
+    y el identificador de la última fila entregada.
+    """
+    clave, fila = despues_de
+    if claves is None:
+        return ids > fila
+
+    nulos = pd.isna(claves)
+    if clave is None:
+        return nulos & (ids > fila)
+
+    if claves.dtype.kind == 'M':
+        clave = np.datetime64(int(clave), 'ns')
+    elif claves.dtype == object:
+        claves = np.where(nulos, '', claves)
+    mayores = claves < clave if descendente else claves > clave
+    return nulos | (~nulos & (mayores | ((claves == clave) & (ids > fila))))
@@ -0,0 +1,282 @@
+"""
+Vistas de fila de solo lectura sobre el histórico de PQRS
+
+En lugar de construir un ``PQRSHistorico`` (con su Series y su diccionario
+intermedios) por cada fila de un resultado, los repositorios devuelven un
+``HistoricoRows``: las posiciones de fila más una referencia a las columnas
+del snapshot. Cada ``PQRSHistoricoView`` se crea solo al acceder a su
+posición, ocupa dos referencias (``__slots__``) y lee los valores de las
+columnas con la misma conversión y los mismos valores por defecto que
+``PQRSHistorico.from_dict``. Un resultado puede proyectarse a unos pocos
+campos: solo esas columnas se leen, convierten y serializan.
+"""
+
+from dataclasses import fields
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from src.models.historico_columnas import ALIAS_COLUMNAS, resolver_columna
+from src.models.pqrs_model import PQRSHistorico
+
+# Campos del modelo, en el orden de PQRSHistorico.to_dict
+CAMPOS = tuple(campo.name for campo in fields(PQRSHistorico))
+# Campos que PQRSHistorico deja vacíos si solo contienen espacios
+CAMPOS_PRINCIPALES = ('nombre', 'fecha_radicacion', 'texto_pqrs', 'clasificacion', 'estado_pqrs')
+# Columna original del Excel con el radicado, si numero_radicado viene vacío
+COLUMNA_RADICADO_ORIGINAL = 'DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF'
+# Columnas adicionales que se leen para completar un campo vacío
+COLUMNAS_RESPALDO = {
+    'numero_radicado': (COLUMNA_RADICADO_ORIGINAL,),
+    'nombre': ('primer_nombre', 'primer_apellido', 'nombre_completo')
+}
+
+
+class CamposInvalidosError(ValueError):
+    """Proyección con campos que no existen en el modelo"""
+
+
+def normalizar_campos(campos) -> Optional[Tuple[str, ...]]:
+    """
+    Proyección pedida (lista o texto separado por comas) en el orden del modelo.
+
+    Devuelve None si no se pidió proyección; CamposInvalidosError si hay campos desconocidos.
+    """
+    if not campos:
+        return None
+    if isinstance(campos, str):
+        campos = campos.split(',')
+    pedidos = {str(campo).strip() for campo in campos} - {''}
+    desconocidos = pedidos - set(CAMPOS)
+    if desconocidos:
+        raise CamposInvalidosError(f"Campos no válidos: {', '.join(sorted(desconocidos))}")
+    return tuple(campo for campo in CAMPOS if campo in pedidos) or None
+
+
+def columnas_de_campos(campos: Sequence[str]) -> List[str]:
+    """Columnas del histórico que hay que leer para una proyección (incluye las de respaldo y las de sus alias)"""
+    columnas = list(campos)
+    for campo in campos:
+        columnas.extend(c for c in COLUMNAS_RESPALDO.get(campo, ()) if c not in columnas)
+    for columna in list(columnas):
+        destino = ALIAS_COLUMNAS.get(columna)
+        if destino is not None and destino not in columnas:
+            columnas.append(destino)
+    return columnas
+
+
+def _a_texto(valor) -> str:
+    """Misma conversión que PQRSHistorico.from_dict: nulos como '' y el resto como texto"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    return valor if isinstance(valor, str) else str(valor)
+
+
+class _Lector:
+    """Lectura de una columna como texto, por posición o por lote de posiciones (sin copiarla)"""
+
+    __slots__ = ('uno', 'varios')
+
+    def __init__(self, serie: pd.Series):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Códigos -> categorías ya convertidas; el código -1 (nulo) cae en el '' final
+            codigos = serie.cat.codes.to_numpy()
+            categorias = np.array([_a_texto(c) for c in serie.cat.categories] + [''], dtype=object)
+            self.uno = lambda posicion: categorias[codigos[posicion]]
+            self.varios = lambda posiciones: categorias[codigos[posiciones]].tolist()
+            return
+        if serie.dtype == object or serie.dtype.kind in 'biuf':
+            valores = serie.to_numpy()
+        else:
+            valores = serie.array
+        self.uno = lambda posicion: _a_texto(valores[posicion])
+        self.varios = lambda posiciones: _columna_texto(serie.iloc[posiciones])
+
+
+def _columna_texto(parte: pd.Series) -> List[str]:
+    """Conversión a texto de toda una columna: los nulos se normalizan a '' de una vez, no celda por celda"""
+    if pd.api.types.is_datetime64_any_dtype(parte.dtype):
+        fechas = parte.dt
+        if getattr(parte.dtype, 'tz', None) is None and not ((fechas.microsecond != 0) | (fechas.nanosecond != 0)).any():
+            # Mismo texto que str(Timestamp) cuando no hay fracciones de segundo
+            return fechas.strftime('%Y-%m-%d %H:%M:%S').fillna('').tolist()
+        return [_a_texto(v) for v in parte.array]
+    if not pd.api.types.is_string_dtype(parte.dtype) or parte.dtype == object:
+        parte = parte.astype(str)
+    return parte.fillna('').tolist()
+
+
+class HistoricoColumns:
+    """Columnas del histórico que alimentan las vistas de fila"""
+
+    def __init__(self, df: pd.DataFrame):
+        """Prepara un lector por campo del modelo presente en el DataFrame (directo o por alias)"""
+        self.df = df
+        self.total_rows = len(df)
+        columnas = {campo: resolver_columna(df.columns, campo) for campo in CAMPOS}
+        self._lectores: Dict[str, _Lector] = {
+            campo: _Lector(df[columna]) for campo, columna in columnas.items() if columna is not None
+        }
+        if COLUMNA_RADICADO_ORIGINAL in df.columns:
+            self._lectores['_radicado_original'] = _Lector(df[COLUMNA_RADICADO_ORIGINAL])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'HistoricoColumns':
+        return cls(df)
+
+    def _crudo(self, campo: str, posicion: int) -> str:
+        lector = self._lectores.get(campo)
+        return lector.uno(posicion) if lector is not None else ''
+
+    def valor(self, campo: str, posicion: int) -> str:
+        """Valor de un campo en una fila, con las reglas de PQRSHistorico"""
+        valor = self._crudo(campo, posicion)
+        if campo == 'numero_radicado' and not valor:
+            return self._crudo('_radicado_original', posicion)
+        if campo in CAMPOS_PRINCIPALES and not valor.strip():
+            if campo == 'nombre':
+                return self._nombre_alterno(posicion)
+            return ''
+        return valor
+
+    def _nombre_alterno(self, posicion: int) -> str:
+        """Nombre armado desde los campos individuales, como en PQRSHistorico.__post_init__"""
+        primer_nombre = self._crudo('primer_nombre', posicion)
+        primer_apellido = self._crudo('primer_apellido', posicion)
+        if primer_nombre or primer_apellido:
+            return f"{primer_nombre} {primer_apellido}".strip()
+        return self._crudo('nombre_completo', posicion)
+
+    def valores(self, campo: str, posiciones: np.ndarray) -> List[str]:
+        """Valores de un campo para varias filas (conversión por columna, sin vistas)"""
+        lector = self._lectores.get(campo)
+        if lector is None:
+            resultado = [''] * len(posiciones)
+        else:
+            resultado = lector.varios(posiciones)
+        if campo == 'numero_radicado' or campo in CAMPOS_PRINCIPALES:
+            # Solo las filas vacías pasan por las reglas de valor por defecto
+            vacias = [i for i, v in enumerate(resultado) if not v or v.isspace()]
+            for i in vacias:
+                resultado[i] = self.valor(campo, int(posiciones[i]))
+        return resultado
+
+
+class PQRSHistoricoView:
+    """Fila del histórico de solo lectura con la misma API de atributos que PQRSHistorico"""
+
+    __slots__ = ('_columnas', '_posicion')
+
+    def __init__(self, columnas: HistoricoColumns, posicion: int):
+        """Inicializa la vista"""
+        self._columnas = columnas
+        self._posicion = posicion
+
+    def to_dict(self, campos: Sequence[str] = CAMPOS) -> dict:
+        """Convierte la fila a diccionario (mismas claves y orden que PQRSHistorico.to_dict, o solo ``campos``)"""
+        return {campo: self._columnas.valor(campo, self._posicion) for campo in campos}
+
+    def to_model(self) -> PQRSHistorico:
+        """Materializa la fila como PQRSHistorico"""
+        return PQRSHistorico(**self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PQRSHistoricoView, PQRSHistorico)):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PQRSHistoricoView(numero_radicado={self.numero_radicado!r}, posicion={self._posicion})"
+
+
+def _propiedad(campo: str) -> property:
+    def leer(self: PQRSHistoricoView) -> str:
+        return self._columnas.valor(campo, self._posicion)
+    return property(leer, doc=f"Campo {campo} de la fila")
+
+
+for _campo in CAMPOS:
+    setattr(PQRSHistoricoView, _campo, _propiedad(_campo))
+
+
+class HistoricoRows(Sequence):
+    """
+    Resultado de una consulta: posiciones de fila sobre las columnas del histórico.
+
+    Opcionalmente lleva el orden del resultado para paginarlo por cursor:
+    ``ids`` es el identificador estable de cada fila en el histórico (por
+    defecto su posición) y ``claves`` la clave de orden (puntaje o valor de la
+    columna), ascendente o descendente según ``descendente``; los empates se
+    resuelven por ``ids`` ascendente. ``campos`` limita los campos que se
+    serializan (por defecto todos los del modelo).
+    """
+
+    __slots__ = ('columnas', 'posiciones', 'ids', 'claves', 'descendente', 'campos')
+
+    def __init__(self, columnas: HistoricoColumns, posiciones: Optional[np.ndarray] = None,
+                 ids: Optional[np.ndarray] = None, claves: Optional[np.ndarray] = None, descendente: bool = False,
+                 campos: Optional[Tuple[str, ...]] = None):
+        """Inicializa el resultado (sin posiciones: todas las filas en orden)"""
+        self.columnas = columnas
+        if posiciones is None:
+            posiciones = np.arange(columnas.total_rows, dtype=np.int64)
+        self.posiciones = np.asarray(posiciones, dtype=np.int64)
+        self.ids = self.posiciones if ids is None else np.asarray(ids, dtype=np.int64)
+        self.claves = claves
+        self.descendente = descendente
+        self.campos = campos or CAMPOS
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ids: Optional[np.ndarray] = None, claves: Optional[np.ndarray] = None,
+                   descendente: bool = False) -> 'HistoricoRows':
+        """Resultado sobre todas las filas de un DataFrame en su orden actual"""
+        return cls(HistoricoColumns(df.reset_index(drop=True)), ids=ids, claves=claves, descendente=descendente)
+
+    def __len__(self) -> int:
+        return len(self.posiciones)
+
+    def __getitem__(self, indice: Union[int, slice]):
+        if isinstance(indice, slice):
+            claves = self.claves[indice] if self.claves is not None else None
+            return HistoricoRows(self.columnas, self.posiciones[indice], self.ids[indice], claves, self.descendente,
+                                 self.campos)
+        return PQRSHistoricoView(self.columnas, int(self.posiciones[indice]))
+
+    def proyectar(self, campos: Optional[Sequence[str]]) -> 'HistoricoRows':
+        """Mismo resultado serializando solo ``campos`` (None: todos)"""
+        if not campos:
+            return self
+        return HistoricoRows(self.columnas, self.posiciones, self.ids, self.claves, self.descendente, tuple(campos))
+
+    def __iter__(self) -> Iterator[PQRSHistoricoView]:
+        columnas = self.columnas
+        for posicion in self.posiciones.tolist():
+            yield PQRSHistoricoView(columnas, posicion)
+
+    def to_dicts(self) -> List[dict]:
+        """Filas como diccionarios, convirtiendo columna por columna"""
+        valores = [self.columnas.valores(campo, self.posiciones) for campo in self.campos]
+        return [dict(zip(self.campos, fila)) for fila in zip(*valores)]
+
+    def to_json(self, sort_keys: bool = False, ensure_ascii: bool = True,
+                separators: Tuple[str, str] = (', ', ': ')) -> str:
+        """
+        Arreglo JSON de las filas, idéntico a ``json.dumps(self.to_dicts(), ...)``.
+
+        Cada columna se convierte a texto (nulos como '') y se codifica como
+        cadena JSON en una sola pasada; luego se unen los fragmentos fila por
+        fila, sin vistas ni diccionarios intermedios.
+        """
+        if not len(self.posiciones):
+            return '[]'
+        separador_item, separador_clave = separators
+        codificar = encode_basestring_ascii if ensure_ascii else encode_basestring
+        campos = sorted(self.campos) if sort_keys else self.campos
+        columnas = []
+        for campo in campos:
+            prefijo = codificar(campo) + separador_clave
+            columnas.append([prefijo + texto for texto in map(codificar, self.columnas.valores(campo, self.posiciones))])
+        filas = ('{' + separador_item.join(fila) + '}' for fila in zip(*columnas))
+        return '[' + separador_item.join(filas) + ']'
@@ -2,6 +2,8 @@
 Repositorios de datos del sistema TUNRAG
 """
 
-from .pqrs_repository import PQRSRepository, PromptRepository
+from .pqrs_repository import HistoricoRepository, PQRSRepository, PromptRepository
+from .sqlite_pqrs_repository import SQLitePQRSRepository
+from .repository_factory import PQRSRepositoryFactory
 
-__all__ = ['PQRSRepository', 'PromptRepository']
+__all__ = ['HistoricoRepository', 'PQRSRepository', 'PromptRepository', 'SQLitePQRSRepository', 'PQRSRepositoryFactory']
@@ -0,0 +1,122 @@
+"""
+Agregados materializados del histórico de PQRS
+
+Los conteos por clasificación, estado, unidad, barrio y mes, junto con las
+fechas mínima y máxima de radicación, se calculan una sola vez por snapshot.
+Los endpoints de estadísticas y resumen los leen desde memoria en lugar de
+recorrer el histórico completo en cada petición.
+"""
+
+from typing import Any, Dict, Optional
+import pandas as pd
+from src.indexes.date_index import DateIndex
+
+# Dimensión del agregado -> columna del histórico
+DIMENSIONES = {
+    'clasificacion': 'clasificacion',
+    'estado': 'estado_pqrs',
+    'unidad': 'unidad',
+    'barrio': 'barrio'
+}
+COLUMNA_FECHA = 'fecha_radicacion'
+
+
+class HistoricoAggregates:
+    """Conteos y rangos de fecha precalculados de un snapshot del histórico"""
+
+    def __init__(self, total_registros: int, conteos: Dict[str, Dict[str, int]], por_mes: Dict[str, int],
+                 fecha_minima: Optional[pd.Timestamp] = None, fecha_maxima: Optional[pd.Timestamp] = None):
+        """Inicializa los agregados"""
+        self.total_registros = total_registros
+        self.conteos = conteos
+        self.por_mes = por_mes
+        self.fecha_minima = fecha_minima
+        self.fecha_maxima = fecha_maxima
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'HistoricoAggregates':
+        """Calcula los agregados recorriendo el histórico una vez"""
+        conteos = {}
+        for dimension, columna in DIMENSIONES.items():
+            if columna not in df.columns:
+                continue
+            serie = df[columna].value_counts()
+            conteos[dimension] = {str(valor): int(n) for valor, n in serie[serie > 0].items()}
+
+        por_mes = {}
+        fecha_minima = fecha_maxima = None
+        if COLUMNA_FECHA in df.columns:
+            fechas = pd.to_datetime(df[COLUMNA_FECHA], errors='coerce').dropna()
+            if not fechas.empty:
+                fecha_minima, fecha_maxima = fechas.min(), fechas.max()
+                meses = fechas.dt.to_period('M').value_counts().sort_index()
+                por_mes = {str(mes): int(n) for mes, n in meses.items()}
+
+        return cls(len(df), conteos, por_mes, fecha_minima, fecha_maxima)
+
+    def updated(self, retiradas: pd.DataFrame, agregadas: pd.DataFrame,
+                fechas: Optional[DateIndex] = None) -> 'HistoricoAggregates':
+        """
+        Agregados nuevos restando las filas retiradas y sumando las agregadas.
+
+        Las filas actualizadas aparecen en ambos lados (valor anterior y nuevo).
+        Las fechas extremas se toman del índice de fechas ya actualizado si se
+        recibe; sin él solo pueden ampliarse con las filas agregadas.
+        """
+        antes = HistoricoAggregates.from_frame(retiradas)
+        despues = HistoricoAggregates.from_frame(agregadas)
+
+        def combinar(actual: Dict[str, int], resta: Dict[str, int], suma: Dict[str, int]) -> Dict[str, int]:
+            conteos = dict(actual)
+            for valor, n in resta.items():
+                conteos[valor] = conteos.get(valor, 0) - n
+            for valor, n in suma.items():
+                conteos[valor] = conteos.get(valor, 0) + n
+            return {valor: n for valor, n in conteos.items() if n > 0}
+
+        conteos = {}
+        for dimension, actual in self.conteos.items():
+            combinados = combinar(actual, antes.conteos.get(dimension, {}), despues.conteos.get(dimension, {}))
+            conteos[dimension] = dict(sorted(combinados.items(), key=lambda item: -item[1]))
+        por_mes = dict(sorted(combinar(self.por_mes, antes.por_mes, despues.por_mes).items()))
+
+        total = self.total_registros - len(retiradas) + len(agregadas)
+        if fechas is not None:
+            return HistoricoAggregates(total, conteos, por_mes, fechas.min, fechas.max)
+        fechas_minimas = [f for f in (self.fecha_minima, despues.fecha_minima) if f is not None]
+        fechas_maximas = [f for f in (self.fecha_maxima, despues.fecha_maxima) if f is not None]
+        return HistoricoAggregates(
+            total, conteos, por_mes,
+            min(fechas_minimas) if fechas_minimas else None,
+            max(fechas_maximas) if fechas_maximas else None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Agregados serializables en JSON (fechas en ISO 8601)"""
+        return {
+            'total_registros': self.total_registros,
+            'conteos': self.conteos,
+            'por_mes': self.por_mes,
+            'fecha_minima': self.fecha_minima.isoformat() if self.fecha_minima is not None else None,
+            'fecha_maxima': self.fecha_maxima.isoformat() if self.fecha_maxima is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, datos: Dict[str, Any]) -> 'HistoricoAggregates':
+        """Reconstruye los agregados guardados con ``to_dict``"""
+        return cls(
+            datos['total_registros'], datos['conteos'], datos['por_mes'],
+            pd.Timestamp(datos['fecha_minima']) if datos.get('fecha_minima') else None,
+            pd.Timestamp(datos['fecha_maxima']) if datos.get('fecha_maxima') else None
+        )
+
+    def tiene(self, dimension: str) -> bool:
+        """Indica si la columna de la dimensión existe en el histórico"""
+        return dimension in self.conteos
+
+    def por(self, dimension: str, limite: int = None) -> Dict[str, int]:
+        """Conteos de una dimensión ordenados de mayor a menor (copia)"""
+        conteos = self.conteos.get(dimension, {})
+        if limite:
+            return dict(list(conteos.items())[:limite])
+        return dict(conteos)
@@ -0,0 +1,249 @@
+"""
+Caché columnar en disco del histórico de PQRS
+
+Guarda el histórico ya normalizado en formato Arrow IPC (o Parquet),
+identificado por el tamaño, la fecha de modificación y el hash de contenido
+del Excel de origen. Los arranques posteriores cargan el snapshot
+directamente y solo vuelven a leer el Excel cuando el archivo fuente cambia.
+
+El archivo Arrow IPC se abre mapeado en memoria: las columnas del DataFrame
+apuntan a las páginas del archivo sin copiarlas, de modo que varios procesos
+(workers del servidor WSGI) comparten una sola copia de los datos en la
+caché de páginas del sistema operativo.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any
+import numpy as np
+import pandas as pd
+from src.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+
+class HistoricoSnapshotCache:
+    """Caché de snapshots normalizados del histórico en formato Arrow IPC (o Parquet)"""
+
+    # Incrementar cuando cambie la normalización para invalidar snapshots viejos
+    SCHEMA_VERSION = 4
+    META_FILE = 'historico.meta.json'
+    LOCK_FILE = 'historico.lock'
+    HASH_CHUNK_SIZE = 1024 * 1024
+    FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+    def __init__(self, cache_dir: Path, enabled: bool = True, format: str = 'arrow'):
+        """Inicializa la caché de snapshots"""
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled and PYARROW_AVAILABLE
+        if enabled and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow no está instalado: caché columnar del histórico deshabilitada")
+        if format not in self.FORMATS:
+            logger.warning(f"Formato de caché del histórico desconocido '{format}': se usará arrow")
+            format = 'arrow'
+        self.format = format
+
+    @property
+    def memory_mapped(self) -> bool:
+        """Indica si los snapshots cargados comparten las páginas del archivo (Arrow IPC)"""
+        return self.enabled and self.format == 'arrow'
+
+    @property
+    def meta_path(self) -> Path:
+        return self.cache_dir / self.META_FILE
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        """Lee los metadatos del snapshot vigente"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Metadatos de caché del histórico ilegibles: {e}")
+            return None
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        """Escribe los metadatos de forma atómica"""
+        tmp_path = self.meta_path.with_name(f"{self.META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    def compute_source_key(self, source_path: Path) -> Dict[str, Any]:
+        """
+        Calcula la llave del archivo fuente (tamaño, mtime y hash de contenido).
+
+        Si el tamaño y el mtime coinciden con el snapshot vigente se reutiliza
+        el hash registrado para no releer el archivo completo en cada arranque.
+        """
+        stat = Path(source_path).stat()
+        key = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': None
+        }
+
+        meta = self._read_meta() if self.enabled else None
+        if meta and meta.get('size') == key['size'] and meta.get('mtime_ns') == key['mtime_ns']:
+            key['sha256'] = meta.get('sha256')
+        else:
+            key['sha256'] = self._hash_file(source_path)
+        return key
+
+    def _hash_file(self, path: Path) -> str:
+        """Hash SHA-256 del contenido del archivo"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _snapshot_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"historico-{sha256[:16]}-v{self.SCHEMA_VERSION}{self.FORMATS[self.format]}"
+
+    @staticmethod
+    def _read_snapshot(path: Path) -> pd.DataFrame:
+        """
+        Lee el snapshot; los archivos Arrow IPC se mapean en memoria sin copiar las columnas.
+        
+        El texto se expone con el dtype de texto respaldado por Arrow (el mismo que
+        usa pandas 3 por defecto), de modo que las columnas siguen apuntando a las
+        páginas del archivo en lugar de convertirse a objetos de Python.
+        """
+        texto = pd.StringDtype('pyarrow', na_value=np.nan)
+        tipos = {pa.string(): texto, pa.large_string(): texto}
+        if path.suffix == '.arrow':
+            table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+            return table.to_pandas(split_blocks=True, types_mapper=tipos.get)
+        return pyarrow.parquet.read_table(path).to_pandas(split_blocks=True, types_mapper=tipos.get)
+
+    def _write_snapshot(self, data, path: Path):
+        """Escribe el snapshot (DataFrame o tabla Arrow) en el formato configurado"""
+        table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+        if self.format == 'arrow':
+            with pa.OSFile(str(path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            pyarrow.parquet.write_table(table, path)
+
+    @contextmanager
+    def build_lock(self):
+        """
+        Bloqueo entre procesos para construir el snapshot una sola vez.
+
+        Con varios workers arrancando a la vez, solo uno lee el Excel; los demás
+        esperan y luego cargan el snapshot que ese worker dejó en disco.
+        """
+        if not self.enabled or fcntl is None:
+            yield
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / self.LOCK_FILE, 'a+') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, source_key: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Carga el snapshot si corresponde a la llave del archivo fuente"""
+        if not self.enabled:
+            return None
+
+        meta = self._read_meta()
+        if not meta:
+            return None
+        if meta.get('schema_version') != self.SCHEMA_VERSION or meta.get('sha256') != source_key['sha256']:
+            logger.info("Snapshot del histórico desactualizado: se recargará desde Excel")
+            return None
+
+        snapshot_path = self.cache_dir / meta.get('snapshot_file', '')
+        if not snapshot_path.is_file():
+            return None
+
+        try:
+            df = self._read_snapshot(snapshot_path)
+        except Exception as e:
+            logger.warning(f"No se pudo leer el snapshot del histórico {snapshot_path}: {e}")
+            return None
+
+        # El contenido es el mismo aunque el archivo se haya copiado o tocado
+        if meta.get('size') != source_key['size'] or meta.get('mtime_ns') != source_key['mtime_ns']:
+            try:
+                self._write_meta({**meta, 'size': source_key['size'], 'mtime_ns': source_key['mtime_ns']})
+            except Exception as e:
+                logger.warning(f"No se pudieron actualizar metadatos de caché: {e}")
+
+        return df
+
+    def store(self, df, source_key: Dict[str, Any]) -> bool:
+        """Guarda el snapshot normalizado (DataFrame o tabla Arrow) y reemplaza el anterior"""
+        if not self.enabled:
+            return False
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            snapshot_path = self._snapshot_path(source_key['sha256'])
+            tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+            self._write_snapshot(df, tmp_path)
+            os.replace(tmp_path, snapshot_path)
+
+            previous = self._read_meta()
+            self._write_meta({
+                'schema_version': self.SCHEMA_VERSION,
+                'size': source_key['size'],
+                'mtime_ns': source_key['mtime_ns'],
+                'sha256': source_key['sha256'],
+                'snapshot_file': snapshot_path.name,
+                'registros': len(df)
+            })
+
+            # Eliminar snapshot anterior si es otro archivo (los procesos que aún lo
+            # tengan mapeado conservan sus páginas hasta soltarlo)
+            if previous and previous.get('snapshot_file') and previous['snapshot_file'] != snapshot_path.name:
+                try:
+                    (self.cache_dir / previous['snapshot_file']).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar el snapshot anterior del histórico: {e}")
+
+            logger.info(f"Snapshot columnar del histórico guardado: {snapshot_path.name}")
+            return True
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el snapshot del histórico: {e}")
+            return False
+
+    @staticmethod
+    def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Deja el DataFrame en tipos representables en columnas Parquet.
+
+        Las columnas de Excel con tipos mezclados (números y texto en la misma
+        columna) se convierten a texto, que es como las expone PQRSHistorico.
+        """
+        df.columns = [str(col) for col in df.columns]
+        for col in df.columns:
+            series = df[col]
+            if series.dtype != object:
+                continue
+            valores = series.dropna()
+            if valores.empty:
+                continue
+            if not valores.map(type).eq(str).all():
+                df[col] = series.map(lambda v: v if pd.isna(v) or isinstance(v, str) else str(v))
+        return df
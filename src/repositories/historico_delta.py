@@ -0,0 +1,99 @@
+"""
+Ingesta incremental del histórico de PQRS
+
+Cada fila del histórico se identifica por su número de radicado (con el
+número de ocurrencia para los radicados repetidos) y una huella hash de las
+columnas que cambian en el día a día: el estado y el seguimiento. Al comparar
+la fuente nueva contra el snapshot vigente solo se aplican las filas
+insertadas y las actualizadas; el resto del histórico y sus índices se
+reutilizan tal cual.
+"""
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+from src.indexes.radicado_index import normalizar_radicado
+
+# Columnas cuya modificación se detecta en las filas ya existentes
+COLUMNAS_FIRMA = ('estado_pqrs', 'seguimiento')
+
+
+class FirmasHistorico:
+    """Llave de radicado y huella de estado/seguimiento de cada fila, en orden de fila"""
+
+    def __init__(self, llaves: pd.Index, huellas: np.ndarray):
+        """Inicializa las firmas"""
+        self.llaves = llaves
+        self.huellas = huellas
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'FirmasHistorico':
+        """Calcula las firmas de todas las filas del DataFrame"""
+        if 'numero_radicado' in df.columns:
+            radicados = df['numero_radicado'].map(normalizar_radicado).fillna('')
+        else:
+            radicados = pd.Series('', index=df.index)
+        ocurrencia = radicados.groupby(radicados, sort=False).cumcount()
+        llaves = pd.Index(radicados.astype(str) + '#' + ocurrencia.astype(str))
+
+        columnas = [c for c in COLUMNAS_FIRMA if c in df.columns]
+        if columnas:
+            valores = df[columnas].astype('string').fillna('')
+            huellas = pd.util.hash_pandas_object(valores, index=False).to_numpy()
+        else:
+            huellas = np.zeros(len(df), dtype=np.uint64)
+        return cls(llaves, huellas)
+
+    def __len__(self) -> int:
+        return len(self.llaves)
+
+
+class DeltaHistorico:
+    """Filas insertadas y actualizadas de la fuente nueva respecto al snapshot vigente"""
+
+    def __init__(self, actualizadas: np.ndarray, origen_actualizadas: np.ndarray,
+                 origen_insertadas: np.ndarray, firmas: FirmasHistorico):
+        """
+        Args:
+            actualizadas: posiciones en el snapshot vigente con estado o seguimiento distinto
+            origen_actualizadas: posiciones de esas mismas filas en la fuente nueva
+            origen_insertadas: posiciones en la fuente nueva de las filas sin par en el snapshot
+            firmas: firmas del snapshot resultante (filas vigentes seguidas de las insertadas)
+        """
+        self.actualizadas = actualizadas
+        self.origen_actualizadas = origen_actualizadas
+        self.origen_insertadas = origen_insertadas
+        self.firmas = firmas
+
+    @property
+    def total(self) -> int:
+        return len(self.actualizadas) + len(self.origen_insertadas)
+
+    @classmethod
+    def calcular(cls, vigentes: FirmasHistorico, nuevas: FirmasHistorico) -> Optional['DeltaHistorico']:
+        """
+        Compara las firmas de la fuente nueva contra las del snapshot vigente.
+
+        Returns:
+            El delta, o None si la fuente nueva eliminó filas del snapshot (en
+            ese caso las posiciones cambian y se requiere una reconstrucción completa)
+        """
+        posiciones = vigentes.llaves.get_indexer(nuevas.llaves)
+        existentes = posiciones >= 0
+        if int(existentes.sum()) != len(vigentes):
+            return None
+
+        origen_existentes = np.flatnonzero(existentes)
+        cambiadas = nuevas.huellas[origen_existentes] != vigentes.huellas[posiciones[origen_existentes]]
+        origen_actualizadas = origen_existentes[cambiadas]
+        actualizadas = posiciones[origen_actualizadas]
+        origen_insertadas = np.flatnonzero(~existentes)
+
+        huellas = vigentes.huellas.copy()
+        huellas[actualizadas] = nuevas.huellas[origen_actualizadas]
+        firmas = FirmasHistorico(
+            vigentes.llaves.append(nuevas.llaves[origen_insertadas]),
+            np.concatenate([huellas, nuevas.huellas[origen_insertadas]])
+        )
+        orden = np.argsort(actualizadas, kind='stable')
+        return cls(actualizadas[orden], origen_actualizadas[orden], origen_insertadas, firmas)
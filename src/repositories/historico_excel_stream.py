@@ -0,0 +1,194 @@
+"""
+Ingesta en streaming del Excel del histórico de PQRS
+
+Recorre la hoja con el iterador de filas de openpyxl en modo solo lectura y
+entrega lotes acotados de filas con la misma inferencia de tipos que
+``pd.read_excel``. Cada lote ya normalizado se convierte a columnas Arrow y
+se acumula; al final se unifican los tipos entre lotes y se codifican las
+columnas categóricas. El pico de memoria queda en el tamaño final del
+histórico más un lote, en lugar de varias copias del libro completo.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+import pandas as pd
+from pandas.io.parsers import TextParser
+from src.utils.logger import logger
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+STREAMING_AVAILABLE = OPENPYXL_AVAILABLE and PYARROW_AVAILABLE
+
+
+def _convertir_celda(valor):
+    """Mismo criterio que el lector openpyxl de pandas: vacías como '' y números enteros como int"""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def texto_celda(valor) -> str:
+    """Representación de texto de un valor en una columna con tipos mezclados"""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+class HistoricoExcelStream:
+    """Lector por lotes de la primera hoja del Excel del histórico"""
+
+    def __init__(self, path: Path, chunk_rows: int = 5000):
+        """Inicializa el lector"""
+        self.path = Path(path)
+        self.chunk_rows = max(1, int(chunk_rows))
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Lotes de hasta ``chunk_rows`` filas con los encabezados del Excel"""
+        libro = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            hoja = libro.worksheets[0]
+            hoja.reset_dimensions()
+            filas = hoja.iter_rows(values_only=True)
+
+            encabezado = None
+            for fila in filas:
+                encabezado = [_convertir_celda(v) for v in fila]
+                while encabezado and encabezado[-1] == '':
+                    encabezado.pop()
+                if encabezado:
+                    break
+            if not encabezado:
+                return
+
+            ancho = len(encabezado)
+            descartadas = 0
+            lote: List[list] = []
+            for fila in filas:
+                valores = [_convertir_celda(v) for v in fila]
+                if len(valores) > ancho:
+                    if any(v != '' for v in valores[ancho:]):
+                        descartadas += 1
+                    valores = valores[:ancho]
+                lote.append(valores + [''] * (ancho - len(valores)))
+                if len(lote) >= self.chunk_rows:
+                    yield self._parse(encabezado, lote)
+                    lote = []
+            if lote:
+                yield self._parse(encabezado, lote)
+
+            if descartadas:
+                logger.warning(f"{descartadas} filas del histórico tienen valores fuera de las columnas con encabezado")
+        finally:
+            libro.close()
+
+    @staticmethod
+    def _parse(encabezado: list, filas: List[list]) -> pd.DataFrame:
+        """Convierte un lote de filas a DataFrame con el mismo parser que usa read_excel"""
+        return TextParser([encabezado] + filas, header=0).read()
+
+
+class HistoricoColumnarBuilder:
+    """Acumula lotes normalizados como columnas Arrow y arma la tabla final"""
+
+    def __init__(self):
+        """Inicializa el acumulador"""
+        self._lotes: List['pa.Table'] = []
+        self._columnas: List[str] = []
+
+    def append(self, df: pd.DataFrame):
+        """Agrega un lote ya normalizado (sus columnas deben coincidir con las de los lotes previos)"""
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        if not self._lotes:
+            self._columnas = list(tabla.column_names)
+        elif tabla.column_names != self._columnas:
+            raise ValueError("Las columnas del lote no coinciden con las del histórico")
+        self._lotes.append(tabla)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(tabla.num_rows for tabla in self._lotes)
+
+    def build(self, categorical_columns: Sequence[str] = (), max_ratio: float = 0.5) -> 'pa.Table':
+        """
+        Tabla final con tipos unificados entre lotes.
+
+        Los lotes solo numéricos (enteros y decimales) se unifican a decimal; si
+        algún lote trae texto la columna completa pasa a texto, como hace
+        ``prepare_frame`` con las columnas de tipos mezclados. Las columnas
+        categóricas con pocos valores distintos se codifican como diccionario
+        con las categorías ordenadas, igual que ``astype('category')``.
+        """
+        columnas: Dict[str, 'pa.ChunkedArray'] = {}
+        for nombre in self._columnas:
+            partes = [tabla.column(nombre) for tabla in self._lotes]
+            self._lotes = [tabla.drop_columns([nombre]) for tabla in self._lotes]
+            columnas[nombre] = self._unificar(nombre, partes)
+        self._lotes = []
+
+        total = len(next(iter(columnas.values()))) if columnas else 0
+        for nombre in categorical_columns:
+            if nombre not in columnas:
+                continue
+            columna = columnas[nombre].combine_chunks()
+            distintos = pc.count_distinct(columna, mode='only_valid').as_py()
+            if total and distintos > total * max_ratio:
+                logger.info(f"Columna {nombre} no se codifica: {distintos} valores distintos")
+                continue
+            categorias = pc.unique(columna).drop_null()
+            categorias = categorias.take(pc.array_sort_indices(categorias))
+            codigos = pc.index_in(columna, value_set=categorias)
+            tipo = pa.int8() if len(categorias) < 2 ** 7 else pa.int16() if len(categorias) < 2 ** 15 else pa.int32()
+            columnas[nombre] = pa.chunked_array([pa.DictionaryArray.from_arrays(codigos.cast(tipo), categorias)])
+            logger.info(f"Columna categórica: {nombre} ({distintos} categorías)")
+
+        return pa.table(columnas)
+
+    @staticmethod
+    def tipo_comun(tipos: Iterable['pa.DataType']) -> 'pa.DataType':
+        """
+        Tipo común de una columna a partir de los tipos de sus lotes.
+
+        Solo números: decimal; solo fechas: timestamp; cualquier otra mezcla: texto.
+        """
+        tipos = {tipo for tipo in tipos if not pa.types.is_null(tipo)}
+        if not tipos:
+            return pa.null()
+        if len(tipos) == 1:
+            return tipos.pop()
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in tipos):
+            return pa.float64()
+        if all(pa.types.is_timestamp(t) for t in tipos):
+            return pa.timestamp('ns')
+        return pa.large_string()
+
+    @staticmethod
+    def _unificar(nombre: str, partes: List['pa.ChunkedArray']) -> 'pa.ChunkedArray':
+        """Une las partes de una columna llevándolas a un tipo común"""
+        destino = HistoricoColumnarBuilder.tipo_comun(parte.type for parte in partes)
+        if pa.types.is_null(destino):
+            return pa.chunked_array([c for parte in partes for c in parte.chunks], type=pa.null())
+
+        chunks = []
+        for parte in partes:
+            if parte.type == destino:
+                chunks.extend(parte.chunks)
+            elif destino == pa.large_string() and not pa.types.is_null(parte.type) \
+                    and not pa.types.is_string(parte.type) and not pa.types.is_large_string(parte.type):
+                textos = [None if v is None or v != v else texto_celda(v) for v in parte.to_pylist()]
+                chunks.append(pa.array(textos, type=destino))
+            else:
+                chunks.extend(parte.cast(destino).chunks)
+        return pa.chunked_array(chunks, type=destino)
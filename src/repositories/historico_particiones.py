@@ -0,0 +1,302 @@
+"""
+Particiones por mes del histórico de PQRS
+
+Guarda el histórico normalizado como un archivo Arrow IPC por mes de
+radicación (más uno para los registros sin fecha) y un manifiesto con la
+cantidad de registros y los rangos de radicados numéricos de cada
+partición, además de los agregados del histórico completo. Con el
+manifiesto se descartan de antemano las particiones que no pueden contener
+filas de una consulta por fechas o por radicado: solo las restantes se
+abren (mapeadas en memoria) y se unen en un snapshot parcial. Las
+particiones frías quedan en disco hasta que una consulta las necesita.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.indexes.radicado_index import normalizar_radicado
+from src.repositories.historico_aggregates import COLUMNA_FECHA, HistoricoAggregates
+from src.repositories.historico_snapshot import HistoricoSnapshot
+from src.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFIESTO = 'particiones.json'
+SIN_FECHA = 'sin_fecha'
+# Posición de cada fila en el histórico completo (restaura el orden al unir particiones)
+COL_POSICION = '__posicion'
+
+
+def _radicado_numerico(texto: Optional[str]) -> bool:
+    """Mismo criterio que RadicadoIndex para indexar un radicado como número"""
+    return bool(texto) and texto.isdigit() and texto[0] != '0' and len(texto) <= 18
+
+
+def _rangos_radicados(radicados: Iterable) -> Tuple[Dict[str, List[int]], bool]:
+    """Radicado numérico mínimo y máximo por longitud, y si hay radicados no numéricos"""
+    rangos: Dict[str, List[int]] = {}
+    otros = False
+    for valor in radicados:
+        texto = normalizar_radicado(valor)
+        if texto is None:
+            continue
+        if not _radicado_numerico(texto):
+            otros = True
+            continue
+        numero, longitud = int(texto), str(len(texto))
+        actual = rangos.get(longitud)
+        rangos[longitud] = [numero, numero] if actual is None else [min(actual[0], numero), max(actual[1], numero)]
+    return rangos, otros
+
+
+class HistoricoParticiones:
+    """Particiones publicadas de una versión del histórico, con los snapshots parciales ya cargados"""
+
+    def __init__(self, directorio: Path, meta: Dict[str, Any], max_cargadas: int = 8):
+        """
+        Args:
+            directorio: carpeta con los archivos de las particiones
+            meta: manifiesto de la versión
+            max_cargadas: snapshots parciales (combinaciones de particiones) que se conservan en memoria
+        """
+        self.directorio = Path(directorio)
+        self.meta = meta
+        self.max_cargadas = max(1, int(max_cargadas))
+        self._cargadas: 'OrderedDict[Tuple[str, ...], HistoricoSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        return self.meta['version']
+
+    @property
+    def sha256(self) -> str:
+        return self.meta['sha256']
+
+    @property
+    def claves(self) -> List[str]:
+        """Claves de todas las particiones ('YYYY-MM' y 'sin_fecha')"""
+        return [particion['clave'] for particion in self.meta['particiones']]
+
+    @property
+    def cargadas(self) -> List[Tuple[str, ...]]:
+        """Combinaciones de particiones con snapshot en memoria (de la menos a la más reciente en uso)"""
+        with self._lock:
+            return list(self._cargadas)
+
+    def agregados(self) -> HistoricoAggregates:
+        """Agregados del histórico completo guardados en el manifiesto"""
+        return HistoricoAggregates.from_dict(self.meta['agregados'])
+
+    # Escritura y apertura
+
+    @staticmethod
+    def _leer_manifiesto(base_dir: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(Path(base_dir) / MANIFIESTO, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Manifiesto de particiones del histórico ilegible: {e}")
+            return None
+
+    @classmethod
+    def abrir(cls, base_dir: Path, sha256: str, schema: str, max_cargadas: int = 8) -> Optional['HistoricoParticiones']:
+        """Particiones vigentes si corresponden al archivo fuente y al esquema (None si hay que construirlas)"""
+        meta = cls._leer_manifiesto(base_dir)
+        if not meta or meta.get('sha256') != sha256 or meta.get('schema') != schema:
+            return None
+        directorio = Path(base_dir) / meta['directorio']
+        if not all((directorio / p['archivo']).is_file() for p in meta['particiones']):
+            return None
+        return cls(directorio, meta, max_cargadas)
+
+    @classmethod
+    def escribir(cls, base_dir: Path, df: pd.DataFrame, source_key: Dict[str, Any], schema: str,
+                 max_cargadas: int = 8) -> 'HistoricoParticiones':
+        """
+        Escribe el histórico normalizado como particiones por mes y publica el manifiesto.
+
+        Los archivos se escriben en una carpeta temporal que se renombra al
+        terminar; el manifiesto se reemplaza de forma atómica y la versión
+        anterior se elimina (los procesos que aún la tengan mapeada conservan
+        sus páginas hasta soltarlas).
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow no está instalado: no se pueden escribir particiones del histórico")
+
+        base_dir = Path(base_dir)
+        version = source_key['sha256'][:16]
+        nombre = f"historico-{version}-v{schema}"
+        destino = base_dir / nombre
+        tmp_dir = base_dir / f"{nombre}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        columna_fecha = COLUMNA_FECHA if COLUMNA_FECHA in df.columns and \
+            pd.api.types.is_datetime64_any_dtype(df[COLUMNA_FECHA]) else None
+        if columna_fecha:
+            meses = df[columna_fecha].dt.strftime('%Y-%m').fillna(SIN_FECHA)
+        else:
+            meses = pd.Series(SIN_FECHA, index=df.index)
+        grupos = meses.groupby(meses.to_numpy(dtype=object), sort=True).indices
+
+        particiones = []
+        try:
+            for clave in sorted(grupos, key=lambda c: (c == SIN_FECHA, c)):
+                posiciones = np.asarray(grupos[clave], dtype=np.int64)
+                parte = df.iloc[posiciones].reset_index(drop=True)
+                parte[COL_POSICION] = posiciones
+                archivo = f"{clave}.arrow"
+                tabla = pa.Table.from_pandas(parte, preserve_index=False)
+                with pa.OSFile(str(tmp_dir / archivo), 'wb') as sink:
+                    with pa.ipc.new_file(sink, tabla.schema) as writer:
+                        writer.write_table(tabla)
+                radicados = parte['numero_radicado'].tolist() if 'numero_radicado' in parte.columns else []
+                rangos, otros = _rangos_radicados(radicados)
+                particiones.append({
+                    'clave': clave,
+                    'archivo': archivo,
+                    'registros': len(posiciones),
+                    'radicados': rangos,
+                    'radicados_otros': otros
+                })
+            shutil.rmtree(destino, ignore_errors=True)
+            os.replace(tmp_dir, destino)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        meta = {
+            'schema': schema,
+            'sha256': source_key['sha256'],
+            'version': version,
+            'directorio': nombre,
+            'registros': len(df),
+            'columnas': [str(c) for c in df.columns],
+            'columna_fecha': columna_fecha,
+            'particiones': particiones,
+            'agregados': HistoricoAggregates.from_frame(df).to_dict()
+        }
+        anterior = cls._leer_manifiesto(base_dir)
+        tmp_meta = base_dir / f"{MANIFIESTO}.{os.getpid()}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_meta, base_dir / MANIFIESTO)
+
+        if anterior and anterior.get('directorio') and anterior['directorio'] != nombre:
+            shutil.rmtree(base_dir / anterior['directorio'], ignore_errors=True)
+
+        logger.info(f"Histórico particionado por mes: {len(df)} registros en {len(particiones)} particiones")
+        return cls(destino, meta, max_cargadas)
+
+    # Poda de particiones
+
+    def podar(self, fecha_inicio: Optional[pd.Timestamp] = None, fecha_fin: Optional[pd.Timestamp] = None,
+              radicados: Optional[Iterable] = None, prefijo: Optional[str] = None,
+              rango_radicados: Optional[Tuple[Any, Any]] = None) -> List[str]:
+        """
+        Claves de las particiones que pueden contener filas que cumplan todos los criterios dados.
+
+        Args:
+            fecha_inicio: fecha de radicación mínima (las filas sin fecha quedan fuera)
+            fecha_fin: fecha de radicación máxima (opcional, solo con ``fecha_inicio``)
+            radicados: radicados exactos buscados
+            prefijo: prefijo de radicado
+            rango_radicados: (inicio, fin) de radicados numéricos
+        """
+        particiones = self.meta['particiones']
+
+        if fecha_inicio is not None and self.meta.get('columna_fecha'):
+            desde = fecha_inicio.strftime('%Y-%m')
+            hasta = fecha_fin.strftime('%Y-%m') if fecha_fin is not None else None
+            particiones = [p for p in particiones if p['clave'] != SIN_FECHA and p['clave'] >= desde
+                           and (hasta is None or p['clave'] <= hasta)]
+
+        if radicados is not None:
+            textos = [t for t in (normalizar_radicado(r) for r in radicados) if t is not None]
+            particiones = [p for p in particiones if any(self._contiene_radicado(p, t) for t in textos)]
+
+        if prefijo is not None:
+            texto = normalizar_radicado(prefijo)
+            particiones = [p for p in particiones if texto is not None and self._contiene_prefijo(p, texto)]
+
+        if rango_radicados is not None:
+            inicio, fin = (normalizar_radicado(r) for r in rango_radicados)
+            if not (inicio and fin and inicio.isdigit() and fin.isdigit()):
+                return []
+            desde, hasta = int(inicio), int(fin)
+            particiones = [p for p in particiones
+                           if any(minimo <= hasta and maximo >= desde for minimo, maximo in p['radicados'].values())]
+
+        return [p['clave'] for p in particiones]
+
+    @staticmethod
+    def _contiene_radicado(particion: Dict[str, Any], texto: str) -> bool:
+        if not _radicado_numerico(texto):
+            return particion['radicados_otros']
+        rango = particion['radicados'].get(str(len(texto)))
+        return rango is not None and rango[0] <= int(texto) <= rango[1]
+
+    @staticmethod
+    def _contiene_prefijo(particion: Dict[str, Any], prefijo: str) -> bool:
+        if particion['radicados_otros']:
+            return True
+        if not (prefijo.isdigit() and prefijo[0] != '0'):
+            return False
+        base = int(prefijo)
+        for longitud, (minimo, maximo) in particion['radicados'].items():
+            escala = int(longitud) - len(prefijo)
+            if escala < 0:
+                continue
+            if minimo < (base + 1) * 10 ** escala and maximo >= base * 10 ** escala:
+                return True
+        return False
+
+    # Lectura
+
+    def _leer(self, clave: str) -> pd.DataFrame:
+        """Partición mapeada en memoria (las columnas apuntan a las páginas del archivo)"""
+        archivo = next(p['archivo'] for p in self.meta['particiones'] if p['clave'] == clave)
+        tabla = pa.ipc.open_file(pa.memory_map(str(self.directorio / archivo), 'r')).read_all()
+        return tabla.to_pandas(split_blocks=True)
+
+    def frame(self, claves: Sequence[str]) -> pd.DataFrame:
+        """Filas de las particiones indicadas en el orden del histórico completo"""
+        if not self.meta['particiones']:
+            return pd.DataFrame(columns=self.meta['columnas'])
+        partes = [self._leer(clave) for clave in claves] or [self._leer(self.claves[0]).iloc[:0]]
+        df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        posiciones = df.pop(COL_POSICION).to_numpy()
+        if len(posiciones) > 1 and not (np.diff(posiciones) > 0).all():
+            df = df.take(np.argsort(posiciones, kind='stable')).reset_index(drop=True)
+        return df
+
+    def snapshot(self, claves: Sequence[str]) -> HistoricoSnapshot:
+        """Snapshot parcial sobre esas particiones (conserva los últimos usados con sus índices)"""
+        clave = tuple(sorted(claves))
+        with self._lock:
+            snapshot = self._cargadas.get(clave)
+            if snapshot is not None:
+                self._cargadas.move_to_end(clave)
+                return snapshot
+
+        snapshot = HistoricoSnapshot(self.frame(clave), source='particiones', version=self.version)
+        with self._lock:
+            snapshot = self._cargadas.setdefault(clave, snapshot)
+            self._cargadas.move_to_end(clave)
+            while len(self._cargadas) > self.max_cargadas:
+                self._cargadas.popitem(last=False)
+        logger.debug(f"Particiones del histórico cargadas: {', '.join(clave) or 'ninguna'} ({len(snapshot)} registros)")
+        return snapshot
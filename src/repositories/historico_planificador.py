@@ -0,0 +1,199 @@
+"""
+Planificador de filtros de la consulta avanzada del histórico
+
+Cada filtro de la consulta se convierte en un paso con una estimación de
+cuántas filas deja pasar, tomada de las estadísticas de los índices del
+snapshot (conteos por categoría de los bitmaps, rangos del índice de
+fechas y de radicados, postings de trigramas). Los pasos se ejecutan del
+más selectivo al menos selectivo sobre conjuntos de posiciones de fila: el
+primero produce los candidatos y los siguientes solo los reducen. Los
+filtros sin índice (texto libre en todas las columnas, radicado no
+numérico) van al final y solo recorren los candidatos que quedan. El
+DataFrame del snapshot nunca se copia.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from src.repositories.historico_snapshot import HistoricoSnapshot
+from src.utils.logger import logger
+
+# Costo relativo de los filtros que recorren filas (los indexados no tienen costo de recorrido)
+COSTO_INDICE = 0
+COSTO_COLUMNA = 1
+COSTO_TODAS_LAS_COLUMNAS = 2
+
+
+class FiltroPlanificado:
+    """Paso del plan: un filtro con su estimación de filas y su evaluación sobre candidatos"""
+
+    def __init__(self, nombre: str, estimacion: int, costo: int,
+                 evaluar: Callable[[Optional[np.ndarray]], np.ndarray]):
+        """
+        Args:
+            nombre: filtro de la consulta (para registro)
+            estimacion: filas que se espera que cumplan el filtro (cota superior)
+            costo: costo relativo de evaluarlo (COSTO_*)
+            evaluar: candidatos ordenados (None: todas las filas) -> posiciones ordenadas que lo cumplen
+        """
+        self.nombre = nombre
+        self.estimacion = estimacion
+        self.costo = costo
+        self.evaluar = evaluar
+
+    def __repr__(self) -> str:
+        return f"{self.nombre}(~{self.estimacion})"
+
+
+def _interseccion(candidatos: Optional[np.ndarray], posiciones: np.ndarray) -> np.ndarray:
+    """Posiciones (ordenadas) del índice restringidas a los candidatos"""
+    posiciones = np.sort(posiciones)
+    if candidatos is None:
+        return posiciones
+    return np.intersect1d(candidatos, posiciones, assume_unique=True)
+
+
+class PlanificadorFiltros:
+    """Arma y ejecuta el plan de filtros de la consulta avanzada sobre un snapshot"""
+
+    def __init__(self, snapshot: HistoricoSnapshot, filtros_categoricos: Dict[str, str]):
+        """
+        Args:
+            snapshot: snapshot del histórico con sus índices
+            filtros_categoricos: nombre del filtro -> columna categórica
+        """
+        self.snapshot = snapshot
+        self.filtros_categoricos = filtros_categoricos
+
+    def planificar(self, filtros: Dict) -> List[FiltroPlanificado]:
+        """Pasos del plan ordenados por costo y selectividad estimada"""
+        total = len(self.snapshot)
+        pasos: List[FiltroPlanificado] = []
+
+        if filtros.get('radicado'):
+            pasos.append(self._paso_radicado(str(filtros['radicado']).strip(), total))
+
+        if filtros.get('nombre'):
+            pasos.append(self._paso_trigramas('nombre', 'nombre', filtros['nombre']))
+
+        if filtros.get('fecha_inicio'):
+            paso = self._paso_fecha(filtros['fecha_inicio'], filtros.get('fecha_fin'))
+            if paso is not None:
+                pasos.append(paso)
+
+        for filtro, columna in self.filtros_categoricos.items():
+            if filtros.get(filtro):
+                pasos.append(self._paso_categoria(filtro, columna, filtros[filtro]))
+
+        if filtros.get('texto'):
+            pasos.append(FiltroPlanificado('texto', total, COSTO_TODAS_LAS_COLUMNAS,
+                                           lambda candidatos, texto=filtros['texto']: self._filtrar_texto(texto, candidatos)))
+
+        pasos.sort(key=lambda paso: (paso.costo, paso.estimacion))
+        return pasos
+
+    def ejecutar(self, filtros: Dict) -> np.ndarray:
+        """Posiciones ordenadas de las filas que cumplen todos los filtros"""
+        pasos = self.planificar(filtros)
+        logger.debug(f"Plan de consulta avanzada: {pasos}")
+
+        candidatos: Optional[np.ndarray] = None
+        for paso in pasos:
+            candidatos = paso.evaluar(candidatos)
+            if len(candidatos) == 0:
+                break
+        if candidatos is None:
+            return np.arange(len(self.snapshot), dtype=np.int64)
+        return candidatos.astype(np.int64, copy=False)
+
+    # Pasos indexados
+
+    def _paso_radicado(self, radicado: str, total: int) -> FiltroPlanificado:
+        """Prefijo numérico por el índice de radicados; si no es numérico, subcadena sobre la columna"""
+        if radicado.isdigit():
+            posiciones = self.snapshot.radicado_index.prefix(radicado)
+            return FiltroPlanificado('radicado', len(posiciones), COSTO_INDICE,
+                                     lambda candidatos: _interseccion(candidatos, posiciones))
+        return FiltroPlanificado('radicado', total, COSTO_COLUMNA,
+                                 lambda candidatos: self._filtrar_columna('numero_radicado', radicado, candidatos))
+
+    def _paso_trigramas(self, nombre: str, columna: str, patron: str) -> FiltroPlanificado:
+        """Subcadena en una columna por su índice de trigramas (la estimación es una cota superior)"""
+        indice = self.snapshot.trigram_index(columna)
+        return FiltroPlanificado(nombre, indice.estimate(patron), COSTO_INDICE,
+                                 lambda candidatos: _interseccion(candidatos, indice.search(patron)))
+
+    def _paso_fecha(self, fecha_inicio, fecha_fin) -> Optional[FiltroPlanificado]:
+        """Rango de fechas de radicación por el índice ordenado (fechas inválidas no filtran)"""
+        try:
+            inicio = pd.to_datetime(fecha_inicio)
+            fin = pd.to_datetime(fecha_fin) if fecha_fin else None
+            indice = self.snapshot.date_index
+            estimacion = indice.count(inicio, fin)
+        except Exception:
+            return None
+        return FiltroPlanificado('fecha', estimacion, COSTO_INDICE,
+                                 lambda candidatos: _interseccion(candidatos, indice.range(inicio, fin)))
+
+    def _paso_categoria(self, filtro: str, columna: str, patron: str) -> FiltroPlanificado:
+        """Subcadena sobre las categorías de la columna: conteo exacto y prueba por candidato (bits o códigos)"""
+        indice = self.snapshot.bitmap_index(columna)
+        if indice is None:
+            # Columna no codificada: índice de trigramas
+            return self._paso_trigramas(filtro, columna, patron)
+
+        categorias = indice.match_categories(patron)
+        estimacion = int(indice.counts[categorias].sum())
+
+        def evaluar(candidatos: Optional[np.ndarray]) -> np.ndarray:
+            if candidatos is None:
+                return indice.positions(categorias)
+            return candidatos[indice.contains(categorias, candidatos)]
+
+        return FiltroPlanificado(filtro, estimacion, COSTO_INDICE, evaluar)
+
+    # Pasos que recorren filas (solo sobre los candidatos)
+
+    def _filtrar_columna(self, columna: str, patron: str, candidatos: Optional[np.ndarray]) -> np.ndarray:
+        """Subcadena (regex, sin distinguir mayúsculas) en una columna, evaluada sobre los candidatos"""
+        if candidatos is None:
+            candidatos = np.arange(len(self.snapshot), dtype=np.int64)
+        if columna not in self.snapshot.df.columns:
+            return candidatos[:0]
+        return candidatos[self._contiene(columna, candidatos, patron)]
+
+    def _filtrar_texto(self, texto: str, candidatos: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Texto en cualquier columna, con la representación de ``df.astype(str)``.
+
+        Se evalúa columna por columna y cada columna solo revisa las filas que
+        aún no coincidieron con las anteriores.
+        """
+        patron = texto.lower()
+        if candidatos is None:
+            candidatos = np.arange(len(self.snapshot), dtype=np.int64)
+        coincide = np.zeros(len(candidatos), dtype=bool)
+        df = self.snapshot.df
+        for columna in df.columns:
+            pendientes = np.flatnonzero(~coincide)
+            if len(pendientes) == 0:
+                break
+            coincide[pendientes] = self._contiene(columna, candidatos[pendientes], patron)
+        return candidatos[coincide]
+
+    def _contiene(self, columna: str, posiciones: np.ndarray, patron: str) -> np.ndarray:
+        """Máscara de las posiciones cuyo valor (como texto) contiene el patrón"""
+        serie = self.snapshot.df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Se evalúa una vez por categoría y se consulta por código
+            regex = re.compile(patron, re.IGNORECASE)
+            categorias = np.asarray([regex.search(str(c)) is not None for c in serie.cat.categories] + [False])
+            return categorias[serie.cat.codes.to_numpy()[posiciones]]
+        parte = serie.iloc[posiciones]
+        if pd.api.types.is_datetime64_any_dtype(serie.dtype) and getattr(serie.dtype, 'tz', None) is None:
+            # Mismo formato que astype(str) de la columna completa (calculado una vez por snapshot)
+            formato = self.snapshot.formato_fecha(columna)
+            if formato is not None:
+                parte = parte.dt.strftime(formato)
+        return parte.astype(str).str.contains(patron, case=False, na=False).to_numpy(dtype=bool)
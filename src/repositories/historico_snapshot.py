@@ -0,0 +1,199 @@
+"""
+Snapshot del histórico de PQRS
+
+Agrupa el DataFrame normalizado con su versión y los índices derivados.
+Los índices se construyen una sola vez por snapshot, la primera vez que se
+necesitan (o todos antes de publicarlo, en una recarga en caliente), y se
+descartan junto con el snapshot cuando cambian los datos.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.indexes.bitmap_index import BitmapIndex
+from src.indexes.radicado_index import RadicadoIndex
+from src.indexes.completion_index import CompletionIndex
+from src.indexes.date_index import DateIndex
+from src.indexes.name_index import NameIndex
+from src.indexes.text_index import TextIndex
+from src.indexes.trigram_index import TrigramIndex
+from src.models.historico_columnas import resolver_columna
+from src.models.historico_rows import HistoricoColumns, HistoricoRows
+from src.repositories.historico_aggregates import HistoricoAggregates
+from src.repositories.historico_delta import FirmasHistorico
+from src.utils.single_flight import SingleFlight
+
+
+def formato_fecha(serie: pd.Series) -> Optional[str]:
+    """
+    Formato con que ``astype(str)`` escribe una columna de fechas completa.
+
+    Solo la fecha si todas son medianoche, fecha y hora si ninguna tiene
+    microsegundos; None en otro caso (se usa la conversión de pandas).
+    """
+    if (serie.isna() | (serie.dt.normalize() == serie)).all():
+        return '%Y-%m-%d'
+    if not (serie.dt.microsecond != 0).any():
+        return '%Y-%m-%d %H:%M:%S'
+    return None
+
+
+class HistoricoSnapshot:
+    """Histórico normalizado en memoria junto con sus índices"""
+
+    def __init__(self, df: pd.DataFrame, source: Optional[str] = None, version: Optional[str] = None):
+        """Inicializa el snapshot"""
+        self.df = df
+        self.source = source
+        self.version = version
+        self._indexes: Dict[str, Any] = {}
+        # Un lock por índice: índices distintos pueden construirse en paralelo
+        self._cargas = SingleFlight(self._indexes)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def column(self, nombre: str) -> pd.Series:
+        """Columna por su nombre normalizado o por un alias (p. ej. el nombre original del Excel), sin copiarla"""
+        columna = resolver_columna(self.df.columns, nombre)
+        if columna is None:
+            raise KeyError(nombre)
+        return self.df[columna]
+
+    def _get_index(self, name: str, builder: Callable[[pd.DataFrame], Any]) -> Any:
+        """Obtiene un índice derivado construyéndolo una única vez"""
+        return self._cargas.do(name, lambda: builder(self.df))
+
+    @property
+    def radicado_index(self) -> RadicadoIndex:
+        """Índice de números de radicado"""
+        return self._get_index('radicado', RadicadoIndex.from_frame)
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Índice invertido BM25 sobre los campos de texto"""
+        return self._get_index('texto', TextIndex.from_frame)
+
+    def trigram_index(self, column: str) -> TrigramIndex:
+        """Índice de trigramas para búsquedas por subcadena en una columna"""
+        return self._get_index(f'trigram:{column}', lambda df: TrigramIndex.from_frame(df, column))
+
+    def bitmap_index(self, column: str) -> Optional[BitmapIndex]:
+        """Bitmaps por valor de una columna categórica (None si la columna no es categórica)"""
+        if column not in self.df.columns or not isinstance(self.df[column].dtype, pd.CategoricalDtype):
+            return None
+        return self._get_index(f'bitmap:{column}', lambda df: BitmapIndex.from_frame(df, column))
+
+    def formato_fecha(self, column: str) -> Optional[str]:
+        """Formato de texto de una columna de fechas como en ``astype(str)`` (ver ``formato_fecha``)"""
+        return self._get_index(f'formato:{column}', lambda df: formato_fecha(df[column]))
+
+    @property
+    def name_index(self) -> NameIndex:
+        """Índice difuso y fonético de nombres"""
+        return self._get_index('nombre', NameIndex.from_frame)
+
+    @property
+    def completion_index(self) -> CompletionIndex:
+        """Índice de autocompletado para sugerencias de búsqueda"""
+        return self._get_index('sugerencias', CompletionIndex.from_frame)
+
+    @property
+    def date_index(self) -> DateIndex:
+        """Posiciones ordenadas por fecha de radicación"""
+        return self._get_index('fecha_radicacion', DateIndex.from_frame)
+
+    @property
+    def aggregates(self) -> HistoricoAggregates:
+        """Conteos y rangos de fecha materializados para estadísticas y resúmenes"""
+        return self._get_index('agregados', HistoricoAggregates.from_frame)
+
+    @property
+    def row_signatures(self) -> FirmasHistorico:
+        """Llaves de radicado y huellas de estado/seguimiento para la ingesta incremental"""
+        return self._get_index('firmas', FirmasHistorico.from_frame)
+
+    @property
+    def columns(self) -> HistoricoColumns:
+        """Lectores por columna que alimentan las vistas de fila"""
+        return self._get_index('filas', HistoricoColumns.from_frame)
+
+    def rows(self, posiciones: Optional[Sequence[int]] = None, claves: Optional[np.ndarray] = None,
+             descendente: bool = False) -> HistoricoRows:
+        """Vistas de fila perezosas para las posiciones dadas (todas si se omiten), con su clave de orden"""
+        return HistoricoRows(self.columns, posiciones, claves=claves, descendente=descendente)
+
+    def apply_delta(self, df: pd.DataFrame, actualizadas: np.ndarray, firmas: FirmasHistorico,
+                    source: Optional[str] = None, version: Optional[str] = None) -> 'HistoricoSnapshot':
+        """
+        Snapshot nuevo con un delta ya aplicado al DataFrame.
+
+        ``df`` conserva las filas actuales en sus posiciones (con ``actualizadas``
+        reemplazadas, sin cambiar su radicado) y trae las insertadas al final. Los
+        índices de radicado y fecha, los bitmaps y los agregados se actualizan con
+        el costo de las filas cambiadas; los índices de texto, nombres, trigramas y
+        sugerencias dependen de todo el histórico y se reconstruyen bajo demanda
+        (o con ``warm``).
+        """
+        nuevo = HistoricoSnapshot(df, source=source, version=version)
+        total = len(self.df)
+        cambiadas = np.concatenate([actualizadas, np.arange(total, len(df))])
+        nuevo._indexes['firmas'] = firmas
+
+        radicados = self._indexes.get('radicado')
+        if radicados is not None and 'numero_radicado' in df.columns:
+            nuevo._indexes['radicado'] = radicados.extend(df['numero_radicado'].iloc[total:])
+        fechas = self._indexes.get('fecha_radicacion')
+        if fechas is not None and 'fecha_radicacion' in df.columns:
+            fechas = fechas.updated(df['fecha_radicacion'], actualizadas)
+            nuevo._indexes['fecha_radicacion'] = fechas
+        agregados = self._indexes.get('agregados')
+        if agregados is not None:
+            nuevo._indexes['agregados'] = agregados.updated(self.df.iloc[actualizadas], df.iloc[cambiadas],
+                                                            nuevo._indexes.get('fecha_radicacion'))
+
+        for name, index in list(self._indexes.items()):
+            if not name.startswith('bitmap:'):
+                continue
+            column = name.split(':', 1)[1]
+            if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+                bitmaps = index.updated(df[column], actualizadas)
+                if bitmaps is not None:
+                    nuevo._indexes[name] = bitmaps
+        return nuevo
+
+    def _constructores(self) -> List[Callable[[], Any]]:
+        """Accesos que construyen cada índice y agregado del snapshot"""
+        constructores = [
+            lambda: self.radicado_index,
+            lambda: self.date_index,
+            lambda: self.aggregates,
+            lambda: self.row_signatures,
+            lambda: self.columns,
+            lambda: self.text_index,
+            lambda: self.name_index,
+            lambda: self.completion_index,
+        ]
+        for column in self.df.columns:
+            if isinstance(self.df[column].dtype, pd.CategoricalDtype):
+                constructores.append(lambda column=column: self.bitmap_index(column))
+        if 'nombre' in self.df.columns:
+            constructores.append(lambda: self.trigram_index('nombre'))
+        return constructores
+
+    def warm(self, hilos: int = 1):
+        """
+        Construye por adelantado los índices y agregados, antes de publicar el snapshot.
+
+        Args:
+            hilos: índices que se construyen a la vez (1 los construye en secuencia)
+        """
+        constructores = self._constructores()
+        if hilos <= 1:
+            for construir in constructores:
+                construir()
+            return
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='historico-indices') as executor:
+            for futuro in [executor.submit(construir) for construir in constructores]:
+                futuro.result()
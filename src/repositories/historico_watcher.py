@@ -0,0 +1,70 @@
+"""
+Vigilante del archivo fuente del histórico
+
+Hilo en segundo plano que revisa periódicamente el tamaño y la fecha de
+modificación del Excel del histórico. Cuando cambian, pide al repositorio
+que reconstruya y publique el snapshot nuevo, de modo que ninguna petición
+paga la lectura del Excel ni queda sin datos durante la recarga.
+"""
+
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+from src.utils.logger import logger
+
+
+class HistoricoWatcher:
+    """Detecta cambios en el Excel del histórico y dispara la recarga del repositorio"""
+
+    def __init__(self, repository, source_path: Path, interval: float):
+        """
+        Inicializa el vigilante.
+
+        Args:
+            repository: repositorio con un método reload()
+            source_path: ruta del Excel del histórico
+            interval: segundos entre revisiones
+        """
+        self.repository = repository
+        self.source_path = Path(source_path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ultima_firma = None
+
+    def _firma(self) -> Optional[Tuple[int, int]]:
+        """Tamaño y mtime del archivo fuente (None si no existe)"""
+        try:
+            stat = self.source_path.stat()
+            return stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def start(self):
+        """Inicia el hilo vigilante"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._ultima_firma = self._firma()
+        self._thread = threading.Thread(target=self._run, name='historico-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Vigilante del histórico iniciado (cada {self.interval}s)")
+
+    def stop(self):
+        """Detiene el hilo vigilante"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            firma = self._firma()
+            if firma is None or firma == self._ultima_firma:
+                continue
+            try:
+                logger.info("Cambio detectado en el Excel del histórico: recargando en segundo plano")
+                self.repository.reload()
+                self._ultima_firma = firma
+            except Exception as e:
+                # Archivo a medio copiar o inválido: se reintenta en la siguiente revisión
+                logger.error(f"Error al recargar el histórico en segundo plano: {e}")
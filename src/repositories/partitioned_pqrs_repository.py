@@ -0,0 +1,146 @@
+"""
+Backend particionado del histórico de PQRS
+
+Guarda el histórico normalizado como particiones Arrow por año/mes de
+radicación (ver HistoricoParticiones). Las consultas por rango de fechas o
+por radicado (cuyo prefijo 'YYYYMMDD' codifica la fecha) abren solo las
+particiones que pueden contener resultados; el resto queda en disco. Las
+consultas sin esos criterios usan el snapshot completo, que se arma con
+todas las particiones la primera vez que se necesita.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from src.config.config import config
+from src.repositories.historico_aggregates import HistoricoAggregates
+from src.repositories.historico_cache import HistoricoSnapshotCache
+from src.repositories.historico_particiones import HistoricoParticiones
+from src.repositories.historico_snapshot import HistoricoSnapshot
+from src.repositories.pqrs_repository import PQRSRepository
+from src.utils.logger import logger
+
+
+class PartitionedPQRSRepository(PQRSRepository):
+    """Repositorio del histórico particionado por mes de radicación y cargado bajo demanda"""
+
+    BACKEND = 'particionado'
+    # Incrementar cuando cambie el formato de las particiones o del manifiesto
+    PARTICIONES_SCHEMA_VERSION = 1
+
+    def __init__(self, base_dir: Path = None):
+        """Inicializa el repositorio particionado"""
+        super().__init__()
+        self.base_dir = Path(base_dir or config.HISTORICO_PARTICIONES_DIR)
+        self.max_cargadas = config.HISTORICO_PARTICIONES_MAX_CARGADAS
+        self._particiones: Optional[HistoricoParticiones] = None
+        self._agregados: Optional[HistoricoAggregates] = None
+
+    def _schema_tag(self) -> str:
+        return f"{HistoricoSnapshotCache.SCHEMA_VERSION}.{self.PARTICIONES_SCHEMA_VERSION}"
+
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        """Versión de las particiones publicadas (None si aún no se han abierto)"""
+        particiones = self._particiones
+        return particiones.version if particiones is not None else None
+
+    @property
+    def particiones_cargadas(self) -> List[tuple]:
+        """Combinaciones de particiones con snapshot parcial en memoria"""
+        particiones = self._particiones
+        return particiones.cargadas if particiones is not None else []
+
+    def _get_particiones(self) -> HistoricoParticiones:
+        """Particiones publicadas; la lectura no toma ningún lock"""
+        particiones = self._particiones
+        if particiones is None:
+            with self._load_lock:
+                particiones = self._particiones
+                if particiones is None:
+                    particiones = self._open_particiones()
+                    self._publicar(particiones)
+                    self._start_watcher()
+        return particiones
+
+    def _open_particiones(self, source_key: Dict[str, Any] = None, reconstruir: bool = False) -> HistoricoParticiones:
+        """Abre las particiones del Excel vigente escribiéndolas si no existen o están desactualizadas"""
+        if not self.historico_excel_path.exists():
+            logger.error("No se encontró archivo histórico Excel")
+            raise FileNotFoundError("No se encontró archivo histórico Excel")
+
+        if source_key is None:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+        particiones = None if reconstruir else HistoricoParticiones.abrir(
+            self.base_dir, source_key['sha256'], self._schema_tag(), self.max_cargadas)
+        if particiones is None:
+            # Reutiliza la carga normal (snapshot columnar o Excel) solo durante la escritura
+            df = super()._build_snapshot(source_key).df
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            particiones = HistoricoParticiones.escribir(self.base_dir, df, source_key, self._schema_tag(),
+                                                        self.max_cargadas)
+        else:
+            logger.info(f"Particiones del histórico vigentes: {particiones.meta['registros']} registros "
+                        f"en {len(particiones.claves)} particiones")
+
+        self._historico_source = 'particiones'
+        return particiones
+
+    def _publicar(self, particiones: HistoricoParticiones):
+        """Publica las particiones con sus agregados (una sola asignación por atributo)"""
+        self._agregados = particiones.agregados()
+        self._particiones = particiones
+
+    def _build_snapshot(self, source_key: Dict[str, Any] = None) -> HistoricoSnapshot:
+        """Snapshot completo con todas las particiones (se llama con ``_load_lock`` tomado)"""
+        particiones = self._particiones
+        if particiones is None:
+            particiones = self._open_particiones(source_key)
+            self._publicar(particiones)
+        return HistoricoSnapshot(particiones.frame(particiones.claves), source='particiones',
+                                 version=particiones.version)
+
+    def reload(self, force: bool = False) -> bool:
+        """Reescribe las particiones fuera del camino de las peticiones y las publica si el Excel cambió"""
+        with self._load_lock:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+            actual = self._particiones
+            if not force and actual is not None and actual.sha256 == source_key['sha256']:
+                return False
+
+            particiones = self._open_particiones(source_key, reconstruir=force)
+            # El snapshot completo solo se reconstruye si ya estaba en uso
+            snapshot = None
+            if self._snapshot is not None:
+                snapshot = HistoricoSnapshot(particiones.frame(particiones.claves), source='particiones',
+                                             version=particiones.version)
+                snapshot.warm()
+            self._publicar(particiones)
+            if snapshot is not None:
+                self._install_snapshot(snapshot)
+            self._start_watcher()
+            logger.info(f"Particiones del histórico publicadas: versión {particiones.version}")
+            return True
+
+    def get_query_snapshot(self, fecha_inicio: Optional[pd.Timestamp] = None, fecha_fin: Optional[pd.Timestamp] = None,
+                           radicados: Optional[List[str]] = None, prefijo: Optional[str] = None,
+                           rango_radicados: Optional[tuple] = None) -> HistoricoSnapshot:
+        """Snapshot parcial con solo las particiones que pueden contener resultados (completo si son todas)"""
+        particiones = self._get_particiones()
+        claves = particiones.podar(fecha_inicio, fecha_fin, radicados, prefijo, rango_radicados)
+        if len(claves) == len(particiones.claves):
+            return self.get_snapshot()
+        return particiones.snapshot(claves)
+
+    def warm(self, hilos: int = 1):
+        """Abre (o escribe) las particiones y sus agregados; los meses siguen en disco hasta consultarlos"""
+        self._get_particiones()
+
+    def get_aggregates(self) -> HistoricoAggregates:
+        """Agregados del histórico completo guardados con las particiones (no abre ninguna)"""
+        self._get_particiones()
+        return self._agregados
+
+    def get_columns(self) -> List[str]:
+        """Columnas del histórico normalizado según el manifiesto"""
+        return list(self._get_particiones().meta['columnas'])
@@ -1,207 +1,706 @@
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
+from datetime import date
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from src.models.pqrs_model import PQRSHistorico, PQRSData
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from src.models.pqrs_model import PQRSData
+from src.models.historico_columnas import COLUMNAS_EXCEL
+from src.models.historico_rows import HistoricoRows, PQRSHistoricoView
 from src.utils.logger import logger
 from src.config.config import config
+from src.repositories.historico_cache import HistoricoSnapshotCache
+from src.repositories.historico_snapshot import HistoricoSnapshot
+from src.repositories.historico_watcher import HistoricoWatcher
+from src.repositories.historico_aggregates import HistoricoAggregates
+from src.repositories.historico_delta import DeltaHistorico, FirmasHistorico
+from src.repositories.historico_excel_stream import STREAMING_AVAILABLE, HistoricoColumnarBuilder, HistoricoExcelStream
+from src.repositories.historico_planificador import PlanificadorFiltros
+from src.indexes.completion_index import CompletionIndex
+from src.models.historico_orden import claves_orden, ordenar, posteriores, primeros
+from src.utils.single_flight import SingleFlight
 
-class PQRSRepository:
-    """Repositorio para acceso a datos de PQRS"""
+class ResultadoConsultaAvanzada:
+    """Filas de una consulta avanzada ya filtradas, ordenadas y recortadas después del cursor"""
+    
+    def __init__(self, filas: HistoricoRows, total: int, version: Optional[str], frame: pd.DataFrame):
+        """
+        Args:
+            filas: filas del resultado en orden, con su clave de orden
+            total: total de coincidencias de los filtros (sin cursor ni límite)
+            version: versión del histórico consultado
+            frame: columnas de las mismas filas, en el mismo orden (para resúmenes)
+        """
+        self.filas = filas
+        self.total = total
+        self.version = version
+        self.frame = frame
+
+class HistoricoRepository(ABC):
+    """
+    Acceso al histórico de PQRS, común a todos los backends.
+    
+    Reúne la lectura y normalización del Excel fuente, el vigilante de cambios
+    y los resúmenes; cada backend resuelve las consultas a su manera (snapshot
+    en memoria, particiones o SQLite).
+    """
+    
+    # Columnas de baja cardinalidad que se codifican como categóricas
+    CATEGORICAL_COLUMNS = ['clasificacion', 'estado_pqrs', 'unidad', 'barrio', 'tipo_solicitud', 'tema', 'semaforo_dias']
+    # Proporción máxima de valores distintos para codificar una columna
+    CATEGORICAL_MAX_RATIO = 0.5
     
     def __init__(self):
         """Inicializa el repositorio"""
         self.historico_excel_path = config.HISTORICO_EXCEL
-        self._historico_df = None
         self._historico_source = None
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self.watch_interval = config.HISTORICO_WATCH_INTERVAL
+        self.excel_streaming = config.HISTORICO_EXCEL_STREAMING
+        self.excel_chunk_rows = config.HISTORICO_EXCEL_CHUNK_ROWS
+        self.snapshot_cache = HistoricoSnapshotCache(config.HISTORICO_CACHE_DIR, config.HISTORICO_CACHE_ENABLED,
+                                                     config.HISTORICO_CACHE_FORMAT)
     
-    def _load_historico(self) -> pd.DataFrame:
-        """Carga el archivo histórico en memoria desde Excel"""
-        if self._historico_df is None:
-            try:
-                # Cargar archivo Excel
-                if self.historico_excel_path.exists():
-                    self._historico_df = pd.read_excel(self.historico_excel_path)
-                    self._historico_source = 'excel'
-                    logger.info(f"Archivo histórico Excel cargado: {len(self._historico_df)} registros")
-                else:
-                    logger.error("No se encontró archivo histórico Excel")
-                    raise FileNotFoundError("No se encontró archivo histórico Excel")
-                
-                # Normalizar nombres de columnas
-                self._normalize_columns()
-                
-            except Exception as e:
-                logger.error(f"Error al cargar archivo histórico: {e}")
-                raise
-        return self._historico_df
-    
-    def _normalize_columns(self):
-        """Normaliza los nombres de columnas para compatibilidad"""
-        if self._historico_df is not None:
-            # Mapeo de columnas específicas del archivo Excel histórico2.xlsx
-            column_mapping = {
-                # Mapeo para número de radicado - COLUMNA CORREGIDA
-                'DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF': 'numero_radicado',
-                'CONTROL DE RADICADO': 'control_radicado',  # Cambiado para evitar conflicto
-                'RAD. RESPUESTA': 'rad_respuesta',  # Cambiado para evitar conflicto
-                
-                # Mapeo para nombre (combinar campos de nombre)
-                'PRIMERNOMBRE': 'primer_nombre',
-                'SEGUNDONOMBRE': 'segundo_nombre',
-                'PRIMERAPELLIDO': 'primer_apellido',
-                'SEGUNDOAPELLIDO': 'segundo_apellido',
-                'SOLICITANTE': 'nombre_completo',
-                
-                # Mapeo para fechas
-                'FECHA RADICACIÓN': 'fecha_radicacion',
-                'FECHA ENTRADA A SIF': 'fecha_entrada_sif',
-                'FECHA RADICADO RESPUESTA': 'fecha_respuesta',
-                'FECHA DE INGRESO': 'fecha_ingreso',
-                'FECHA DE INGRESO A LA BANDEJA': 'fecha_ingreso_bandeja',
-                
-                # Mapeo para texto de PQRS
-                'ASUNTO DE LA PETICIÓN': 'texto_pqrs',
-                'DATOS INICIALES PQRSD': 'datos_iniciales',
-                'SEGUIMIENTO DE LA PQRSD': 'seguimiento',
-                'OBSERVACIÓN': 'observacion',
-                
-                # Mapeo para clasificación
-                'CLASE DE SOLICITUD': 'clasificacion',
-                'TIPO DE SOLICITUD': 'tipo_solicitud',
-                'TEMA': 'tema',
-                
-                # Mapeo para estado
-                'ESTADO': 'estado_pqrs',
-                'SEMAFORO DIAS': 'semaforo_dias',
-                'OPORTUNIDAD': 'oportunidad',
-                
-                # Mapeo para información adicional
-                'TIPO DOCUMENTO': 'tipo_documento',
-                'NÚMERO DOCUMENTO': 'numero_documento',
-                'CORREO1': 'correo',
-                'CELULAR 1': 'celular',
-                'DIRECCIÓN DEL PETICIONARIO': 'direccion',
-                'BARRIO, VEREDA O SECTOR': 'barrio',
-                'UNIDAD': 'unidad',
-                'AREAS DE INTERVENCIÓN': 'areas_intervencion',
-                'ENLACE': 'enlace',
-                'LÍDER': 'lider'
-            }
-            
-            # Renombrar columnas preservando datos
-            for old_name, new_name in column_mapping.items():
-                if old_name in self._historico_df.columns:
-                    if new_name not in self._historico_df.columns:
-                        self._historico_df[new_name] = self._historico_df[old_name]
-                        logger.info(f"Columna mapeada: {old_name} -> {new_name}")
-                    # Mantener columna original también por compatibilidad
-                    # self._historico_df = self._historico_df.rename(columns={old_name: new_name})
-            
-            # Crear columna nombre combinada si no existe
-            if 'nombre_completo' not in self._historico_df.columns:
-                if all(col in self._historico_df.columns for col in ['primer_nombre', 'primer_apellido']):
-                    self._historico_df['nombre_completo'] = (
-                        self._historico_df['primer_nombre'].fillna('') + ' ' + 
-                        self._historico_df['primer_apellido'].fillna('')
-                    ).str.strip()
-                    logger.info("Columna nombre_completo creada combinando campos de nombre")
+    @property
+    @abstractmethod
+    def snapshot_version(self) -> Optional[str]:
+        """Versión del histórico publicado (None si aún no se ha cargado)"""
+        pass
+    
+    @abstractmethod
+    def reload(self, force: bool = False) -> bool:
+        """Reconstruye el histórico fuera del camino de las peticiones y lo publica si el Excel cambió"""
+        pass
+    
+    @abstractmethod
+    def warm(self, hilos: int = 1):
+        """Carga el histórico y prepara sus índices fuera del camino de las peticiones"""
+        pass
+    
+    @abstractmethod
+    def get_aggregates(self) -> HistoricoAggregates:
+        """Conteos y fechas precalculados del histórico vigente"""
+        pass
+    
+    @abstractmethod
+    def get_columns(self) -> List[str]:
+        """Columnas disponibles del histórico normalizado"""
+        pass
+    
+    @abstractmethod
+    def get_completion_index(self) -> CompletionIndex:
+        """Índice de autocompletado del histórico vigente"""
+        pass
+    
+    @abstractmethod
+    def get_historico_by_radicado(self, numero_radicado: str) -> Optional[PQRSHistoricoView]:
+        """Obtiene un registro histórico por número de radicado"""
+        pass
+    
+    @abstractmethod
+    def get_historico_by_radicados(self, numeros_radicado: List[str]) -> Dict[str, PQRSHistoricoView]:
+        """Obtiene varios registros históricos por número de radicado en una sola pasada"""
+        pass
+    
+    @abstractmethod
+    def get_historico_by_radicado_prefix(self, prefijo: str) -> HistoricoRows:
+        """Obtiene los registros cuyo radicado comienza con el prefijo (p. ej. 'YYYYMMDD')"""
+        pass
+    
+    @abstractmethod
+    def get_historico_by_radicado_range(self, radicado_inicio: str, radicado_fin: str) -> HistoricoRows:
+        """Obtiene los registros con radicado numérico en el rango cerrado indicado"""
+        pass
+    
+    @abstractmethod
+    def search_historico_advanced(self, search_term: str, search_type: str = 'texto') -> HistoricoRows:
+        """Búsqueda avanzada en el histórico por diferentes criterios"""
+        pass
+    
+    @abstractmethod
+    def get_historico_by_date_range(self, start_date: str, end_date: str) -> HistoricoRows:
+        """Obtiene registros históricos en un rango de fechas"""
+        pass
+    
+    @abstractmethod
+    def consulta_avanzada(self, filtros: Dict[str, Any], filtros_categoricos: Dict[str, str],
+                          despues_de: Optional[Tuple[Any, int]] = None, limit: int = 0,
+                          columnas_leidas: Optional[List[str]] = None) -> ResultadoConsultaAvanzada:
+        """
+        Resuelve los filtros de la consulta avanzada en el orden pedido.
+        
+        El orden es por la columna ``ordenar_por`` (nulos al final) y la posición
+        de la fila; con ``despues_de`` (clave, posición) de un cursor el resultado
+        continúa justo después de esa fila.
+        
+        Args:
+            filtros: filtros de la consulta avanzada (texto, radicado, nombre, fechas, orden)
+            filtros_categoricos: nombre del filtro -> columna categórica
+            despues_de: clave de orden y posición de la última fila ya entregada
+            limit: máximo de filas (0: todas)
+            columnas_leidas: columnas que se leerán de las filas (None: todas)
+        """
+        pass
+    
+    @abstractmethod
+    def get_all_historico(self) -> HistoricoRows:
+        """Obtiene todos los registros históricos (vistas perezosas, sin materializar cada fila)"""
+        pass
+    
+    @abstractmethod
+    def search_historico(self, search_term: str, column: str = 'texto_pqrs') -> HistoricoRows:
+        """Busca en el histórico por término de búsqueda"""
+        pass
+    
+    def _iter_source_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Lotes del Excel fuente con columnas y fechas normalizadas (sin codificar categóricas).
+        
+        Con la lectura en streaming cada lote se lee y normaliza por separado
+        (los tipos pueden variar entre lotes, ver HistoricoColumnarBuilder.tipo_comun);
+        sin ella se lee el libro completo y se entrega en lotes del mismo tamaño.
+        """
+        if self.excel_streaming and STREAMING_AVAILABLE:
+            stream = HistoricoExcelStream(self.historico_excel_path, self.excel_chunk_rows)
+            for numero, lote in enumerate(stream.iter_chunks()):
+                lote = self._normalize_columns(lote, verbose=numero == 0)
+                lote = self._parse_date_columns(lote, verbose=numero == 0)
+                yield HistoricoSnapshotCache.prepare_frame(lote)
+            return
+        
+        df = self._normalize_columns(pd.read_excel(self.historico_excel_path))
+        df = HistoricoSnapshotCache.prepare_frame(self._parse_date_columns(df))
+        paso = max(1, int(self.excel_chunk_rows))
+        for inicio in range(0, len(df), paso):
+            yield df.iloc[inicio:inicio + paso]
+    
+    def _start_watcher(self):
+        """Inicia una sola vez el vigilante del Excel en segundo plano (si está habilitado)"""
+        if self.watch_interval and self.watch_interval > 0 and self._watcher is None:
+            self._watcher = HistoricoWatcher(self, self.historico_excel_path, self.watch_interval)
+            self._watcher.start()
+    
+    def _normalize_columns(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """Normaliza los nombres de columnas para compatibilidad (``verbose=False`` omite el detalle en el log)"""
+        def informar(mensaje: str):
+            if verbose:
+                logger.info(mensaje)
+        
+        if df is not None:
+            # Renombrar (sin copiar) las columnas del Excel histórico2.xlsx a su nombre normalizado;
+            # los nombres originales se siguen resolviendo como alias (ver historico_columnas)
+            renombres = {}
+            for old_name, new_name in COLUMNAS_EXCEL.items():
+                if old_name == 'SOLICITANTE' and 'nombre' in df.columns:
+                    new_name = 'nombre_completo'
+                if old_name in df.columns and new_name not in df.columns and new_name not in renombres.values():
+                    renombres[old_name] = new_name
+                    informar(f"Columna mapeada: {old_name} -> {new_name}")
+            if renombres:
+                df = df.rename(columns=renombres)
             
-            # Crear columna nombre principal para compatibilidad
-            if 'nombre' not in self._historico_df.columns:
-                if 'nombre_completo' in self._historico_df.columns:
-                    self._historico_df['nombre'] = self._historico_df['nombre_completo']
-                elif all(col in self._historico_df.columns for col in ['primer_nombre', 'primer_apellido']):
-                    self._historico_df['nombre'] = (
-                        self._historico_df['primer_nombre'].fillna('') + ' ' + 
-                        self._historico_df['primer_apellido'].fillna('')
+            # Crear columna nombre principal si el Excel no trae el solicitante
+            if 'nombre' not in df.columns:
+                if all(col in df.columns for col in ['primer_nombre', 'primer_apellido']):
+                    df['nombre'] = (
+                        df['primer_nombre'].fillna('') + ' ' + 
+                        df['primer_apellido'].fillna('')
                     ).str.strip()
+                    informar("Columna nombre creada combinando campos de nombre")
                 else:
-                    self._historico_df['nombre'] = ''
-                logger.info("Columna nombre creada para compatibilidad")
+                    df['nombre'] = ''
+                    informar("Columna nombre creada para compatibilidad")
             
             # Verificar columnas requeridas mínimas
             required_columns = ['numero_radicado', 'texto_pqrs', 'estado_pqrs']
-            available_columns = list(self._historico_df.columns)
+            available_columns = list(df.columns)
             
             # Verificar qué columnas requeridas están disponibles
             missing_columns = [col for col in required_columns if col not in available_columns]
             if missing_columns:
                 logger.warning(f"Columnas requeridas faltantes: {missing_columns}")
-                logger.info(f"Columnas disponibles: {available_columns}")
+                informar(f"Columnas disponibles: {available_columns}")
                 
-                # Crear columnas faltantes con valores por defecto si es posible
+                # Renombrar columnas alternativas a las requeridas si es posible
                 if 'texto_pqrs' not in available_columns and 'asunto_peticion' in available_columns:
-                    self._historico_df['texto_pqrs'] = self._historico_df['asunto_peticion']
-                    logger.info("Columna texto_pqrs creada desde asunto_peticion")
+                    df = df.rename(columns={'asunto_peticion': 'texto_pqrs'})
+                    informar("Columna asunto_peticion renombrada a texto_pqrs")
                 
                 if 'estado_pqrs' not in available_columns and 'estado' in available_columns:
-                    self._historico_df['estado_pqrs'] = self._historico_df['estado']
-                    logger.info("Columna estado_pqrs creada desde estado")
+                    df = df.rename(columns={'estado': 'estado_pqrs'})
+                    informar("Columna estado renombrada a estado_pqrs")
             else:
-                logger.info("Todas las columnas requeridas están disponibles")
+                informar("Todas las columnas requeridas están disponibles")
+        return df
+    
+    def _parse_date_columns(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """Convierte una sola vez las columnas fecha_* a datetime con formatos explícitos"""
+        if df is None:
+            return df
+        
+        for columna in [c for c in df.columns if c.startswith('fecha_')]:
+            serie = df[columna]
+            if pd.api.types.is_datetime64_any_dtype(serie):
+                continue
+            
+            fechas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+            
+            # Celdas que el Excel ya entrega como fecha
+            es_fecha = serie.map(lambda v: isinstance(v, date)).astype(bool)
+            if es_fecha.any():
+                fechas[es_fecha] = pd.to_datetime(serie[es_fecha])
+            
+            # Celdas de texto: probar los formatos configurados en orden
+            textos = serie[~es_fecha & serie.notna()].astype(str).str.strip()
+            textos = textos[textos != '']
+            for formato in config.HISTORICO_DATE_FORMATS:
+                pendientes = textos[fechas[textos.index].isna()]
+                if pendientes.empty:
+                    break
+                fechas[pendientes.index] = pd.to_datetime(pendientes, format=formato, errors='coerce')
+            
+            sin_formato = int(fechas[textos.index].isna().sum())
+            if sin_formato:
+                logger.warning(f"Columna {columna}: {sin_formato} valores sin formato de fecha reconocido")
+            
+            df[columna] = fechas
+            if verbose:
+                logger.info(f"Columna de fecha convertida: {columna}")
+        return df
+    
+    def _encode_categorical_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Codifica como categóricas las columnas de baja cardinalidad (diccionario de valores + códigos)"""
+        if df is None:
+            return df
+        
+        total = len(df)
+        for columna in self.CATEGORICAL_COLUMNS:
+            if columna not in df.columns:
+                continue
+            serie = df[columna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                continue
+            distintos = serie.nunique(dropna=True)
+            if total and distintos > total * self.CATEGORICAL_MAX_RATIO:
+                logger.info(f"Columna {columna} no se codifica: {distintos} valores distintos")
+                continue
+            df[columna] = serie.astype('category')
+            logger.info(f"Columna categórica: {columna} ({distintos} categorías)")
+        return df
     
+    def get_historico_summary(self) -> Dict[str, Any]:
+        """Obtiene un resumen del histórico con estadísticas detalladas"""
+        try:
+            agregados = self.get_aggregates()
+            
+            summary = {
+                'total_registros': agregados.total_registros,
+                'fuente_datos': self._historico_source,
+                'columnas_disponibles': self.get_columns(),
+                'ultima_actualizacion': None
+            }
+            
+            # Estadísticas por clasificación y estado (precalculadas por snapshot)
+            if agregados.tiene('clasificacion'):
+                summary['por_clasificacion'] = agregados.por('clasificacion')
+            
+            if agregados.tiene('estado'):
+                summary['por_estado'] = agregados.por('estado')
+            
+            # Fecha más reciente
+            if agregados.fecha_maxima is not None:
+                summary['ultima_actualizacion'] = agregados.fecha_maxima.strftime('%Y-%m-%d')
+            
+            return summary
+            
+        except Exception as e:
+            logger.error(f"Error al obtener resumen del histórico: {e}")
+            return {}
+    
+    def get_estadisticas(self) -> Dict[str, Any]:
+        """Obtiene estadísticas del histórico"""
+        try:
+            agregados = self.get_aggregates()
+            stats = {
+                'total_registros': agregados.total_registros,
+                'por_clasificacion': agregados.por('clasificacion'),
+                'por_estado': agregados.por('estado'),
+                'ultima_actualizacion': agregados.fecha_maxima
+            }
+            return stats
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas: {e}")
+            return {}
+    
+    def refresh_cache(self):
+        """Refresca la caché de datos reconstruyendo el histórico sin dejar de atender peticiones"""
+        if self.snapshot_version is not None:
+            self.reload(force=True)
+        logger.info("Caché de datos refrescada")
 
+class PQRSRepository(HistoricoRepository):
+    """Repositorio del histórico en memoria: snapshot inmutable con sus índices"""
+    
+    # Backend de almacenamiento del histórico (ver PQRSRepositoryFactory)
+    BACKEND = 'pandas'
+    
+    def __init__(self):
+        """Inicializa el repositorio"""
+        super().__init__()
+        self._historico_df = None
+        self._snapshot = None
+        self.incremental = config.HISTORICO_INGESTA_INCREMENTAL
+    
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        """Versión del snapshot publicado (None si el histórico aún no se ha cargado)"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+    
+    def get_snapshot(self) -> HistoricoSnapshot:
+        """
+        Obtiene el snapshot vigente del histórico con sus índices, cargándolo si es necesario.
+        
+        La lectura no toma ningún lock: el snapshot publicado es inmutable y se
+        reemplaza con una sola asignación cuando cambian los datos.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._load_historico()
+            snapshot = self._snapshot
+        return snapshot
+    
+    def get_query_snapshot(self, fecha_inicio: Optional[pd.Timestamp] = None, fecha_fin: Optional[pd.Timestamp] = None,
+                           radicados: Optional[List[str]] = None, prefijo: Optional[str] = None,
+                           rango_radicados: Optional[tuple] = None) -> HistoricoSnapshot:
+        """
+        Snapshot sobre el que resolver una consulta con esos criterios.
+        
+        En memoria es siempre el snapshot completo; los backends particionados
+        devuelven uno parcial con solo las particiones que pueden contener
+        resultados (mismo orden relativo de filas que el completo).
+        """
+        return self.get_snapshot()
+    
+    def warm(self, hilos: int = 1):
+        """Carga el histórico y construye sus índices fuera del camino de las peticiones"""
+        self.get_snapshot().warm(hilos)
+    
+    def get_aggregates(self) -> HistoricoAggregates:
+        """Conteos y fechas precalculados del histórico vigente"""
+        return self.get_snapshot().aggregates
+    
+    def get_columns(self) -> List[str]:
+        """Columnas disponibles del histórico normalizado"""
+        return list(self.get_snapshot().df.columns)
+    
+    def get_completion_index(self) -> CompletionIndex:
+        """Índice de autocompletado del histórico vigente"""
+        return self.get_snapshot().completion_index
+    
+    def _load_historico(self) -> pd.DataFrame:
+        """Carga el histórico en memoria una sola vez aunque lleguen peticiones concurrentes"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    try:
+                        snapshot = self._build_snapshot()
+                        self._install_snapshot(snapshot)
+                        self._start_watcher()
+                    except Exception as e:
+                        logger.error(f"Error al cargar archivo histórico: {e}")
+                        raise
+        return snapshot.df
+    
+    def _build_snapshot(self, source_key: Dict[str, Any] = None) -> HistoricoSnapshot:
+        """Construye un snapshot nuevo desde el snapshot columnar o, si cambió, desde Excel"""
+        if not self.historico_excel_path.exists():
+            logger.error("No se encontró archivo histórico Excel")
+            raise FileNotFoundError("No se encontró archivo histórico Excel")
+        
+        # Intentar cargar el snapshot normalizado del mismo archivo fuente
+        if source_key is None:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+        df = self.snapshot_cache.load(source_key)
+        source = 'snapshot'
+        if df is None:
+            # Entre procesos: solo un worker lee el Excel, los demás cargan lo que dejó en disco
+            with self.snapshot_cache.build_lock():
+                df = self.snapshot_cache.load(source_key)
+                if df is None:
+                    df = self._read_excel_snapshot(source_key)
+                    source = 'excel'
+        if source == 'snapshot':
+            logger.info(f"Snapshot columnar del histórico cargado: {len(df)} registros")
+        
+        return HistoricoSnapshot(df, source=source, version=source_key['sha256'][:16])
+    
+    def _read_excel_snapshot(self, source_key: Dict[str, Any]) -> pd.DataFrame:
+        """Lee y normaliza el Excel, y guarda el snapshot para los próximos arranques y procesos"""
+        if self.excel_streaming and STREAMING_AVAILABLE:
+            tabla = self._read_excel_table(categoricas=True)
+            if self.snapshot_cache.store(tabla, source_key) and self.snapshot_cache.memory_mapped:
+                mapeado = self.snapshot_cache.load(source_key)
+                if mapeado is not None:
+                    return mapeado
+            return tabla.to_pandas(split_blocks=True, self_destruct=True)
+        
+        # Cargar archivo Excel
+        df = pd.read_excel(self.historico_excel_path)
+        logger.info(f"Archivo histórico Excel cargado: {len(df)} registros")
+        
+        # Normalizar nombres de columnas y fechas, y guardar snapshot para próximos arranques
+        df = self._normalize_columns(df)
+        df = self._parse_date_columns(df)
+        df = HistoricoSnapshotCache.prepare_frame(df)
+        df = self._encode_categorical_columns(df)
+        if self.snapshot_cache.store(df, source_key) and self.snapshot_cache.memory_mapped:
+            # Servir desde el archivo mapeado para compartir las páginas con los demás workers
+            mapeado = self.snapshot_cache.load(source_key)
+            if mapeado is not None:
+                df = mapeado
+        return df
     
-    def get_historico_by_radicado(self, numero_radicado: str) -> Optional[PQRSHistorico]:
+    def _install_snapshot(self, snapshot: HistoricoSnapshot):
+        """Publica un snapshot: los lectores ven el anterior o el nuevo completo, nunca uno a medias"""
+        self._historico_df = snapshot.df
+        self._historico_source = snapshot.source
+        self._snapshot = snapshot
+    
+    def _read_excel_table(self, categoricas: bool) -> 'pa.Table':
+        """
+        Lee el Excel por lotes acotados: cada lote se normaliza, se tipa y se agrega
+        a la tabla columnar final, sin materializar el libro completo en memoria.
+        """
+        builder = HistoricoColumnarBuilder()
+        for lote in self._iter_source_chunks():
+            builder.append(lote)
+        logger.info(f"Archivo histórico Excel leído por lotes: {builder.total_rows} registros")
+        return builder.build(self.CATEGORICAL_COLUMNS if categoricas else (), self.CATEGORICAL_MAX_RATIO)
+    
+    def _read_source_frame(self) -> pd.DataFrame:
+        """Excel fuente con columnas y fechas normalizadas (sin codificar categóricas)"""
+        if self.excel_streaming and STREAMING_AVAILABLE:
+            return self._read_excel_table(categoricas=False).to_pandas(split_blocks=True, self_destruct=True)
+        return self._normalize_columns(pd.read_excel(self.historico_excel_path))
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reconstruye el histórico fuera del camino de las peticiones y lo publica.
+        
+        Las peticiones siguen atendiéndose con el snapshot anterior mientras se
+        construyen el nuevo y sus índices. Con la ingesta incremental habilitada
+        solo se aplican las filas insertadas y las actualizadas respecto al
+        snapshot vigente; si el delta no es aplicable se reconstruye todo.
+        
+        Args:
+            force: reconstruir por completo aunque el archivo fuente no haya cambiado
+            
+        Returns:
+            True si se publicó un snapshot nuevo
+        """
+        with self._load_lock:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+            actual = self._snapshot
+            if not force and actual is not None and actual.version == source_key['sha256'][:16]:
+                return False
+            
+            snapshot = None
+            if self.incremental and not force and actual is not None:
+                try:
+                    snapshot = self._build_delta_snapshot(actual, source_key)
+                except Exception as e:
+                    logger.warning(f"No se pudo aplicar el delta del histórico, se reconstruirá completo: {e}")
+            
+            if snapshot is None:
+                snapshot = self._build_snapshot(source_key)
+                snapshot.warm()
+                self._install_snapshot(snapshot)
+            else:
+                # Los índices que dependen de todo el histórico se reconstruyen
+                # antes de publicar; el snapshot en disco se guarda después
+                snapshot.warm()
+                self._install_snapshot(snapshot)
+                self.snapshot_cache.store(snapshot.df, source_key)
+            self._start_watcher()
+            logger.info(f"Snapshot del histórico publicado: versión {snapshot.version} ({len(snapshot)} registros)")
+            return True
+    
+    def _build_delta_snapshot(self, actual: HistoricoSnapshot, source_key: Dict[str, Any]) -> Optional[HistoricoSnapshot]:
+        """
+        Construye el snapshot nuevo aplicando sobre el vigente solo las filas insertadas y actualizadas.
+        
+        Las filas existentes se comparan por radicado y huella de estado/seguimiento;
+        las que cambiaron se reemplazan en su misma posición (solo se copian las
+        columnas que difieren). Las insertadas se normalizan y se agregan al final,
+        de modo que las posiciones vigentes no cambian.
+        
+        Costo: el Excel se lee completo para calcular las huellas, y agregar filas
+        con ``pd.concat`` copia las columnas numéricas, de fecha y categóricas (las
+        de texto Arrow solo suman un chunk). Lo que se evita es volver a tipar,
+        codificar e indexar todo el histórico.
+        
+        Returns:
+            El snapshot, o None si se requiere una reconstrucción completa
+        """
+        fuente = self._read_source_frame()
+        if [str(col) for col in fuente.columns] != list(actual.df.columns):
+            logger.info("Las columnas del histórico cambiaron: se requiere reconstrucción completa")
+            return None
+        
+        delta = DeltaHistorico.calcular(actual.row_signatures, FirmasHistorico.from_frame(fuente))
+        if delta is None:
+            logger.info("La fuente eliminó registros del histórico: se requiere reconstrucción completa")
+            return None
+        
+        # Copia superficial: comparte las columnas y solo se copian las que se modifican
+        df = actual.df.copy(deep=False)
+        if len(delta.actualizadas):
+            cambios = self._prepare_delta_rows(fuente.iloc[delta.origen_actualizadas], df)
+            if cambios is None:
+                return None
+            cambios = cambios.reset_index(drop=True)
+            anteriores = df.iloc[delta.actualizadas].reset_index(drop=True)
+            for columna in df.columns:
+                if anteriores[columna].equals(cambios[columna]):
+                    continue
+                serie = df[columna].copy()
+                serie.iloc[delta.actualizadas] = cambios[columna].to_numpy()
+                df[columna] = serie
+        
+        if len(delta.origen_insertadas):
+            nuevas = self._prepare_delta_rows(fuente.iloc[delta.origen_insertadas], df)
+            if nuevas is None:
+                return None
+            df = pd.concat([df, nuevas], ignore_index=True)
+        
+        logger.info(f"Delta del histórico: {len(delta.origen_insertadas)} registros nuevos, "
+                    f"{len(delta.actualizadas)} actualizados")
+        return actual.apply_delta(df, delta.actualizadas, delta.firmas, source='delta', version=source_key['sha256'][:16])
+    
+    def _prepare_delta_rows(self, filas: pd.DataFrame, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Normaliza las filas del delta con los tipos del histórico vigente.
+        
+        Las columnas categóricas de ``df`` se amplían con los valores nuevos sin
+        reordenar sus categorías. Devuelve None si algún tipo no es compatible.
+        """
+        filas = self._parse_date_columns(filas.copy())
+        filas = HistoricoSnapshotCache.prepare_frame(filas)
+        for columna in filas.columns:
+            destino = df[columna].dtype
+            try:
+                if isinstance(destino, pd.CategoricalDtype):
+                    nuevas = pd.Index(filas[columna].dropna().unique()).difference(destino.categories)
+                    if len(nuevas):
+                        df[columna] = df[columna].cat.add_categories(nuevas)
+                        destino = df[columna].dtype
+                filas[columna] = filas[columna].astype(destino)
+            except (TypeError, ValueError) as e:
+                logger.info(f"Columna {columna} del delta incompatible con el histórico: {e}")
+                return None
+        return filas
+    
+    def get_historico_by_radicado(self, numero_radicado: str) -> Optional[PQRSHistoricoView]:
         """Obtiene un registro histórico por número de radicado"""
         try:
-            df = self._load_historico()
-            if 'numero_radicado' not in df.columns:
+            snapshot = self.get_query_snapshot(radicados=[numero_radicado])
+            if 'numero_radicado' not in snapshot.df.columns:
                 logger.error("Columna 'numero_radicado' no encontrada en el archivo histórico")
                 return None
             
-            # Convertir radicado a string para comparación
-            result = df[df['numero_radicado'].astype(str) == str(numero_radicado)]
-            if result.empty:
+            posiciones = snapshot.radicado_index.lookup(numero_radicado)
+            if len(posiciones) == 0:
                 logger.warning(f"No se encontró registro con radicado: {numero_radicado}")
                 return None
             
-            row = result.iloc[0]
-            return PQRSHistorico.from_dict(row.to_dict())
+            return snapshot.rows(posiciones[:1])[0]
             
         except Exception as e:
             logger.error(f"Error al buscar por radicado {numero_radicado}: {e}")
             return None
     
-    def search_historico_advanced(self, search_term: str, search_type: str = 'texto') -> List[PQRSHistorico]:
+    def get_historico_by_radicados(self, numeros_radicado: List[str]) -> Dict[str, PQRSHistoricoView]:
+        """Obtiene varios registros históricos por número de radicado en una sola pasada"""
+        try:
+            snapshot = self.get_query_snapshot(radicados=numeros_radicado)
+            resultado = {}
+            for radicado, posiciones in snapshot.radicado_index.lookup_many(numeros_radicado).items():
+                if len(posiciones) > 0:
+                    resultado[radicado] = snapshot.rows(posiciones[:1])[0]
+            return resultado
+            
+        except Exception as e:
+            logger.error(f"Error al buscar lote de radicados: {e}")
+            return {}
+    
+    def get_historico_by_radicado_prefix(self, prefijo: str) -> HistoricoRows:
+        """Obtiene los registros cuyo radicado comienza con el prefijo (p. ej. 'YYYYMMDD')"""
+        try:
+            snapshot = self.get_query_snapshot(prefijo=prefijo)
+            return snapshot.rows(snapshot.radicado_index.prefix(prefijo))
+            
+        except Exception as e:
+            logger.error(f"Error al buscar por prefijo de radicado {prefijo}: {e}")
+            return []
+    
+    def get_historico_by_radicado_range(self, radicado_inicio: str, radicado_fin: str) -> HistoricoRows:
+        """Obtiene los registros con radicado numérico en el rango cerrado indicado"""
+        try:
+            snapshot = self.get_query_snapshot(rango_radicados=(radicado_inicio, radicado_fin))
+            return snapshot.rows(snapshot.radicado_index.range(radicado_inicio, radicado_fin))
+            
+        except Exception as e:
+            logger.error(f"Error al buscar rango de radicados {radicado_inicio}-{radicado_fin}: {e}")
+            return []
+    
+    def search_historico_advanced(self, search_term: str, search_type: str = 'texto') -> HistoricoRows:
         """Búsqueda avanzada en el histórico por diferentes criterios"""
         try:
-            df = self._load_historico()
+            snapshot = self.get_snapshot()
+            df = snapshot.df
+            puntajes = None
             
             if search_type == 'texto':
                 # Búsqueda en texto de PQRS
                 if 'texto_pqrs' in df.columns:
-                    try:
-                        # Convertir a string y manejar valores nulos
-                        df_texto = df['texto_pqrs'].astype(str).fillna('')
-                        result = df[df_texto.str.contains(search_term, case=False, na=False)]
-                    except Exception as e:
-                        logger.error(f"Error en búsqueda por texto: {e}")
-                        # Fallback: búsqueda simple
-                        result = df[df['texto_pqrs'].astype(str).str.contains(search_term, case=False, na=False)]
+                    # Índice invertido con ranking BM25 sobre los campos de texto
+                    posiciones, puntajes = snapshot.text_index.search(search_term)
+                    if len(posiciones) == 0:
+                        # Sin coincidencias de términos completos: búsqueda por subcadena
+                        puntajes = None
+                        posiciones = np.flatnonzero(df['texto_pqrs'].astype(str).str.contains(search_term, case=False, na=False))
                 else:
                     logger.warning("Columna 'texto_pqrs' no disponible para búsqueda")
                     return []
             elif search_type == 'nombre':
                 # Búsqueda por nombre
                 if 'nombre' in df.columns:
-                    # Convertir a string y manejar valores nulos
-                    df_nombre = df['nombre'].astype(str).fillna('')
-                    result = df[df_nombre.str.contains(search_term, case=False, na=False)]
+                    # Coincidencias difusas y fonéticas ordenadas por puntaje
+                    posiciones, puntajes = snapshot.name_index.search(search_term)
+                    if len(posiciones) == 0:
+                        # Sin coincidencias por palabras: búsqueda por subcadena
+                        puntajes = None
+                        df_nombre = df['nombre'].astype(str).fillna('')
+                        posiciones = np.flatnonzero(df_nombre.str.contains(search_term, case=False, na=False))
                 else:
                     logger.warning("Columna 'nombre' no disponible para búsqueda")
                     return []
             elif search_type == 'clasificacion':
                 # Búsqueda por clasificación
                 if 'clasificacion' in df.columns:
-                    result = df[df['clasificacion'].str.contains(search_term, case=False, na=False)]
+                    posiciones = self._filter_by_category(snapshot, 'clasificacion', search_term)
                 else:
                     logger.warning("Columna 'clasificacion' no disponible para búsqueda")
                     return []
             elif search_type == 'estado':
                 # Búsqueda por estado
                 if 'estado_pqrs' in df.columns:
-                    result = df[df['estado_pqrs'].str.contains(search_term, case=False, na=False)]
+                    posiciones = self._filter_by_category(snapshot, 'estado_pqrs', search_term)
                 else:
                     logger.warning("Columna 'estado_pqrs' no disponible para búsqueda")
                     return []
@@ -209,28 +708,39 @@ class PQRSRepository:
                 logger.error(f"Tipo de búsqueda no válido: {search_type}")
                 return []
             
-            return [PQRSHistorico.from_dict(row.to_dict()) for _, row in result.iterrows()]
+            # Las búsquedas por índice quedan ordenadas por puntaje descendente (clave de paginación)
+            return snapshot.rows(posiciones, claves=puntajes, descendente=puntajes is not None)
             
         except Exception as e:
             logger.error(f"Error en búsqueda avanzada de histórico: {e}")
             return []
     
-    def get_historico_by_date_range(self, start_date: str, end_date: str) -> List[PQRSHistorico]:
+    def _filter_by_category(self, snapshot: HistoricoSnapshot, column: str, pattern: str) -> np.ndarray:
+        """Posiciones con la subcadena en una columna categórica, usando sus bitmaps (o códigos) por valor"""
+        df = snapshot.df
+        index = snapshot.bitmap_index(column)
+        if index is None:
+            return np.flatnonzero(df[column].astype(str).str.contains(pattern, case=False, na=False))
+        return index.positions(index.match_categories(pattern))
+    
+    def get_historico_by_date_range(self, start_date: str, end_date: str) -> HistoricoRows:
         """Obtiene registros históricos en un rango de fechas"""
         try:
-            df = self._load_historico()
-            if 'fecha_radicacion' not in df.columns:
+            try:
+                start_dt = pd.to_datetime(start_date)
+                end_dt = pd.to_datetime(end_date)
+            except Exception as e:
+                logger.warning(f"No se pudo procesar fechas: {e}")
+                return []
+            
+            snapshot = self.get_query_snapshot(fecha_inicio=start_dt, fecha_fin=end_dt)
+            if 'fecha_radicacion' not in snapshot.df.columns:
                 logger.error("Columna 'fecha_radicacion' no encontrada en el archivo histórico")
                 return []
             
-            # Convertir fechas a datetime si es posible
+            # Las fechas ya vienen convertidas desde la carga: ventana por búsqueda binaria
             try:
-                df['fecha_radicacion'] = pd.to_datetime(df['fecha_radicacion'], errors='coerce')
-                start_dt = pd.to_datetime(start_date)
-                end_dt = pd.to_datetime(end_date)
-                
-                result = df[(df['fecha_radicacion'] >= start_dt) & (df['fecha_radicacion'] <= end_dt)]
-                return [PQRSHistorico.from_dict(row.to_dict()) for _, row in result.iterrows()]
+                return snapshot.rows(np.sort(snapshot.date_index.range(start_dt, end_dt)))
                 
             except Exception as e:
                 logger.warning(f"No se pudo procesar fechas: {e}")
@@ -240,83 +750,104 @@ class PQRSRepository:
             logger.error(f"Error al obtener histórico por rango de fechas: {e}")
             return []
     
-    def get_historico_summary(self) -> Dict[str, Any]:
-        """Obtiene un resumen del histórico con estadísticas detalladas"""
-        try:
-            df = self._load_historico()
-            
-            summary = {
-                'total_registros': len(df),
-                'fuente_datos': self._historico_source,
-                'columnas_disponibles': list(df.columns),
-                'ultima_actualizacion': None
-            }
-            
-            # Estadísticas por clasificación
-            if 'clasificacion' in df.columns:
-                summary['por_clasificacion'] = df['clasificacion'].value_counts().to_dict()
-            
-            # Estadísticas por estado
-            if 'estado_pqrs' in df.columns:
-                summary['por_estado'] = df['estado_pqrs'].value_counts().to_dict()
-            
-            # Fecha más reciente
-            if 'fecha_radicacion' in df.columns:
-                try:
-                    df['fecha_radicacion'] = pd.to_datetime(df['fecha_radicacion'], errors='coerce')
-                    summary['ultima_actualizacion'] = df['fecha_radicacion'].max().strftime('%Y-%m-%d') if not df['fecha_radicacion'].isna().all() else None
-                except:
-                    summary['ultima_actualizacion'] = None
-            
-            return summary
-            
-        except Exception as e:
-            logger.error(f"Error al obtener resumen del histórico: {e}")
-            return {}
+    def consulta_avanzada(self, filtros: Dict[str, Any], filtros_categoricos: Dict[str, str],
+                          despues_de: Optional[Tuple[Any, int]] = None, limit: int = 0,
+                          columnas_leidas: Optional[List[str]] = None) -> ResultadoConsultaAvanzada:
+        """
+        Resuelve la consulta avanzada sobre conjuntos de posiciones del snapshot (sin copiar el DataFrame).
+        
+        Con histórico particionado solo se leen los meses que pueden cumplir la
+        fecha o el prefijo de radicado; los filtros se aplican del más selectivo
+        al menos selectivo y solo se ordena la página pedida.
+        """
+        radicado = str(filtros.get('radicado') or '').strip()
+        snapshot = self.get_query_snapshot(**self._criterios_particion(filtros, radicado))
+        posiciones = PlanificadorFiltros(snapshot, filtros_categoricos).ejecutar(filtros)
+        total = len(posiciones)
+        
+        # Orden por el campo pedido y la posición de la fila (orden total, estable entre páginas)
+        claves = None
+        descendente = str(filtros.get('orden', 'asc')).lower() == 'desc'
+        campo = filtros.get('ordenar_por')
+        if campo and campo in snapshot.df.columns:
+            if limit > 0:
+                # Top-k: solo se ordenan las filas pedidas
+                posiciones, claves = self._primeros_ordenados(snapshot, campo, posiciones, descendente, despues_de, limit)
+            else:
+                claves = claves_orden(snapshot.df[campo].iloc[posiciones])
+                orden = ordenar(posiciones, claves, descendente)
+                posiciones, claves = posiciones[orden], claves[orden]
+                if despues_de is not None:
+                    siguientes = posteriores(posiciones, claves, descendente, despues_de)
+                    posiciones, claves = posiciones[siguientes], claves[siguientes]
+        else:
+            if despues_de is not None:
+                posiciones = posiciones[posteriores(posiciones, None, descendente, despues_de)]
+            if limit > 0:
+                posiciones = posiciones[:limit]
+        
+        df = snapshot.df if columnas_leidas is None else snapshot.df[[c for c in dict.fromkeys(columnas_leidas)
+                                                                      if c in snapshot.df.columns]]
+        return ResultadoConsultaAvanzada(snapshot.rows(posiciones, claves=claves, descendente=descendente), total,
+                                         snapshot.version, df.iloc[posiciones])
+    
+    @staticmethod
+    def _criterios_particion(filtros: Dict[str, Any], radicado: str) -> Dict[str, Any]:
+        """Criterios de la consulta avanzada que permiten descartar particiones (fechas inválidas no descartan)"""
+        criterios = {}
+        if radicado.isdigit():
+            criterios['prefijo'] = radicado
+        if filtros.get('fecha_inicio'):
+            try:
+                criterios['fecha_inicio'] = pd.to_datetime(filtros['fecha_inicio'])
+                criterios['fecha_fin'] = pd.to_datetime(filtros['fecha_fin']) if filtros.get('fecha_fin') else None
+            except Exception:
+                criterios.pop('fecha_inicio', None)
+        return criterios
     
-    def get_all_historico(self) -> List[PQRSHistorico]:
-        """Obtiene todos los registros históricos"""
+    @staticmethod
+    def _primeros_ordenados(snapshot: HistoricoSnapshot, campo: str, posiciones: np.ndarray, descendente: bool,
+                            despues_de: Optional[Tuple[Any, int]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Primeras ``k`` filas (posiciones y claves de orden) después de ``despues_de``, sin ordenar todo el resultado.
+        
+        La fecha de radicación usa el orden precalculado del índice de fechas;
+        los demás campos, selección parcial sobre las claves de los candidatos.
+        """
+        serie = snapshot.df[campo]
+        if campo == 'fecha_radicacion' and pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            posiciones = snapshot.date_index.top(posiciones, k, descendente, despues_de)
+            return posiciones, claves_orden(serie.iloc[posiciones])
+        
+        claves = claves_orden(serie.iloc[posiciones])
+        if despues_de is not None:
+            siguientes = posteriores(posiciones, claves, descendente, despues_de)
+            posiciones, claves = posiciones[siguientes], claves[siguientes]
+        orden = primeros(posiciones, claves, descendente, k)
+        return posiciones[orden], claves[orden]
+    
+    def get_all_historico(self) -> HistoricoRows:
+        """Obtiene todos los registros históricos (vistas perezosas, sin materializar cada fila)"""
         try:
-            df = self._load_historico()
-            return [PQRSHistorico.from_dict(row.to_dict()) for _, row in df.iterrows()]
+            return self.get_snapshot().rows()
         except Exception as e:
             logger.error(f"Error al obtener todo el histórico: {e}")
             return []
     
-    def search_historico(self, search_term: str, column: str = 'texto_pqrs') -> List[PQRSHistorico]:
+    def search_historico(self, search_term: str, column: str = 'texto_pqrs') -> HistoricoRows:
         """Busca en el histórico por término de búsqueda"""
         try:
-            df = self._load_historico()
+            snapshot = self.get_snapshot()
+            df = snapshot.df
             if column not in df.columns:
                 logger.error(f"Columna '{column}' no encontrada en el archivo histórico")
                 return []
             
-            result = df[df[column].str.contains(search_term, case=False, na=False)]
-            return [PQRSHistorico.from_dict(row.to_dict()) for _, row in result.iterrows()]
+            return snapshot.rows(np.flatnonzero(df[column].str.contains(search_term, case=False, na=False)))
             
         except Exception as e:
             logger.error(f"Error en búsqueda de histórico: {e}")
             return []
-    
-    def get_estadisticas(self) -> Dict[str, Any]:
-        """Obtiene estadísticas del histórico"""
-        try:
-            df = self._load_historico()
-            stats = {
-                'total_registros': len(df),
-                'por_clasificacion': df['clasificacion'].value_counts().to_dict() if 'clasificacion' in df.columns else {},
-                'por_estado': df['estado_pqrs'].value_counts().to_dict() if 'estado_pqrs' in df.columns else {},
-                'ultima_actualizacion': df['fecha_radicacion'].max() if 'fecha_radicacion' in df.columns else None
-            }
-            return stats
-        except Exception as e:
-            logger.error(f"Error al obtener estadísticas: {e}")
-            return {}
-    
-    def refresh_cache(self):
-        """Refresca la caché de datos"""
-        self._historico_df = None
-        logger.info("Caché de datos refrescada")
 
 class PromptRepository:
     """Repositorio para gestión de prompts y plantillas"""
@@ -327,38 +858,48 @@ class PromptRepository:
         self.plantilla_files = config.PLANTILLA_FILES
         self._prompts_cache = {}
         self._plantillas_cache = {}
+        # Cada archivo se lee una sola vez aunque lo pidan varias peticiones a la vez
+        self._cargas_prompts = SingleFlight(self._prompts_cache)
+        self._cargas_plantillas = SingleFlight(self._plantillas_cache)
+    
+    @staticmethod
+    def _leer_archivo(path: Path, descripcion: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            contenido = f.read()
+        logger.debug(f"{descripcion} cargado en caché")
+        return contenido
     
     def get_prompt(self, prompt_name: str) -> str:
         """Obtiene un prompt específico"""
         if prompt_name not in self.prompt_files:
             raise ValueError(f"Prompt '{prompt_name}' no encontrado")
         
-        if prompt_name not in self._prompts_cache:
-            try:
-                with open(self.prompt_files[prompt_name], 'r', encoding='utf-8') as f:
-                    self._prompts_cache[prompt_name] = f.read()
-                logger.debug(f"Prompt '{prompt_name}' cargado en caché")
-            except Exception as e:
-                logger.error(f"Error al cargar prompt '{prompt_name}': {e}")
-                raise
-        
-        return self._prompts_cache[prompt_name]
+        try:
+            return self._cargas_prompts.do(
+                prompt_name, lambda: self._leer_archivo(self.prompt_files[prompt_name], f"Prompt '{prompt_name}'"))
+        except Exception as e:
+            logger.error(f"Error al cargar prompt '{prompt_name}': {e}")
+            raise
     
     def get_plantilla(self, plantilla_name: str) -> str:
         """Obtiene una plantilla específica"""
         if plantilla_name not in self.plantilla_files:
             raise ValueError(f"Plantilla '{plantilla_name}' no encontrada")
         
-        if plantilla_name not in self._plantillas_cache:
-            try:
-                with open(self.plantilla_files[plantilla_name], 'r', encoding='utf-8') as f:
-                    self._plantillas_cache[plantilla_name] = f.read()
-                logger.debug(f"Plantilla '{plantilla_name}' cargada en caché")
-            except Exception as e:
-                logger.error(f"Error al cargar plantilla '{plantilla_name}': {e}")
-                raise
-        
-        return self._plantillas_cache[plantilla_name]
+        try:
+            return self._cargas_plantillas.do(
+                plantilla_name,
+                lambda: self._leer_archivo(self.plantilla_files[plantilla_name], f"Plantilla '{plantilla_name}'"))
+        except Exception as e:
+            logger.error(f"Error al cargar plantilla '{plantilla_name}': {e}")
+            raise
+    
+    def warm(self):
+        """Carga en caché todos los prompts y plantillas configurados"""
+        for prompt_name in self.prompt_files:
+            self.get_prompt(prompt_name)
+        for plantilla_name in self.plantilla_files:
+            self.get_plantilla(plantilla_name)
     
     def format_prompt(self, prompt_name: str, **kwargs) -> str:
         """Formatea un prompt con parámetros"""
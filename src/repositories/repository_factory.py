@@ -0,0 +1,44 @@
+"""
+Factory de repositorios del histórico de PQRS
+
+Permite elegir el backend de almacenamiento del histórico por
+configuración (HISTORICO_BACKEND) sin cambiar los servicios que lo usan.
+"""
+
+from pathlib import Path
+from src.config.config import config
+from src.repositories.partitioned_pqrs_repository import PartitionedPQRSRepository
+from src.repositories.pqrs_repository import HistoricoRepository, PQRSRepository
+from src.repositories.sqlite_pqrs_repository import SQLitePQRSRepository
+from src.utils.logger import logger
+
+
+class PQRSRepositoryFactory:
+    """Factory para crear repositorios del histórico"""
+    
+    @staticmethod
+    def create_pandas_repository() -> PQRSRepository:
+        """Crea un repositorio con el histórico completo en memoria (pandas)"""
+        return PQRSRepository()
+    
+    @staticmethod
+    def create_sqlite_repository(db_path: Path = None) -> SQLitePQRSRepository:
+        """Crea un repositorio respaldado por un archivo SQLite con índices y FTS5"""
+        return SQLitePQRSRepository(db_path)
+    
+    @staticmethod
+    def create_partitioned_repository(base_dir: Path = None) -> PartitionedPQRSRepository:
+        """Crea un repositorio con el histórico particionado por mes de radicación"""
+        return PartitionedPQRSRepository(base_dir)
+    
+    @staticmethod
+    def create(backend: str = None) -> HistoricoRepository:
+        """Crea el repositorio del backend indicado o del configurado en HISTORICO_BACKEND"""
+        backend = (backend or config.HISTORICO_BACKEND).lower()
+        if backend == 'sqlite':
+            return PQRSRepositoryFactory.create_sqlite_repository()
+        if backend == 'particionado':
+            return PQRSRepositoryFactory.create_partitioned_repository()
+        if backend != 'pandas':
+            logger.warning(f"Backend de histórico desconocido '{backend}': se usa pandas")
+        return PQRSRepositoryFactory.create_pandas_repository()
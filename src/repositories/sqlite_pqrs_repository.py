@@ -0,0 +1,986 @@
+"""
+Backend SQLite del histórico de PQRS
+
+Guarda el histórico normalizado en un archivo SQLite local, con índices
+B-tree sobre el radicado, las fechas y las columnas categóricas. Las
+búsquedas devuelven lo mismo que el backend en memoria: el texto libre se
+resuelve con tablas de postings que reproducen el ranking BM25F de
+TextIndex, los nombres con las claves fonéticas y el diccionario de
+borrados de NameIndex, y los filtros por subcadena con tablas FTS5 de
+trigramas que preseleccionan las filas antes de verificarlas con la misma
+expresión regular. La base se construye leyendo el Excel por lotes y las
+consultas solo materializan en pandas las filas del resultado, de modo que
+la memoria de cada worker no crece con el tamaño del histórico.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from src.config.config import config
+from src.indexes.completion_index import CompletionIndex, DEFAULT_COMPLETION_COLUMNS, DEFAULT_TEXT_COLUMN
+from src.indexes.name_index import NameIndex, _borrados, clave_fonetica, columnas_nombre, tokens_fila
+from src.indexes.radicado_index import normalizar_radicado
+from src.indexes.text_index import DEFAULT_FIELD_BOOSTS, TextIndex
+from src.indexes.text_utils import analyze, fold_text
+from src.models.historico_rows import HistoricoRows, PQRSHistoricoView
+from src.repositories.historico_aggregates import COLUMNA_FECHA, DIMENSIONES, HistoricoAggregates
+from src.repositories.historico_cache import HistoricoSnapshotCache
+from src.repositories.historico_excel_stream import PYARROW_AVAILABLE, HistoricoColumnarBuilder, texto_celda
+from src.repositories.pqrs_repository import HistoricoRepository, ResultadoConsultaAvanzada
+from src.utils.logger import logger
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+
+TABLA = 'historico'
+TABLA_POSTINGS = 'historico_postings'
+TABLA_NOMBRES = 'historico_nombres'
+TABLA_TODO = 'historico_todo'
+TABLA_NOMBRE_TOKENS = 'historico_nombre_tokens'
+TABLA_NOMBRE_CLAVES = 'historico_nombre_claves'
+TABLA_NOMBRE_BORRADOS = 'historico_nombre_borrados'
+TABLA_META = 'historico_meta'
+TABLA_TERMINOS = 'historico_terminos'
+
+# Columnas auxiliares (no forman parte de los registros devueltos)
+COL_POSICION = '__posicion'
+COL_CLAVE = '__clave'
+COL_RADICADO = '__radicado'
+COL_RADICADO_NUM = '__radicado_num'
+
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+INSERT_CHUNK_SIZE = 10000
+MAX_SQL_PARAMS = 900
+MAX_COMPLETION_TERMS = 5000
+LONGITUD_MINIMA_TRIGRAMAS = 3
+
+_METACARACTERES_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def _q(nombre: str) -> str:
+    """Identificador SQL entre comillas"""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def _nombre_sql(posicion: int) -> str:
+    """Nombre de la columna en la tabla SQLite según su posición en el DataFrame"""
+    return f"c{posicion}"
+
+
+def _lotes(valores: List[Any], tamano: int = MAX_SQL_PARAMS) -> Iterator[List[Any]]:
+    """Valores en lotes que caben en los parámetros de una sentencia"""
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+
+def _frase_fts(patron: str) -> str:
+    """Patrón literal como frase FTS5 (subcadena en una tabla de trigramas)"""
+    return '"' + patron.replace('"', '""') + '"'
+
+
+def _usa_trigramas(patron: str) -> bool:
+    """Los trigramas solo preseleccionan patrones literales de al menos tres caracteres"""
+    return len(patron) >= LONGITUD_MINIMA_TRIGRAMAS and not _METACARACTERES_RE.search(patron)
+
+
+@lru_cache(maxsize=256)
+def _compilar(patron: str):
+    return re.compile(patron, re.IGNORECASE)
+
+
+def _contiene(valor, patron) -> int:
+    """Función SQL contiene(valor, patron): misma semántica que str.contains(case=False)"""
+    if valor is None or patron is None:
+        return 0
+    return 1 if _compilar(patron).search(str(valor)) else 0
+
+
+class _IndiceTextoSQLite(TextIndex):
+    """
+    Ranking BM25F de TextIndex calculado sobre la tabla de postings.
+
+    Cada posting guarda la frecuencia del término en un campo y la longitud
+    de ese campo en la fila; el peso se normaliza con las longitudes medias
+    del histórico completo, con las mismas operaciones que el índice en
+    memoria, de modo que los puntajes (y el orden de los resultados) coinciden.
+    """
+
+    def __init__(self, conexion: Callable[[], sqlite3.Connection], meta: Dict[str, Any]):
+        super().__init__({}, {campo: DEFAULT_FIELD_BOOSTS[campo] for campo in meta['texto']})
+        self.total_docs = meta['registros']
+        self._conexion = conexion
+        self._boosts = np.asarray([self.field_boosts[campo] for campo in meta['texto']], dtype=np.float64)
+        self._medias = np.asarray(meta['texto_medias'], dtype=np.float64)
+
+    def _postings_de(self, termino: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        filas = self._conexion().execute(
+            f"SELECT fila, campo, tf, longitud FROM {TABLA_POSTINGS} WHERE termino = ? ORDER BY fila, campo",
+            (termino,)
+        ).fetchall()
+        if not filas:
+            return None
+        datos = np.asarray(filas, dtype=np.float64)
+        campos = datos[:, 1].astype(np.int64)
+        normalizacion = 1.0 - self.b + self.b * datos[:, 3] / self._medias[campos]
+        pesos = self._boosts[campos] * datos[:, 2] / normalizacion
+        # Suma por fila en el orden de los campos, como el índice en memoria
+        docs, inicios = np.unique(datos[:, 0].astype(np.int64), return_index=True)
+        tf = np.add.reduceat(pesos, inicios)
+        return docs, self.score(tf, len(docs))
+
+
+class _IndiceNombresSQLite(NameIndex):
+    """Búsqueda difusa y fonética de NameIndex sobre las tablas de tokens, claves y borrados"""
+
+    def __init__(self, conexion: Callable[[], sqlite3.Connection], total_rows: int, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.total_rows = total_rows
+        self._conexion = conexion
+
+    @classmethod
+    def construir_tablas(cls, conn: sqlite3.Connection, max_distance: int = 2):
+        """Claves fonéticas y borrados del vocabulario ya cargado en la tabla de tokens"""
+        indice = cls(lambda: conn, 0, max_distance)
+        conn.execute(f"CREATE TABLE {TABLA_NOMBRE_CLAVES} (token TEXT PRIMARY KEY, clave TEXT)")
+        conn.execute(f"CREATE TABLE {TABLA_NOMBRE_BORRADOS} (variante TEXT, clave TEXT, PRIMARY KEY (variante, clave)) WITHOUT ROWID")
+        vocabulario = [fila[0] for fila in conn.execute(f"SELECT DISTINCT token FROM {TABLA_NOMBRE_TOKENS}").fetchall()]
+        claves = {}
+        for token in vocabulario:
+            claves[token] = clave_fonetica(token)
+        conn.executemany(f"INSERT INTO {TABLA_NOMBRE_CLAVES} VALUES (?, ?)", claves.items())
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {TABLA_NOMBRE_BORRADOS} VALUES (?, ?)",
+            ((variante, clave) for clave in set(claves.values())
+             for variante in _borrados(clave, indice._distancia_para(clave)))
+        )
+        conn.execute(f"CREATE INDEX idx_{TABLA_NOMBRE_CLAVES}_clave ON {TABLA_NOMBRE_CLAVES} (clave, token)")
+
+    def _token_exacto(self, token: str) -> Optional[str]:
+        fila = self._conexion().execute(f"SELECT token FROM {TABLA_NOMBRE_CLAVES} WHERE token = ?", (token,)).fetchone()
+        return fila[0] if fila else None
+
+    def _tokens_prefijo(self, prefijo: str) -> Iterable[str]:
+        filas = self._conexion().execute(
+            f"SELECT token FROM {TABLA_NOMBRE_CLAVES} WHERE token >= ? AND token < ?", (prefijo, prefijo + '\uffff')
+        ).fetchall()
+        return [fila[0] for fila in filas]
+
+    def _claves_borrados(self, variantes: Set[str]) -> Set[str]:
+        claves = set()
+        for lote in _lotes(list(variantes)):
+            filas = self._conexion().execute(
+                f"SELECT DISTINCT clave FROM {TABLA_NOMBRE_BORRADOS} WHERE variante IN ({', '.join(['?'] * len(lote))})",
+                lote
+            ).fetchall()
+            claves.update(fila[0] for fila in filas)
+        return claves
+
+    def _tokens_por_clave(self, claves: Iterable[str]) -> Dict[str, List[str]]:
+        tokens: Dict[str, List[str]] = {}
+        for lote in _lotes(list(claves)):
+            for clave, token in self._conexion().execute(
+                    f"SELECT clave, token FROM {TABLA_NOMBRE_CLAVES} WHERE clave IN ({', '.join(['?'] * len(lote))})", lote):
+                tokens.setdefault(clave, []).append(token)
+        return tokens
+
+    def _filas_tokens(self, tokens: Iterable[str]) -> Dict[str, np.ndarray]:
+        filas: Dict[str, List[int]] = {}
+        for lote in _lotes(list(tokens)):
+            for token, fila in self._conexion().execute(
+                    f"SELECT token, fila FROM {TABLA_NOMBRE_TOKENS} WHERE token IN ({', '.join(['?'] * len(lote))}) "
+                    f"ORDER BY token, fila", lote):
+                filas.setdefault(token, []).append(fila)
+        return {token: np.asarray(posiciones, dtype=np.int64) for token, posiciones in filas.items()}
+
+
+class _BaseSQLite:
+    """Base publicada: metadatos y derivados de una misma versión del archivo SQLite"""
+
+    def __init__(self, meta: Dict[str, Any], generation: int):
+        self.meta = meta
+        self.generation = generation
+        self.aggregates: Optional[HistoricoAggregates] = None
+        self.completion_index: Optional[CompletionIndex] = None
+        self.categorias: Dict[str, List[str]] = {}
+        self.text_index: Optional[_IndiceTextoSQLite] = None
+        self.name_index: Optional[_IndiceNombresSQLite] = None
+
+
+class SQLitePQRSRepository(HistoricoRepository):
+    """Repositorio del histórico respaldado por SQLite con índices B-tree, postings y FTS5"""
+
+    BACKEND = 'sqlite'
+    # Incrementar cuando cambie el esquema de tablas o índices
+    SQLITE_SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: Path = None):
+        """Inicializa el repositorio SQLite"""
+        super().__init__()
+        self.db_path = Path(db_path or config.HISTORICO_SQLITE_PATH)
+        self._local = threading.local()
+        self._generation = 0
+        self._base: Optional[_BaseSQLite] = None
+
+    # Construcción y conexión
+
+    def _schema_tag(self) -> str:
+        return f"{HistoricoSnapshotCache.SCHEMA_VERSION}.{self.SQLITE_SCHEMA_VERSION}"
+
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        """Versión de la base publicada (None si aún no se ha abierto)"""
+        base = self._base
+        return base.meta.get('version') if base is not None else None
+
+    @property
+    def _meta(self) -> Dict[str, Any]:
+        return self._get_base().meta
+
+    def _get_base(self) -> _BaseSQLite:
+        """Base publicada; la lectura no toma ningún lock"""
+        base = self._base
+        if base is None:
+            with self._load_lock:
+                base = self._base
+                if base is None:
+                    base = self._open_database()
+                    self._base = base
+                    self._start_watcher()
+        return base
+
+    def _ensure_database(self) -> Dict[str, Any]:
+        """Verifica que la base corresponda al Excel vigente, reconstruyéndola si cambió"""
+        return self._get_base().meta
+
+    def _open_database(self, source_key: Dict[str, Any] = None) -> _BaseSQLite:
+        """Abre la base del Excel vigente construyéndola si no existe o está desactualizada"""
+        if not self.historico_excel_path.exists():
+            logger.error("No se encontró archivo histórico Excel")
+            raise FileNotFoundError("No se encontró archivo histórico Excel")
+
+        if source_key is None:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+        meta = self._read_db_meta()
+        if not meta or meta.get('sha256') != source_key['sha256'] or meta.get('schema') != self._schema_tag():
+            self._build_database(source_key)
+            meta = self._read_db_meta()
+        else:
+            logger.info(f"Base SQLite del histórico vigente: {meta.get('registros')} registros")
+
+        self._historico_source = 'sqlite'
+        self._generation += 1
+        base = _BaseSQLite(meta, self._generation)
+        base.text_index = _IndiceTextoSQLite(lambda: self._connection(base), meta)
+        base.name_index = _IndiceNombresSQLite(lambda: self._connection(base), meta['registros'])
+        return base
+
+    def reload(self, force: bool = False) -> bool:
+        """Reconstruye la base fuera del camino de las peticiones y la publica si el Excel cambió"""
+        with self._load_lock:
+            source_key = self.snapshot_cache.compute_source_key(self.historico_excel_path)
+            actual = self._base
+            if not force and actual is not None and actual.meta.get('sha256') == source_key['sha256']:
+                return False
+
+            if force:
+                self._build_database(source_key)
+            base = self._open_database(source_key)
+            # Agregados y sugerencias listos antes de publicar
+            self._calcular_agregados(base)
+            self._calcular_sugerencias(base)
+            self._base = base
+            self._start_watcher()
+            logger.info(f"Base SQLite del histórico publicada: versión {base.meta.get('version')}")
+            return True
+
+    def _read_db_meta(self) -> Optional[Dict[str, Any]]:
+        """Lee los metadatos guardados en la base, si existe"""
+        if not self.db_path.is_file():
+            return None
+        try:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                filas = conn.execute(f"SELECT clave, valor FROM {TABLA_META}").fetchall()
+            finally:
+                conn.close()
+            return {clave: json.loads(valor) for clave, valor in filas}
+        except Exception as e:
+            logger.warning(f"Metadatos de la base SQLite del histórico ilegibles: {e}")
+            return None
+
+    def _build_database(self, source_key: Dict[str, Any]):
+        """
+        Vuelca el Excel a un archivo SQLite nuevo y lo reemplaza de forma atómica.
+
+        Los lotes del Excel se insertan a medida que se leen, sin armar el
+        DataFrame completo ni el snapshot columnar. Luego se unifican los tipos
+        de cada columna como HistoricoColumnarBuilder y una segunda pasada por
+        lotes de filas llena las tablas de búsqueda.
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.unlink(missing_ok=True)
+
+        try:
+            conn = sqlite3.connect(tmp_path)
+            conn.create_function('texto_celda', 1, texto_celda, deterministic=True)
+            try:
+                columnas, registros, tipos = self._cargar_filas(conn)
+                fechas = self._unificar_tipos(conn, columnas, tipos)
+                nombres_sql = {columna: _nombre_sql(i) for i, columna in enumerate(columnas)}
+                nombres_sql.update({COL_RADICADO: COL_RADICADO, COL_RADICADO_NUM: COL_RADICADO_NUM})
+
+                # Índices B-tree: radicado, fechas y columnas categóricas
+                indices = [COL_RADICADO, COL_RADICADO_NUM] + fechas
+                indices += [c for c in self.CATEGORICAL_COLUMNS if c in columnas]
+                for numero, columna in enumerate(indices):
+                    conn.execute(f"CREATE INDEX idx_{TABLA}_{numero} ON {TABLA} ({nombres_sql[columna]})")
+
+                # Fechas sin hora en todo el histórico: se comparan como 'YYYY-MM-DD' (igual que astype(str))
+                solo_fecha = [
+                    c for c in fechas if conn.execute(
+                        f"SELECT NOT EXISTS (SELECT 1 FROM {TABLA} WHERE substr({nombres_sql[c]}, 12) != '00:00:00')"
+                    ).fetchone()[0]
+                ]
+                texto = [c for c in DEFAULT_FIELD_BOOSTS if c in columnas]
+                medias = self._llenar_busqueda(conn, columnas, registros, texto, solo_fecha)
+
+                # Términos frecuentes del texto de la PQRS para el autocompletado
+                conn.execute(f"CREATE TABLE {TABLA_TERMINOS} (termino TEXT PRIMARY KEY, frecuencia INTEGER)")
+                if DEFAULT_TEXT_COLUMN in columnas:
+                    textos = (fila[0] for fila in conn.execute(
+                        f"SELECT {nombres_sql[DEFAULT_TEXT_COLUMN]} FROM {TABLA} ORDER BY {COL_POSICION}"))
+                    terminos = CompletionIndex._terminos_frecuentes(textos, MAX_COMPLETION_TERMS)
+                    conn.executemany(f"INSERT INTO {TABLA_TERMINOS} VALUES (?, ?)", terminos.items())
+
+                # Trigramas sobre el nombre para filtros por subcadena
+                nombres = 'nombre' in columnas
+                if nombres:
+                    conn.execute(f"CREATE VIRTUAL TABLE {TABLA_NOMBRES} USING fts5(nombre, tokenize='trigram')")
+                    conn.execute(f"INSERT INTO {TABLA_NOMBRES} (rowid, nombre) SELECT {COL_POSICION}, {nombres_sql['nombre']} FROM {TABLA}")
+
+                conn.execute(f"CREATE TABLE {TABLA_META} (clave TEXT PRIMARY KEY, valor TEXT)")
+                meta = {
+                    'schema': self._schema_tag(),
+                    'sha256': source_key['sha256'],
+                    'version': source_key['sha256'][:16],
+                    'registros': registros,
+                    'columnas': columnas,
+                    'fechas': fechas,
+                    'solo_fecha': solo_fecha,
+                    'texto': texto,
+                    'texto_medias': medias,
+                    'nombres': nombres
+                }
+                conn.executemany(f"INSERT INTO {TABLA_META} VALUES (?, ?)", [(k, json.dumps(v)) for k, v in meta.items()])
+                conn.commit()
+            finally:
+                conn.close()
+
+            os.replace(tmp_path, self.db_path)
+            logger.info(f"Base SQLite del histórico construida: {registros} registros en {self.db_path.name}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _cargar_filas(self, conn: sqlite3.Connection) -> Tuple[List[str], int, Dict[str, List[Any]]]:
+        """
+        Inserta los lotes normalizados del Excel en la tabla del histórico.
+
+        Las columnas no declaran tipo, de modo que cada valor conserva el de su
+        lote hasta unificarlos al final.
+
+        Returns:
+            (columnas, registros, tipos de cada columna en cada lote)
+        """
+        columnas: Optional[List[str]] = None
+        tipos: Dict[str, List[Any]] = {}
+        registros = 0
+        for lote in self._iter_source_chunks():
+            if columnas is None:
+                columnas = [str(c) for c in lote.columns]
+                # Nombres SQL posicionales: SQLite no distingue mayúsculas ('TEMA' / 'tema')
+                definiciones = [f"{COL_POSICION} INTEGER PRIMARY KEY", f"{COL_RADICADO} TEXT", f"{COL_RADICADO_NUM} INTEGER"]
+                definiciones += [_nombre_sql(i) for i in range(len(columnas))]
+                conn.execute(f"CREATE TABLE {TABLA} ({', '.join(definiciones)})")
+            elif [str(c) for c in lote.columns] != columnas:
+                raise ValueError("Las columnas del lote no coinciden con las del histórico")
+
+            esquema = pa.Schema.from_pandas(lote, preserve_index=False) if PYARROW_AVAILABLE else None
+            for columna in columnas:
+                tipos.setdefault(columna, []).append(esquema.field(columna).type if esquema else lote[columna].dtype)
+
+            fechas = [c for c in columnas if pd.api.types.is_datetime64_any_dtype(lote[c])]
+            marcadores = ', '.join(['?'] * (len(columnas) + 3))
+            conn.executemany(f"INSERT INTO {TABLA} VALUES ({marcadores})", self._filas_sql(lote, registros, fechas))
+            registros += len(lote)
+
+        if columnas is None:
+            columnas = []
+            conn.execute(f"CREATE TABLE {TABLA} ({COL_POSICION} INTEGER PRIMARY KEY, {COL_RADICADO} TEXT, {COL_RADICADO_NUM} INTEGER)")
+        return columnas, registros, tipos
+
+    @staticmethod
+    def _unificar_tipos(conn: sqlite3.Connection, columnas: List[str], tipos: Dict[str, List[Any]]) -> List[str]:
+        """
+        Lleva cada columna al tipo común de sus lotes (ver HistoricoColumnarBuilder.tipo_comun).
+
+        Returns:
+            columnas de fecha
+        """
+        if not PYARROW_AVAILABLE:
+            # Sin lectura en streaming los lotes salen de un mismo DataFrame: mismos tipos
+            return [c for c in columnas if pd.api.types.is_datetime64_any_dtype(tipos[c][0])]
+
+        fechas = []
+        for i, columna in enumerate(columnas):
+            destino = HistoricoColumnarBuilder.tipo_comun(tipos[columna])
+            nombre = _nombre_sql(i)
+            if pa.types.is_timestamp(destino):
+                fechas.append(columna)
+            elif pa.types.is_floating(destino):
+                conn.execute(f"UPDATE {TABLA} SET {nombre} = CAST({nombre} AS REAL) WHERE typeof({nombre}) = 'integer'")
+            elif pa.types.is_string(destino) or pa.types.is_large_string(destino):
+                conn.execute(f"UPDATE {TABLA} SET {nombre} = texto_celda({nombre}) WHERE typeof({nombre}) NOT IN ('text', 'null')")
+        return fechas
+
+    def _llenar_busqueda(self, conn: sqlite3.Connection, columnas: List[str], registros: int,
+                         texto: List[str], solo_fecha: List[str]) -> List[float]:
+        """
+        Tablas de búsqueda, en una pasada por lotes de filas.
+
+        - postings BM25F: término, fila, campo, frecuencia y longitud del campo
+        - tokens de nombre por fila (NameIndex), con sus claves fonéticas y borrados
+        - FTS5 de trigramas con el texto de todas las columnas de cada fila
+
+        Returns:
+            longitud media de cada campo de texto (normalización de BM25F)
+        """
+        conn.execute(f"CREATE TABLE {TABLA_POSTINGS} (termino TEXT, fila INTEGER, campo INTEGER, tf INTEGER, "
+                     f"longitud INTEGER, PRIMARY KEY (termino, fila, campo)) WITHOUT ROWID")
+        conn.execute(f"CREATE TABLE {TABLA_NOMBRE_TOKENS} (token TEXT, fila INTEGER, PRIMARY KEY (token, fila)) WITHOUT ROWID")
+        conn.execute(f"CREATE VIRTUAL TABLE {TABLA_TODO} USING fts5(texto, tokenize='trigram')")
+
+        posicion_texto = [columnas.index(c) for c in texto]
+        posicion_nombres = [columnas.index(c) for c in columnas_nombre(columnas)]
+        fechas_cortas = {columnas.index(c) for c in solo_fecha}
+        totales = [0] * len(texto)
+        seleccion = ', '.join([COL_POSICION] + [_nombre_sql(i) for i in range(len(columnas))]) if columnas else COL_POSICION
+
+        for inicio in range(0, registros, INSERT_CHUNK_SIZE):
+            filas = conn.execute(
+                f"SELECT {seleccion} FROM {TABLA} WHERE {COL_POSICION} >= ? AND {COL_POSICION} < ? ORDER BY {COL_POSICION}",
+                (inicio, inicio + INSERT_CHUNK_SIZE)
+            ).fetchall()
+
+            postings, tokens, textos = [], [], []
+            for fila in filas:
+                posicion, valores = fila[0], fila[1:]
+                for campo, i in enumerate(posicion_texto):
+                    terminos = analyze(valores[i])
+                    totales[campo] += len(terminos)
+                    postings.extend((termino, posicion, campo, tf, len(terminos))
+                                    for termino, tf in Counter(terminos).items())
+                tokens.extend((token, posicion) for token in tokens_fila(valores[i] for i in posicion_nombres))
+                # Misma representación de texto que el filtro en memoria (fechas sin hora como 'YYYY-MM-DD')
+                textos.append((posicion, '\n'.join(
+                    str(valor)[:10] if i in fechas_cortas else str(valor)
+                    for i, valor in enumerate(valores) if valor is not None
+                )))
+
+            conn.executemany(f"INSERT INTO {TABLA_POSTINGS} VALUES (?, ?, ?, ?, ?)", postings)
+            conn.executemany(f"INSERT INTO {TABLA_NOMBRE_TOKENS} VALUES (?, ?)", tokens)
+            conn.executemany(f"INSERT INTO {TABLA_TODO} (rowid, texto) VALUES (?, ?)", textos)
+
+        _IndiceNombresSQLite.construir_tablas(conn)
+        return [(total / registros) if registros and total else 1.0 for total in totales]
+
+    @staticmethod
+    def _filas_sql(bloque: pd.DataFrame, inicio: int, fechas: List[str]):
+        """Filas del bloque como tuplas de tipos nativos (NULL para vacíos)"""
+        datos = bloque.copy()
+        for columna in fechas:
+            datos[columna] = datos[columna].dt.strftime(FORMATO_FECHA)
+        datos = datos.astype(object)
+        datos = datos.where(datos.notna(), None)
+
+        if 'numero_radicado' in bloque.columns:
+            radicados = [normalizar_radicado(v) for v in bloque['numero_radicado'].tolist()]
+        else:
+            radicados = [None] * len(bloque)
+        numericos = [int(r) if r and r.isdigit() and len(r) <= 18 else None for r in radicados]
+
+        for offset, valores in enumerate(datos.itertuples(index=False, name=None)):
+            yield (inicio + offset, radicados[offset], numericos[offset]) + valores
+
+    def _connection(self, base: _BaseSQLite = None) -> sqlite3.Connection:
+        """Conexión de solo lectura propia del hilo actual para la base indicada (o la publicada)"""
+        base = base or self._get_base()
+        conexiones = getattr(self._local, 'conexiones', None)
+        if conexiones is None:
+            conexiones = self._local.conexiones = {}
+        conn = conexiones.get(base.generation)
+        if conn is None:
+            # Las conexiones de bases anteriores siguen leyendo su archivo hasta cerrarse
+            for generacion in [g for g in conexiones if g < base.generation]:
+                conexiones.pop(generacion).close()
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            conn.create_function('contiene', 2, _contiene, deterministic=True)
+            conexiones[base.generation] = conn
+        return conn
+
+    # Consultas
+
+    def _query_frame(self, where: str = '', params: Tuple = (), order: str = None, limit: int = None,
+                     join: str = '', clave: str = None, columnas: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Ejecuta un SELECT sobre el histórico y devuelve las filas con los tipos del DataFrame original.
+
+        Además de las columnas del histórico trae la posición de cada fila
+        (``COL_POSICION``) y, si se indica, la expresión ``clave`` de orden
+        (``COL_CLAVE``), que ``_registros`` usa para la paginación por cursor.
+        Con ``columnas`` solo se leen esas columnas del histórico.
+        """
+        base = self._get_base()
+        conn = self._connection(base)
+        meta = base.meta
+        seleccion = ', '.join(f"h.{_nombre_sql(i)} AS {_q(c)}" for i, c in enumerate(meta['columnas'])
+                              if columnas is None or c in columnas)
+        seleccion = ', '.join(filter(None, [seleccion, f"h.{COL_POSICION} AS {_q(COL_POSICION)}"]))
+        if clave:
+            seleccion += f", {clave} AS {_q(COL_CLAVE)}"
+        sql = f"SELECT {seleccion} FROM {TABLA} h"
+        if join:
+            sql += f" {join}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order or f'h.{COL_POSICION}'}"
+        if limit:
+            sql += " LIMIT ?"
+            params = tuple(params) + (int(limit),)
+
+        df = pd.read_sql_query(sql, conn, params=tuple(params))
+        for columna in meta['fechas']:
+            if columna not in df.columns:
+                continue
+            df[columna] = pd.to_datetime(df[columna], format=FORMATO_FECHA, errors='coerce')
+        return df
+
+    def _sql(self, columna: str, meta: Dict[str, Any] = None) -> str:
+        """Nombre SQL de una columna del histórico"""
+        return _nombre_sql((meta or self._meta)['columnas'].index(columna))
+
+    @staticmethod
+    def registros(df: pd.DataFrame, descendente: bool = False) -> HistoricoRows:
+        """Filas del resultado con su posición en el histórico y su clave de orden (si la trae)"""
+        ids = df.pop(COL_POSICION).to_numpy() if COL_POSICION in df.columns else None
+        claves = df.pop(COL_CLAVE).to_numpy() if COL_CLAVE in df.columns else None
+        return HistoricoRows.from_frame(df, ids=ids, claves=claves, descendente=descendente)
+
+    def _filas_en_orden(self, posiciones: np.ndarray, claves: Optional[np.ndarray] = None,
+                        descendente: bool = False) -> HistoricoRows:
+        """Filas de las posiciones indicadas, en ese orden (resultados de los índices de búsqueda)"""
+        join = f"JOIN json_each(?) j ON j.value = h.{COL_POSICION}"
+        df = self._query_frame(params=(json.dumps(np.asarray(posiciones).tolist()),), order='j.key', join=join)
+        if claves is not None:
+            df[COL_CLAVE] = claves
+        return self.registros(df, descendente)
+
+    def _condicion_texto(self, texto: str) -> Tuple[str, List[Any]]:
+        """
+        Texto en cualquier columna, con la representación de ``df.astype(str)``.
+
+        Si el patrón es literal, la tabla de trigramas con el texto de cada fila
+        preselecciona las candidatas; la expresión regular se verifica columna
+        por columna, de modo que un patrón nunca coincide entre dos columnas.
+        """
+        meta = self._meta
+        patron = texto.lower()
+        if not meta['columnas']:
+            return '0', []
+        valores = [
+            f"substr(h.{_nombre_sql(i)}, 1, 10)" if c in meta['solo_fecha'] else f"h.{_nombre_sql(i)}"
+            for i, c in enumerate(meta['columnas'])
+        ]
+        condicion = '(' + ' OR '.join(f"contiene({valor}, ?)" for valor in valores) + ')'
+        params = [patron] * len(valores)
+        if _usa_trigramas(patron):
+            condicion = f"h.{COL_POSICION} IN (SELECT rowid FROM {TABLA_TODO} WHERE {TABLA_TODO} MATCH ?) AND {condicion}"
+            params.insert(0, _frase_fts(patron))
+        return condicion, params
+
+    def _condicion_subcadena(self, columna: str, patron: str) -> Tuple[str, List[Any]]:
+        """Condición de subcadena; en el nombre los trigramas preseleccionan si el patrón es literal"""
+        if columna not in self._meta['columnas']:
+            # Sin la columna no hay coincidencias (igual que el backend en memoria)
+            return '0', []
+        condicion, params = f"contiene(h.{self._sql(columna)}, ?)", [patron]
+        if columna == 'nombre' and self._meta['nombres'] and _usa_trigramas(patron):
+            condicion = f"h.{COL_POSICION} IN (SELECT rowid FROM {TABLA_NOMBRES} WHERE {TABLA_NOMBRES} MATCH ?) AND {condicion}"
+            params.insert(0, _frase_fts(patron))
+        return condicion, params
+
+    def _condicion_categoria(self, columna: str, patron: str) -> Tuple[str, List[Any]]:
+        """Condición sobre una columna categórica: el patrón se evalúa sobre sus valores distintos"""
+        if columna not in self.CATEGORICAL_COLUMNS:
+            return self._condicion_subcadena(columna, patron)
+        base = self._get_base()
+        if columna not in base.categorias:
+            filas = self._connection(base).execute(
+                f"SELECT DISTINCT {self._sql(columna)} FROM {TABLA} WHERE {self._sql(columna)} IS NOT NULL"
+            ).fetchall()
+            base.categorias[columna] = [str(fila[0]) for fila in filas]
+
+        regex = _compilar(patron)
+        valores = [v for v in base.categorias[columna] if regex.search(v)]
+        if not valores:
+            return '0', []
+        if len(valores) > MAX_SQL_PARAMS:
+            return f"contiene(h.{self._sql(columna)}, ?)", [patron]
+        return f"h.{self._sql(columna)} IN ({', '.join(['?'] * len(valores))})", valores
+
+    def _condicion_prefijo_radicado(self, prefijo: str) -> Tuple[str, List[Any]]:
+        """Rango sobre el índice del radicado normalizado equivalente a 'empieza con'"""
+        siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+        return f"h.{COL_RADICADO} >= ? AND h.{COL_RADICADO} < ?", [prefijo, siguiente]
+
+    def get_historico_by_radicado(self, numero_radicado: str) -> Optional[PQRSHistoricoView]:
+        """Obtiene un registro histórico por número de radicado"""
+        try:
+            radicado = normalizar_radicado(numero_radicado)
+            if radicado is None:
+                return None
+            df = self._query_frame(f"h.{COL_RADICADO} = ?", (radicado,), limit=1)
+            if df.empty:
+                logger.warning(f"No se encontró registro con radicado: {numero_radicado}")
+                return None
+            return self.registros(df)[0]
+
+        except Exception as e:
+            logger.error(f"Error al buscar por radicado {numero_radicado}: {e}")
+            return None
+
+    def get_historico_by_radicados(self, numeros_radicado: List[str]) -> Dict[str, PQRSHistoricoView]:
+        """Obtiene varios registros históricos por número de radicado en una sola consulta por lote"""
+        try:
+            normalizados = {}
+            for radicado in numeros_radicado:
+                texto = normalizar_radicado(radicado)
+                if texto is not None:
+                    normalizados.setdefault(texto, []).append(radicado)
+
+            resultado = {}
+            claves = list(normalizados)
+            for inicio in range(0, len(claves), MAX_SQL_PARAMS):
+                lote = claves[inicio:inicio + MAX_SQL_PARAMS]
+                df = self._query_frame(f"h.{COL_RADICADO} IN ({', '.join(['?'] * len(lote))})", tuple(lote))
+                for registro in self.registros(df):
+                    texto = normalizar_radicado(registro.numero_radicado)
+                    for original in normalizados.get(texto, []):
+                        resultado.setdefault(original, registro)
+            return resultado
+
+        except Exception as e:
+            logger.error(f"Error al buscar lote de radicados: {e}")
+            return {}
+
+    def get_historico_by_radicado_prefix(self, prefijo: str) -> HistoricoRows:
+        """Obtiene los registros cuyo radicado comienza con el prefijo (p. ej. 'YYYYMMDD')"""
+        try:
+            prefijo = normalizar_radicado(prefijo)
+            if prefijo is None:
+                return []
+            condicion, params = self._condicion_prefijo_radicado(prefijo)
+            orden = f"length(h.{COL_RADICADO}), h.{COL_RADICADO}, h.{COL_POSICION}"
+            return self.registros(self._query_frame(condicion, tuple(params), order=orden))
+
+        except Exception as e:
+            logger.error(f"Error al buscar por prefijo de radicado {prefijo}: {e}")
+            return []
+
+    def get_historico_by_radicado_range(self, radicado_inicio: str, radicado_fin: str) -> HistoricoRows:
+        """Obtiene los registros con radicado numérico en el rango cerrado indicado"""
+        try:
+            inicio, fin = int(normalizar_radicado(radicado_inicio)), int(normalizar_radicado(radicado_fin))
+            df = self._query_frame(
+                f"h.{COL_RADICADO_NUM} BETWEEN ? AND ?", (inicio, fin),
+                order=f"h.{COL_RADICADO_NUM}, h.{COL_POSICION}"
+            )
+            return self.registros(df)
+
+        except Exception as e:
+            logger.error(f"Error al buscar rango de radicados {radicado_inicio}-{radicado_fin}: {e}")
+            return []
+
+    def search_historico_advanced(self, search_term: str, search_type: str = 'texto') -> HistoricoRows:
+        """Búsqueda avanzada en el histórico por diferentes criterios"""
+        try:
+            base = self._get_base()
+            columnas = base.meta['columnas']
+
+            if search_type == 'texto':
+                if 'texto_pqrs' not in columnas:
+                    logger.warning("Columna 'texto_pqrs' no disponible para búsqueda")
+                    return []
+                # Ranking BM25F sobre los postings, mismos puntajes que el índice en memoria
+                posiciones, puntajes = base.text_index.search(search_term)
+                if len(posiciones):
+                    return self._filas_en_orden(posiciones, puntajes, descendente=True)
+                # Sin coincidencias de términos completos: búsqueda por subcadena
+                df = self._query_frame(f"contiene(h.{self._sql('texto_pqrs')}, ?)", (search_term,))
+            elif search_type == 'nombre':
+                if 'nombre' not in columnas:
+                    logger.warning("Columna 'nombre' no disponible para búsqueda")
+                    return []
+                # Coincidencias difusas y fonéticas ordenadas por puntaje
+                posiciones, puntajes = base.name_index.search(search_term)
+                if len(posiciones):
+                    return self._filas_en_orden(posiciones, puntajes, descendente=True)
+                # Sin coincidencias por palabras: búsqueda por subcadena
+                condicion, params = self._condicion_subcadena('nombre', search_term)
+                df = self._query_frame(condicion, tuple(params))
+            elif search_type in ('clasificacion', 'estado'):
+                columna = 'clasificacion' if search_type == 'clasificacion' else 'estado_pqrs'
+                if columna not in columnas:
+                    logger.warning(f"Columna '{columna}' no disponible para búsqueda")
+                    return []
+                condicion, params = self._condicion_categoria(columna, search_term)
+                df = self._query_frame(condicion, tuple(params))
+            else:
+                logger.error(f"Tipo de búsqueda no válido: {search_type}")
+                return []
+
+            return self.registros(df)
+
+        except Exception as e:
+            logger.error(f"Error en búsqueda avanzada de histórico: {e}")
+            return []
+
+    def get_historico_by_date_range(self, start_date: str, end_date: str) -> HistoricoRows:
+        """Obtiene registros históricos en un rango de fechas"""
+        try:
+            meta = self._ensure_database()
+            if COLUMNA_FECHA not in meta['columnas']:
+                logger.error("Columna 'fecha_radicacion' no encontrada en el archivo histórico")
+                return []
+
+            try:
+                inicio = pd.to_datetime(start_date).strftime(FORMATO_FECHA)
+                fin = pd.to_datetime(end_date).strftime(FORMATO_FECHA)
+                df = self._query_frame(f"h.{self._sql(COLUMNA_FECHA)} BETWEEN ? AND ?", (inicio, fin))
+                return self.registros(df)
+
+            except Exception as e:
+                logger.warning(f"No se pudo procesar fechas: {e}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Error al obtener histórico por rango de fechas: {e}")
+            return []
+
+    def _condiciones_consulta_avanzada(self, filtros: Dict[str, Any],
+                                       filtros_categoricos: Dict[str, str]) -> Tuple[List[str], List[Any]]:
+        """Condiciones SQL (con sus parámetros) de los filtros de la consulta avanzada"""
+        columnas = self._ensure_database()['columnas']
+        condiciones, params = [], []
+
+        def agregar(condicion: str, valores: List[Any]):
+            condiciones.append(condicion)
+            params.extend(valores)
+
+        if filtros.get('texto'):
+            agregar(*self._condicion_texto(filtros['texto']))
+
+        if filtros.get('radicado'):
+            radicado = str(filtros['radicado']).strip()
+            if radicado.isdigit():
+                agregar(*self._condicion_prefijo_radicado(radicado))
+            else:
+                agregar(*self._condicion_subcadena('numero_radicado', radicado))
+
+        if filtros.get('nombre'):
+            agregar(*self._condicion_subcadena('nombre', filtros['nombre']))
+
+        if filtros.get('fecha_inicio') and COLUMNA_FECHA in columnas:
+            try:
+                inicio = pd.to_datetime(filtros['fecha_inicio']).strftime(FORMATO_FECHA)
+                agregar(f"h.{self._sql(COLUMNA_FECHA)} >= ?", [inicio])
+                if filtros.get('fecha_fin'):
+                    agregar(f"h.{self._sql(COLUMNA_FECHA)} <= ?", [pd.to_datetime(filtros['fecha_fin']).strftime(FORMATO_FECHA)])
+            except Exception:
+                # Fechas inválidas no filtran (igual que el backend en memoria)
+                pass
+
+        for filtro, columna in filtros_categoricos.items():
+            if filtros.get(filtro):
+                agregar(*self._condicion_categoria(columna, filtros[filtro]))
+        return condiciones, params
+
+    def contar_consulta_avanzada(self, filtros: Dict[str, Any], filtros_categoricos: Dict[str, str]) -> int:
+        """Total de filas que cumplen los filtros de la consulta avanzada"""
+        condiciones, params = self._condiciones_consulta_avanzada(filtros, filtros_categoricos)
+        sql = f"SELECT COUNT(*) FROM {TABLA} h"
+        if condiciones:
+            sql += " WHERE " + ' AND '.join(condiciones)
+        return int(self._connection().execute(sql, tuple(params)).fetchone()[0])
+
+    def consulta_avanzada_frame(self, filtros: Dict[str, Any], filtros_categoricos: Dict[str, str],
+                                despues_de: Optional[Tuple[Any, int]] = None, limit: Optional[int] = None,
+                                columnas_leidas: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Resuelve los filtros de la consulta avanzada con una sola consulta SQL.
+
+        El orden es por la columna ``ordenar_por`` (nulos al final) y la posición
+        de la fila; con ``despues_de`` (clave, posición) de un cursor la consulta
+        continúa justo después de esa fila (paginación keyset, sin OFFSET).
+
+        Args:
+            filtros: filtros de la consulta avanzada (texto, radicado, nombre, fechas, orden, límite)
+            filtros_categoricos: nombre del filtro -> columna categórica
+            despues_de: clave de orden y posición de la última fila ya entregada
+            limit: máximo de filas (por defecto el ``limit`` de los filtros)
+            columnas_leidas: columnas del histórico a leer (None: todas)
+        """
+        columnas = self._ensure_database()['columnas']
+        condiciones, params = self._condiciones_consulta_avanzada(filtros, filtros_categoricos)
+
+        posicion = f"h.{COL_POSICION}"
+        orden = clave = None
+        descendente = False
+        campo = filtros.get('ordenar_por')
+        if campo and campo in columnas:
+            clave = f"h.{self._sql(campo)}"
+            descendente = str(filtros.get('orden', 'asc')).lower() == 'desc'
+            orden = f"({clave} IS NULL), {clave} {'DESC' if descendente else 'ASC'}, {posicion}"
+
+        if despues_de is not None:
+            valor, fila = despues_de
+            if clave is None:
+                condiciones.append(f"{posicion} > ?")
+                params.append(int(fila))
+            elif valor is None:
+                condiciones.append(f"({clave} IS NULL AND {posicion} > ?)")
+                params.append(int(fila))
+            else:
+                comparacion = '<' if descendente else '>'
+                condiciones.append(f"({clave} IS NULL OR {clave} {comparacion} ? OR ({clave} = ? AND {posicion} > ?))")
+                params.extend([valor, valor, int(fila)])
+
+        if limit is None:
+            limit = filtros.get('limit', 100)
+        return self._query_frame(' AND '.join(condiciones), tuple(params), order=orden,
+                                 limit=limit if limit > 0 else None, clave=clave, columnas=columnas_leidas)
+
+    def consulta_avanzada(self, filtros: Dict[str, Any], filtros_categoricos: Dict[str, str],
+                          despues_de: Optional[Tuple[Any, int]] = None, limit: int = 0,
+                          columnas_leidas: Optional[List[str]] = None) -> ResultadoConsultaAvanzada:
+        """Filtros, orden y página (keyset) en una sola consulta indexada, más el conteo del total"""
+        total = self.contar_consulta_avanzada(filtros, filtros_categoricos)
+        version = self.snapshot_version
+        df = self.consulta_avanzada_frame(filtros, filtros_categoricos, despues_de=despues_de, limit=limit,
+                                          columnas_leidas=columnas_leidas)
+        descendente = str(filtros.get('orden', 'asc')).lower() == 'desc'
+        return ResultadoConsultaAvanzada(self.registros(df, descendente), total, version, df)
+
+    def get_all_historico(self) -> HistoricoRows:
+        """Obtiene todos los registros históricos"""
+        try:
+            return self.registros(self._query_frame())
+        except Exception as e:
+            logger.error(f"Error al obtener todo el histórico: {e}")
+            return []
+
+    def search_historico(self, search_term: str, column: str = 'texto_pqrs') -> HistoricoRows:
+        """Busca en el histórico por término de búsqueda"""
+        try:
+            if column not in self._ensure_database()['columnas']:
+                logger.error(f"Columna '{column}' no encontrada en el archivo histórico")
+                return []
+            return self.registros(self._query_frame(f"contiene(h.{self._sql(column)}, ?)", (search_term,)))
+
+        except Exception as e:
+            logger.error(f"Error en búsqueda de histórico: {e}")
+            return []
+
+    # Agregados y sugerencias calculados en SQL (sin cargar el histórico)
+
+    def get_columns(self) -> List[str]:
+        """Columnas disponibles del histórico normalizado"""
+        return list(self._ensure_database()['columnas'])
+
+    def warm(self, hilos: int = 1):
+        """Abre la base y precalcula agregados y sugerencias (los índices viven en SQLite)"""
+        base = self._get_base()
+        self._calcular_agregados(base)
+        self._calcular_sugerencias(base)
+
+    def get_aggregates(self) -> HistoricoAggregates:
+        """Conteos y fechas del histórico calculados con GROUP BY sobre los índices"""
+        return self._calcular_agregados(self._get_base())
+
+    def _calcular_agregados(self, base: _BaseSQLite) -> HistoricoAggregates:
+        if base.aggregates is None:
+            conn = self._connection(base)
+            columnas = base.meta['columnas']
+            total = conn.execute(f"SELECT COUNT(*) FROM {TABLA}").fetchone()[0]
+
+            conteos = {}
+            for dimension, columna in DIMENSIONES.items():
+                if columna not in columnas:
+                    continue
+                nombre = self._sql(columna, base.meta)
+                filas = conn.execute(
+                    f"SELECT {nombre}, COUNT(*) AS n FROM {TABLA} WHERE {nombre} IS NOT NULL "
+                    f"GROUP BY {nombre} ORDER BY n DESC"
+                ).fetchall()
+                conteos[dimension] = {str(valor): int(n) for valor, n in filas}
+
+            por_mes = {}
+            fecha_minima = fecha_maxima = None
+            if COLUMNA_FECHA in columnas:
+                fecha = self._sql(COLUMNA_FECHA, base.meta)
+                filas = conn.execute(
+                    f"SELECT substr({fecha}, 1, 7) AS mes, COUNT(*) FROM {TABLA} WHERE {fecha} IS NOT NULL GROUP BY mes ORDER BY mes"
+                ).fetchall()
+                por_mes = {mes: int(n) for mes, n in filas}
+                minima, maxima = conn.execute(f"SELECT MIN({fecha}), MAX({fecha}) FROM {TABLA}").fetchone()
+                fecha_minima = pd.Timestamp(minima) if minima else None
+                fecha_maxima = pd.Timestamp(maxima) if maxima else None
+
+            base.aggregates = HistoricoAggregates(total, conteos, por_mes, fecha_minima, fecha_maxima)
+        return base.aggregates
+
+    def get_completion_index(self) -> CompletionIndex:
+        """Índice de autocompletado construido desde valores distintos y términos precalculados"""
+        return self._calcular_sugerencias(self._get_base())
+
+    def _calcular_sugerencias(self, base: _BaseSQLite) -> CompletionIndex:
+        if base.completion_index is None:
+            conn = self._connection(base)
+            columnas = base.meta['columnas']
+            entradas: Dict[str, int] = {}
+            for columna in DEFAULT_COMPLETION_COLUMNS:
+                if columna not in columnas:
+                    continue
+                filas = conn.execute(
+                    f"SELECT trim({self._sql(columna, base.meta)}) AS valor, COUNT(*) FROM {TABLA} "
+                    f"WHERE valor IS NOT NULL AND valor != '' GROUP BY valor"
+                ).fetchall()
+                for valor, frecuencia in filas:
+                    entradas[str(valor)] = entradas.get(str(valor), 0) + int(frecuencia)
+
+            # Un término que ya es un valor de columna ('belén' / 'Belén') suma a ese valor
+            existentes = {fold_text(valor): valor for valor in entradas}
+            for termino, frecuencia in conn.execute(f"SELECT termino, frecuencia FROM {TABLA_TERMINOS}"):
+                clave = existentes.get(fold_text(termino), termino)
+                entradas[clave] = entradas.get(clave, 0) + int(frecuencia)
+
+            base.completion_index = CompletionIndex(entradas)
+        return base.completion_index
@@ -24,9 +24,9 @@ class TranscriptionStrategy(ABC):
 class OpenAIWhisperStrategy(TranscriptionStrategy):
     """Estrategia de transcripción usando OpenAI Whisper"""
     
-    def __init__(self, api_key: str, model: str = 'whisper-1'):
-        """Inicializa la estrategia OpenAI Whisper"""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = 'whisper-1', client: Optional[OpenAI] = None):
+        """Inicializa la estrategia OpenAI Whisper (reutiliza ``client`` si se proporciona)"""
+        self.client = client or OpenAI(api_key=api_key)
         self.model = model
         # Reducir logging
         pass  # logger.info(f"Estrategia OpenAI Whisper inicializada con modelo: {model}")
@@ -478,9 +478,9 @@ class AudioServiceFactory:
     """Factory para crear servicios de audio"""
     
     @staticmethod
-    def create_openai_service(api_key: str, model: str = 'whisper-1') -> AudioService:
+    def create_openai_service(api_key: str, model: str = 'whisper-1', client: Optional[OpenAI] = None) -> AudioService:
         """Crea un servicio de audio con estrategia OpenAI"""
-        strategy = OpenAIWhisperStrategy(api_key, model)
+        strategy = OpenAIWhisperStrategy(api_key, model, client)
         return AudioService(strategy)
     
     @staticmethod
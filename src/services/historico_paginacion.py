@@ -0,0 +1,136 @@
+"""
+Paginación por cursor (keyset) de los resultados del histórico de PQRS
+
+Un resultado ordenado (``HistoricoRows`` con su clave de orden e identificador
+estable de fila) se recorre por páginas: el cursor guarda la clave y el
+identificador de la última fila entregada y la página siguiente empieza en
+la primera fila posterior a ese par, sin desplazamientos. El cursor es opaco
+para el cliente (JSON en base64 URL) y lleva una huella de la consulta, de
+modo que no se puede reutilizar con otros filtros.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from src.models.historico_orden import posteriores
+from src.models.historico_rows import HistoricoRows
+
+
+def huella_consulta(*partes: Any) -> str:
+    """Huella corta de los parámetros que definen el conjunto y el orden del resultado"""
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:12]
+
+
+class CursorHistorico:
+    """Posición de lectura dentro de un resultado ordenado"""
+
+    def __init__(self, clave: Any, fila: int, consulta: Optional[str] = None, version: Optional[str] = None):
+        """
+        Args:
+            clave: clave de orden de la última fila entregada (None si es nula o no hay orden)
+            fila: identificador estable de esa fila
+            consulta: huella de la consulta que generó el cursor
+            version: versión del snapshot sobre el que se generó
+        """
+        self.clave = clave
+        self.fila = int(fila)
+        self.consulta = consulta
+        self.version = version
+
+    def encode(self) -> str:
+        """Cursor opaco para el cliente"""
+        datos = {'k': self.clave, 'f': self.fila, 'q': self.consulta, 'v': self.version}
+        texto = json.dumps(datos, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        return base64.urlsafe_b64encode(texto).decode('ascii').rstrip('=')
+
+    @classmethod
+    def decode(cls, cursor: str) -> 'CursorHistorico':
+        """Reconstruye un cursor; ValueError si no es válido"""
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            datos = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+            return cls(datos['k'], int(datos['f']), datos.get('q'), datos.get('v'))
+        except Exception as e:
+            raise ValueError(f"Cursor de paginación inválido: {e}") from e
+
+    @staticmethod
+    def clave_de(claves: Optional[np.ndarray], indice: int) -> Any:
+        """Clave de una fila en forma serializable (fechas como nanosegundos)"""
+        if claves is None:
+            return None
+        valor = claves[indice]
+        if pd.isna(valor):
+            return None
+        if isinstance(valor, np.datetime64):
+            return int(valor.astype('datetime64[ns]').astype(np.int64))
+        return valor.item() if isinstance(valor, np.generic) else valor
+
+
+class PaginaHistorico:
+    """Página de un resultado del histórico"""
+
+    def __init__(self, filas: HistoricoRows, total: int, tamano: int, cursor_siguiente: Optional[str] = None,
+                 version: Optional[str] = None):
+        """Inicializa la página"""
+        self.filas = filas
+        self.total = total
+        self.tamano = tamano
+        self.cursor_siguiente = cursor_siguiente
+        self.version = version
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Metadatos de paginación de la respuesta"""
+        return {
+            "total": self.total,
+            "tamano_pagina": self.tamano,
+            "devueltos": len(self.filas),
+            "cursor_siguiente": self.cursor_siguiente,
+            "tiene_mas": self.cursor_siguiente is not None,
+            "version": self.version
+        }
+
+
+def verificar_cursor(cursor: Optional[CursorHistorico], consulta: Optional[str], version: Optional[str]):
+    """Rechaza un cursor de otra consulta o de otra versión del histórico (sus posiciones ya no aplican)"""
+    if cursor is None:
+        return
+    if cursor.consulta != consulta:
+        raise ValueError("El cursor de paginación corresponde a otra consulta")
+    if cursor.version != version:
+        raise ValueError("El cursor de paginación corresponde a otra versión del histórico")
+
+
+def paginar(filas: HistoricoRows, tamano: int, cursor: Optional[CursorHistorico] = None,
+            total: Optional[int] = None, consulta: Optional[str] = None,
+            version: Optional[str] = None) -> PaginaHistorico:
+    """
+    Página de ``tamano`` filas a partir del cursor.
+
+    Args:
+        filas: resultado completo y ordenado (o ya recortado después del cursor, sin cursor)
+        tamano: filas por página (0: todas)
+        cursor: cursor recibido del cliente
+        total: total de coincidencias si ``filas`` no es el resultado completo
+        consulta: huella de la consulta, verificada contra la del cursor
+        version: versión del snapshot consultado
+    """
+    verificar_cursor(cursor, consulta, version)
+    if total is None:
+        total = len(filas)
+
+    if cursor is not None:
+        siguientes = np.flatnonzero(posteriores(filas.ids, filas.claves, filas.descendente, (cursor.clave, cursor.fila)))
+        inicio = int(siguientes[0]) if len(siguientes) else len(filas)
+        filas = filas[inicio:]
+
+    if tamano <= 0 or len(filas) <= tamano:
+        return PaginaHistorico(filas, total, tamano, None, version)
+
+    pagina = filas[:tamano]
+    ultimo = tamano - 1
+    siguiente = CursorHistorico(CursorHistorico.clave_de(pagina.claves, ultimo), pagina.ids[ultimo], consulta, version)
+    return PaginaHistorico(pagina, total, tamano, siguiente.encode(), version)
@@ -0,0 +1,135 @@
+"""
+Caché de resultados de consultas del histórico de PQRS
+
+Guarda los resultados de las consultas repetidas (consulta avanzada y
+consulta inteligente) en un LRU acotado con vencimiento por tiempo. La llave
+es la consulta normalizada y cada entrada pertenece a la versión del
+snapshot sobre la que se calculó: cuando el histórico cambia de versión la
+caché se vacía sola en el siguiente acceso. Los contadores de aciertos,
+fallos, desalojos y vencimientos se exponen para monitoreo.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def normalizar_consulta(tipo: str, parametros: Any) -> str:
+    """Llave estable de una consulta: parámetros vacíos omitidos, textos sin espacios extremos y claves ordenadas"""
+    def normalizar(valor):
+        if isinstance(valor, dict):
+            return {str(k): normalizar(v) for k, v in valor.items() if v not in (None, '', [], {})}
+        if isinstance(valor, (list, tuple)):
+            return [normalizar(v) for v in valor]
+        if isinstance(valor, str):
+            return valor.strip()
+        return valor
+    return json.dumps([tipo, normalizar(parametros)], sort_keys=True, ensure_ascii=False, default=str)
+
+
+class HistoricoQueryCache:
+    """LRU con TTL de resultados de consultas, ligado a la versión del snapshot"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        """
+        Args:
+            max_entries: máximo de resultados guardados (0 deshabilita la caché)
+            ttl_seconds: segundos de vigencia de cada resultado (0 sin vencimiento)
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _sincronizar_version(self, version: Optional[str]):
+        """Vacía la caché si el snapshot cambió de versión (se llama con el lock tomado)"""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            self._version = version
+
+    def get(self, version: Optional[str], clave: Hashable) -> Optional[Any]:
+        """Resultado vigente para la consulta en esa versión del snapshot, o None"""
+        if not self.enabled or version is None:
+            return None
+        with self._lock:
+            self._sincronizar_version(version)
+            entrada = self._entries.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            guardado, valor = entrada
+            if self.ttl_seconds > 0 and time.monotonic() - guardado > self.ttl_seconds:
+                del self._entries[clave]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def put(self, version: Optional[str], clave: Hashable, valor: Any):
+        """Guarda el resultado de una consulta calculada sobre esa versión del snapshot"""
+        if not self.enabled or version is None:
+            return
+        with self._lock:
+            self._sincronizar_version(version)
+            self._entries[clave] = (time.monotonic(), valor)
+            self._entries.move_to_end(clave)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Descarta todos los resultados guardados"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores y tamaño de la caché"""
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "habilitada": self.enabled,
+                "entradas": len(self._entries),
+                "max_entradas": self.max_entries,
+                "ttl_segundos": self.ttl_seconds,
+                "version_snapshot": self._version,
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "tasa_aciertos": round(self.hits / consultas, 4) if consultas else 0.0,
+                "desalojos": self.evictions,
+                "vencidas": self.expirations,
+                "invalidaciones": self.invalidations
+            }
+
+    def prometheus(self, prefijo: str = 'historico_cache_consultas') -> str:
+        """Contadores en formato de exposición de texto de Prometheus"""
+        stats = self.stats()
+        lineas = []
+        for nombre, clave, tipo in (
+            ('aciertos_total', 'aciertos', 'counter'),
+            ('fallos_total', 'fallos', 'counter'),
+            ('desalojos_total', 'desalojos', 'counter'),
+            ('vencidas_total', 'vencidas', 'counter'),
+            ('invalidaciones_total', 'invalidaciones', 'counter'),
+            ('entradas', 'entradas', 'gauge'),
+            ('max_entradas', 'max_entradas', 'gauge'),
+        ):
+            lineas.append(f"# TYPE {prefijo}_{nombre} {tipo}")
+            lineas.append(f"{prefijo}_{nombre} {stats[clave]}")
+        return '\n'.join(lineas) + '\n'
@@ -7,24 +7,52 @@ Combina funcionalidades básicas y avanzadas en un solo servicio
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import re
-import pandas as pd
-from src.repositories.pqrs_repository import PQRSRepository
-from src.models.pqrs_model import PQRSHistorico
+from src.config.config import config
+from src.models.historico_rows import CamposInvalidosError, columnas_de_campos, normalizar_campos
+from src.repositories.pqrs_repository import HistoricoRepository
+from src.services.historico_paginacion import CursorHistorico, PaginaHistorico, huella_consulta, paginar, verificar_cursor
+from src.services.historico_query_cache import HistoricoQueryCache, normalizar_consulta
 from src.utils.logger import logger
 
 class HistoricoQueryService:
     """Servicio unificado de consultas del histórico de PQRS con funcionalidades avanzadas"""
     
-    def __init__(self, pqrs_repository: PQRSRepository):
+    # Filtro de consulta avanzada -> columna categórica del histórico
+    FILTROS_CATEGORICOS = {
+        'clasificacion': 'clasificacion',
+        'estado': 'estado_pqrs',
+        'unidad': 'unidad',
+        'barrio': 'barrio'
+    }
+    
+    # Columnas que lee el resumen de la consulta avanzada
+    COLUMNAS_RESUMEN = ('clasificacion', 'estado_pqrs', 'unidad')
+    
+    def __init__(self, pqrs_repository: HistoricoRepository):
         """Inicializa el servicio de consultas históricas unificado"""
         self.pqrs_repository = pqrs_repository
+        # Resultados de consultas repetidas, por versión del snapshot
+        self.cache = HistoricoQueryCache(config.HISTORICO_CACHE_CONSULTAS_MAX, config.HISTORICO_CACHE_CONSULTAS_TTL)
         # logger.info("Servicio unificado de consultas históricas inicializado")
     
-    def consultar_por_radicado(self, numero_radicado: str) -> Dict[str, Any]:
-        """Consulta información de una PQRS por número de radicado con información enriquecida"""
+    def consultar_por_radicado(self, numero_radicado: str, fields=None) -> Dict[str, Any]:
+        """
+        Consulta información de una PQRS por número de radicado con información enriquecida
+        
+        Con ``fields`` (lista o texto separado por comas) solo se devuelven esos
+        campos del registro en ``datos``, sin la información enriquecida ni ``datos_completos``.
+        """
         try:
+            campos = normalizar_campos(fields)
             historico = self.pqrs_repository.get_historico_by_radicado(numero_radicado)
             
+            if historico and campos:
+                return {
+                    "success": True,
+                    "tipo_consulta": "por_radicado",
+                    "datos": historico.to_dict(campos),
+                    "mensaje": f"PQRS encontrada - Radicado: {numero_radicado}"
+                }
             if historico:
                 # Crear respuesta enriquecida con información útil
                 info_util = {
@@ -58,6 +86,9 @@ class HistoricoQueryService:
                     "mensaje": f"No se encontró ninguna PQRS con el radicado {numero_radicado}. Verifica que el número sea correcto."
                 }
                 
+        except CamposInvalidosError as e:
+            logger.warning(f"Proyección inválida en consulta por radicado: {e}")
+            return self._error_paginacion("por_radicado", e)
         except Exception as e:
             logger.error(f"Error al consultar por radicado {numero_radicado}: {e}")
             return {
@@ -67,18 +98,22 @@ class HistoricoQueryService:
                 "mensaje": "Error en la consulta del radicado. Intenta de nuevo o contacta soporte."
             }
     
-    def buscar_por_texto(self, texto_busqueda: str) -> Dict[str, Any]:
-        """Busca PQRS en el histórico por texto de búsqueda"""
+    def buscar_por_texto(self, texto_busqueda: str, tamano_pagina: Optional[int] = None,
+                         cursor: Optional[str] = None, fields=None) -> Dict[str, Any]:
+        """Busca PQRS en el histórico por texto de búsqueda (paginado por cursor, por relevancia); ``fields`` limita los campos devueltos"""
         try:
+            campos = normalizar_campos(fields)
             resultados = self.pqrs_repository.search_historico_advanced(texto_busqueda, 'texto')
             
             if resultados:
+                pagina = self._paginar_busqueda(resultados, tamano_pagina, cursor, 'texto', texto_busqueda)
                 return {
                     "success": True,
                     "tipo_consulta": "busqueda_texto",
-                    "total_resultados": len(resultados),
-                    "datos": [h.to_dict() for h in resultados],
-                    "mensaje": f"Se encontraron {len(resultados)} PQRS que coinciden con la búsqueda"
+                    "total_resultados": pagina.total,
+                    "datos": pagina.filas.proyectar(campos),
+                    "paginacion": pagina.to_dict(),
+                    "mensaje": f"Se encontraron {pagina.total} PQRS que coinciden con la búsqueda"
                 }
             else:
                 return {
@@ -89,6 +124,9 @@ class HistoricoQueryService:
                     "mensaje": f"No se encontraron PQRS que coincidan con: '{texto_busqueda}'"
                 }
                 
+        except ValueError as e:
+            logger.warning(f"Paginación inválida en búsqueda por texto: {e}")
+            return self._error_paginacion("busqueda_texto", e)
         except Exception as e:
             logger.error(f"Error al buscar por texto '{texto_busqueda}': {e}")
             return {
@@ -98,18 +136,22 @@ class HistoricoQueryService:
                 "mensaje": "Error al realizar la búsqueda"
             }
     
-    def buscar_por_nombre(self, nombre: str) -> Dict[str, Any]:
-        """Busca PQRS en el histórico por nombre del solicitante"""
+    def buscar_por_nombre(self, nombre: str, tamano_pagina: Optional[int] = None,
+                          cursor: Optional[str] = None, fields=None) -> Dict[str, Any]:
+        """Busca PQRS en el histórico por nombre del solicitante (paginado por cursor); ``fields`` limita los campos devueltos"""
         try:
+            campos = normalizar_campos(fields)
             resultados = self.pqrs_repository.search_historico_advanced(nombre, 'nombre')
             
             if resultados:
+                pagina = self._paginar_busqueda(resultados, tamano_pagina, cursor, 'nombre', nombre)
                 return {
                     "success": True,
                     "tipo_consulta": "busqueda_nombre",
-                    "total_resultados": len(resultados),
-                    "datos": [h.to_dict() for h in resultados],
-                    "mensaje": f"Se encontraron {len(resultados)} PQRS para el nombre '{nombre}'"
+                    "total_resultados": pagina.total,
+                    "datos": pagina.filas.proyectar(campos),
+                    "paginacion": pagina.to_dict(),
+                    "mensaje": f"Se encontraron {pagina.total} PQRS para el nombre '{nombre}'"
                 }
             else:
                 return {
@@ -120,6 +162,9 @@ class HistoricoQueryService:
                     "mensaje": f"No se encontraron PQRS para el nombre '{nombre}'"
                 }
                 
+        except ValueError as e:
+            logger.warning(f"Paginación inválida en búsqueda por nombre: {e}")
+            return self._error_paginacion("busqueda_nombre", e)
         except Exception as e:
             logger.error(f"Error al buscar por nombre '{nombre}': {e}")
             return {
@@ -147,56 +192,49 @@ class HistoricoQueryService:
                 - limit: int - Límite de resultados
                 - ordenar_por: str - Campo para ordenar
                 - orden: str - 'asc' o 'desc'
+                - fields: list | str - Campos de cada registro a devolver (por defecto todos)
         """
+        resultado = self._consultar_con_cache('avanzada', filtros, lambda: self._consulta_avanzada(filtros))
+        if resultado.get("filtros_aplicados") is not filtros and "filtros_aplicados" in resultado:
+            # Acierto de caché: los filtros se devuelven como los envió este cliente
+            resultado = dict(resultado, filtros_aplicados=filtros)
+        return resultado
+    
+    def _consulta_avanzada(self, filtros: Dict[str, Any]) -> Dict[str, Any]:
+        """Ejecuta la consulta avanzada sin pasar por la caché"""
         try:
-            df = self.pqrs_repository._load_historico()
-            resultado = df.copy()
-            
-            # Aplicar filtros secuencialmente
-            if 'texto' in filtros and filtros['texto']:
-                resultado = self._filtrar_por_texto(resultado, filtros['texto'])
-            
-            if 'radicado' in filtros and filtros['radicado']:
-                resultado = self._filtrar_por_radicado(resultado, filtros['radicado'])
-            
-            if 'nombre' in filtros and filtros['nombre']:
-                resultado = self._filtrar_por_nombre(resultado, filtros['nombre'])
-            
-            if 'fecha_inicio' in filtros and filtros['fecha_inicio']:
-                resultado = self._filtrar_por_fecha(resultado, filtros['fecha_inicio'], filtros.get('fecha_fin'))
-            
-            if 'clasificacion' in filtros and filtros['clasificacion']:
-                resultado = self._filtrar_por_clasificacion(resultado, filtros['clasificacion'])
-            
-            if 'estado' in filtros and filtros['estado']:
-                resultado = self._filtrar_por_estado(resultado, filtros['estado'])
-            
-            if 'unidad' in filtros and filtros['unidad']:
-                resultado = self._filtrar_por_unidad(resultado, filtros['unidad'])
-            
-            if 'barrio' in filtros and filtros['barrio']:
-                resultado = self._filtrar_por_barrio(resultado, filtros['barrio'])
-            
-            # Ordenar resultados
-            if 'ordenar_por' in filtros and filtros['ordenar_por']:
-                resultado = self._ordenar_resultados(resultado, filtros['ordenar_por'], filtros.get('orden', 'asc'))
+            campos = normalizar_campos(filtros.get('fields'))
+            tamano = self._tamano_pagina(filtros.get('tamano_pagina')) if filtros.get('tamano_pagina') \
+                else filtros.get('limit', 100)
+            cursor = CursorHistorico.decode(filtros['cursor']) if filtros.get('cursor') else None
+            consulta = huella_consulta('avanzada', {
+                k: v for k, v in filtros.items() if k not in ('cursor', 'tamano_pagina', 'limit', 'fields')
+            })
             
-            # Limitar resultados
-            limit = filtros.get('limit', 100)
-            if limit > 0:
-                resultado = resultado.head(limit)
-            
-            # Convertir a objetos PQRSHistorico
-            registros = [PQRSHistorico.from_dict(row.to_dict()) for _, row in resultado.iterrows()]
+            # Cada backend filtra, ordena y recorta después del cursor; aquí solo se pagina.
+            # El cursor se valida antes de aplicarlo y otra vez con la versión efectivamente consultada
+            verificar_cursor(cursor, consulta, self.pqrs_repository.snapshot_version)
+            resultado = self.pqrs_repository.consulta_avanzada(
+                filtros, self.FILTROS_CATEGORICOS,
+                despues_de=(cursor.clave, cursor.fila) if cursor is not None else None,
+                limit=tamano + 1 if tamano > 0 else 0,
+                columnas_leidas=columnas_de_campos(campos) + list(self.COLUMNAS_RESUMEN) if campos else None
+            )
+            verificar_cursor(cursor, consulta, resultado.version)
+            pagina = paginar(resultado.filas, tamano, total=resultado.total, consulta=consulta, version=resultado.version)
             
             return {
                 "success": True,
-                "total_resultados": len(registros),
+                "total_resultados": len(pagina.filas),
                 "filtros_aplicados": filtros,
-                "datos": [reg.to_dict() for reg in registros],
-                "resumen": self._generar_resumen_filtrado(resultado)
+                "datos": pagina.filas.proyectar(campos),
+                "paginacion": pagina.to_dict(),
+                "resumen": self._generar_resumen_filtrado(resultado.frame.head(len(pagina.filas)))
             }
             
+        except ValueError as e:
+            logger.warning(f"Paginación inválida en consulta avanzada: {e}")
+            return self._error_paginacion("consulta_avanzada", e)
         except Exception as e:
             logger.error(f"Error en consulta avanzada: {e}")
             return {
@@ -206,26 +244,11 @@ class HistoricoQueryService:
             }
     
     def obtener_sugerencias_busqueda(self, texto: str) -> List[str]:
-        """Obtiene sugerencias de búsqueda basadas en el texto ingresado"""
+        """Obtiene sugerencias de búsqueda (autocompletado por prefijo, ordenado por frecuencia)"""
         try:
-            df = self.pqrs_repository._load_historico()
-            
-            # Buscar en múltiples columnas
-            columnas_busqueda = ['texto', 'nombre', 'clasificacion', 'unidad', 'barrio']
-            sugerencias = set()
-            
-            for columna in columnas_busqueda:
-                if columna in df.columns:
-                    # Filtrar valores que contengan el texto
-                    valores = df[columna].dropna().astype(str)
-                    coincidencias = valores[valores.str.contains(texto, case=False, na=False)]
-                    
-                    # Agregar hasta 5 sugerencias por columna
-                    sugerencias.update(coincidencias.head(5).tolist())
-            
-            # Convertir a lista y limitar resultados
-            sugerencias_lista = list(sugerencias)[:20]
-            logger.info(f"Sugerencias generadas para '{texto}': {len(sugerencias_lista)}")
+            # Valores de nombre, clasificación, unidad y barrio más términos frecuentes del texto
+            sugerencias_lista = self.pqrs_repository.get_completion_index().suggest(texto, 20)
+            logger.debug(f"Sugerencias generadas para '{texto}': {len(sugerencias_lista)}")
             
             return sugerencias_lista
             
@@ -236,16 +259,18 @@ class HistoricoQueryService:
     def consultar_estadisticas(self) -> Dict[str, Any]:
         """Consulta estadísticas generales del histórico"""
         try:
-            df = self.pqrs_repository._load_historico()
+            # Agregados materializados una vez por snapshot del histórico
+            agregados = self.pqrs_repository.get_aggregates()
             
             estadisticas = {
-                "total_pqrs": len(df),
-                "por_clasificacion": df['clasificacion'].value_counts().to_dict(),
-                "por_estado": df['estado'].value_counts().to_dict(),
-                "por_unidad": df['unidad'].value_counts().head(10).to_dict(),
-                "por_barrio": df['barrio'].value_counts().head(10).to_dict(),
-                "fecha_mas_antigua": df['fecha_radicacion'].min() if 'fecha_radicacion' in df.columns else None,
-                "fecha_mas_reciente": df['fecha_radicacion'].max() if 'fecha_radicacion' in df.columns else None
+                "total_pqrs": agregados.total_registros,
+                "por_clasificacion": agregados.por('clasificacion'),
+                "por_estado": agregados.por('estado'),
+                "por_unidad": agregados.por('unidad', 10),
+                "por_barrio": agregados.por('barrio', 10),
+                "por_mes": dict(agregados.por_mes),
+                "fecha_mas_antigua": agregados.fecha_minima,
+                "fecha_mas_reciente": agregados.fecha_maxima
             }
             
             return {
@@ -276,7 +301,7 @@ class HistoricoQueryService:
                 "filtros_disponibles": [
                     "texto", "radicado", "nombre", "fecha_inicio", "fecha_fin",
                     "clasificacion", "estado", "unidad", "barrio", "limit",
-                    "ordenar_por", "orden"
+                    "ordenar_por", "orden", "tamano_pagina", "cursor", "fields"
                 ]
             },
             "estadisticas": {
@@ -291,8 +316,13 @@ class HistoricoQueryService:
             "mensaje": "Información de ayuda disponible"
         }
     
-    def consulta_inteligente(self, consulta: str) -> Dict[str, Any]:
-        """Consulta inteligente que determina automáticamente el tipo de búsqueda"""
+    def consulta_inteligente(self, consulta: str, fields=None) -> Dict[str, Any]:
+        """Consulta inteligente que determina automáticamente el tipo de búsqueda (``fields`` limita los campos)"""
+        return self._consultar_con_cache('inteligente', [str(consulta).lower(), fields],
+                                         lambda: self._consulta_inteligente(consulta, fields))
+    
+    def _consulta_inteligente(self, consulta: str, fields=None) -> Dict[str, Any]:
+        """Ejecuta la consulta inteligente sin pasar por la caché"""
         try:
             consulta_lower = consulta.lower().strip()
             
@@ -303,13 +333,13 @@ class HistoricoQueryService:
                 return self.obtener_ayuda_consultas()
             elif consulta_lower.isdigit() or consulta_lower.replace('-', '').isdigit():
                 # Probablemente es un radicado
-                return self.consultar_por_radicado(consulta_lower)
+                return self.consultar_por_radicado(consulta_lower, fields=fields)
             elif len(consulta_lower) <= 50:
                 # Probablemente es un nombre
-                return self.buscar_por_nombre(consulta_lower)
+                return self.buscar_por_nombre(consulta_lower, fields=fields)
             else:
                 # Probablemente es una descripción o texto
-                return self.buscar_por_texto(consulta_lower)
+                return self.buscar_por_texto(consulta_lower, fields=fields)
                 
         except Exception as e:
             logger.error(f"Error en consulta inteligente: {e}")
@@ -319,69 +349,75 @@ class HistoricoQueryService:
                 "mensaje": "Error al procesar consulta inteligente"
             }
     
-    # Métodos privados para filtros avanzados
-    def _filtrar_por_texto(self, df, texto: str):
-        """Filtra por texto en múltiples columnas"""
-        texto_lower = texto.lower()
-        mascara = df.astype(str).apply(lambda x: x.str.contains(texto_lower, case=False, na=False)).any(axis=1)
-        return df[mascara]
+    def metricas_cache(self) -> Dict[str, Any]:
+        """Contadores de la caché de resultados de consultas"""
+        return self.cache.stats()
     
-    def _filtrar_por_radicado(self, df, radicado: str):
-        """Filtra por número de radicado"""
-        return df[df['radicado'].astype(str).str.contains(radicado, case=False, na=False)]
-    
-    def _filtrar_por_nombre(self, df, nombre: str):
-        """Filtra por nombre del solicitante"""
-        return df[df['nombre'].astype(str).str.contains(nombre, case=False, na=False)]
-    
-    def _filtrar_por_fecha(self, df, fecha_inicio: str, fecha_fin: str = None):
-        """Filtra por rango de fechas"""
-        try:
-            fecha_inicio = pd.to_datetime(fecha_inicio)
-            if fecha_fin:
-                fecha_fin = pd.to_datetime(fecha_fin)
-                return df[(df['fecha_radicacion'] >= fecha_inicio) & (df['fecha_radicacion'] <= fecha_fin)]
-            else:
-                return df[df['fecha_radicacion'] >= fecha_inicio]
-        except:
-            return df
-    
-    def _filtrar_por_clasificacion(self, df, clasificacion: str):
-        """Filtra por clasificación de PQRS"""
-        return df[df['clasificacion'].astype(str).str.contains(clasificacion, case=False, na=False)]
+    def _consultar_con_cache(self, tipo: str, parametros: Any, calcular) -> Dict[str, Any]:
+        """
+        Resultado de la consulta desde la caché o calculado y guardado.
+        
+        La llave incluye la versión del snapshot: solo se guarda si la versión
+        no cambió mientras se calculaba, y los errores nunca se guardan.
+        """
+        clave = normalizar_consulta(tipo, parametros)
+        version = self.pqrs_repository.snapshot_version
+        resultado = self.cache.get(version, clave)
+        if resultado is not None:
+            return resultado
+        
+        resultado = calcular()
+        if "error" not in resultado and version is not None and version == self.pqrs_repository.snapshot_version:
+            self.cache.put(version, clave, resultado)
+        return resultado
     
-    def _filtrar_por_estado(self, df, estado: str):
-        """Filtra por estado de la PQRS"""
-        return df[df['estado'].astype(str).str.contains(estado, case=False, na=False)]
+    def _tamano_pagina(self, tamano_pagina: Optional[int]) -> int:
+        """Tamaño de página pedido, acotado entre 1 y el máximo configurado"""
+        if tamano_pagina is None:
+            return config.HISTORICO_TAMANO_PAGINA
+        return max(1, min(int(tamano_pagina), config.HISTORICO_TAMANO_PAGINA_MAX))
     
-    def _filtrar_por_unidad(self, df, unidad: str):
-        """Filtra por unidad responsable"""
-        return df[df['unidad'].astype(str).str.contains(unidad, case=False, na=False)]
+    def _paginar_busqueda(self, resultados, tamano_pagina: Optional[int], cursor: Optional[str],
+                          tipo: str, termino: str) -> PaginaHistorico:
+        """Página de una búsqueda por texto o nombre a partir del cursor del cliente"""
+        return paginar(
+            resultados,
+            self._tamano_pagina(tamano_pagina),
+            CursorHistorico.decode(cursor) if cursor else None,
+            consulta=huella_consulta(tipo, termino),
+            version=self.pqrs_repository.snapshot_version
+        )
     
-    def _filtrar_por_barrio(self, df, barrio: str):
-        """Filtra por barrio o sector"""
-        return df[df['barrio'].astype(str).str.contains(barrio, case=False, na=False)]
+    def _error_paginacion(self, tipo_consulta: str, error: Exception) -> Dict[str, Any]:
+        """Respuesta para un cursor, tamaño de página o proyección (``fields``) inválidos"""
+        if isinstance(error, CamposInvalidosError):
+            mensaje = "Campos no válidos en 'fields'. Consulta /api/historico/filtros-disponibles para ver los campos."
+        else:
+            mensaje = ("Cursor de paginación inválido, de otra consulta o de una versión anterior del histórico. "
+                       "Repite la búsqueda sin cursor.")
+        return {
+            "success": False,
+            "tipo_consulta": tipo_consulta,
+            "error": str(error),
+            "mensaje": mensaje
+        }
     
-    def _ordenar_resultados(self, df, campo: str, orden: str = 'asc'):
-        """Ordena los resultados por un campo específico"""
-        try:
-            if campo in df.columns:
-                if orden.lower() == 'desc':
-                    return df.sort_values(by=campo, ascending=False)
-                else:
-                    return df.sort_values(by=campo, ascending=True)
-            return df
-        except:
-            return df
+    def _conteo_valores(self, serie, limite: int = None) -> Dict[str, int]:
+        """Conteo por valor omitiendo categorías sin registros en el subconjunto"""
+        conteos = serie.value_counts()
+        conteos = conteos[conteos > 0]
+        if limite:
+            conteos = conteos.head(limite)
+        return conteos.to_dict()
     
     def _generar_resumen_filtrado(self, df) -> Dict[str, Any]:
         """Genera un resumen de los resultados filtrados"""
         try:
             return {
                 "total_filtrado": len(df),
-                "clasificaciones": df['clasificacion'].value_counts().head(5).to_dict(),
-                "estados": df['estado'].value_counts().head(5).to_dict(),
-                "unidades": df['unidad'].value_counts().head(5).to_dict()
+                "clasificaciones": self._conteo_valores(df['clasificacion'], 5),
+                "estados": self._conteo_valores(df['estado_pqrs'], 5),
+                "unidades": self._conteo_valores(df['unidad'], 5)
             }
         except:
             return {"total_filtrado": len(df)}
@@ -8,31 +8,43 @@ from src.services.audio_service import AudioService, AudioServiceFactory
 from src.services.pqrs_classifier_service import PQRSClassifierService
 from src.services.response_generator_service import ResponseGeneratorService
 from src.services.historico_query_service import HistoricoQueryService
-from src.repositories.pqrs_repository import PQRSRepository, PromptRepository
+from src.repositories.pqrs_repository import HistoricoRepository, PromptRepository
+from src.repositories.repository_factory import PQRSRepositoryFactory
 
 class PQRSOrchestratorService:
     """Servicio orquestador principal para el procesamiento de PQRS"""
     
-    def __init__(self, openai_api_key: str, base_url: Optional[str] = None):
-        """Inicializa el orquestador de PQRS"""
+    def __init__(self, openai_api_key: str, base_url: Optional[str] = None,
+                 openai_client: Optional[OpenAI] = None,
+                 pqrs_repository: Optional[HistoricoRepository] = None,
+                 prompt_repository: Optional[PromptRepository] = None,
+                 audio_service: Optional[AudioService] = None,
+                 historico_service: Optional[HistoricoQueryService] = None):
+        """
+        Inicializa el orquestador de PQRS
+        
+        Los clientes, repositorios y servicios que se reciban se reutilizan
+        (ver ServiceContainer); los que falten se crean aquí.
+        """
         try:
             # Validar configuración
             config.validate_config()
             
             # Inicializar cliente OpenAI
-            self.openai_client = OpenAI(
+            self.openai_client = openai_client or OpenAI(
                 base_url=base_url or config.OPENAI_BASE_URL,
                 api_key=openai_api_key
             )
             
             # Inicializar repositorios
-            self.pqrs_repository = PQRSRepository()
-            self.prompt_repository = PromptRepository()
+            self.pqrs_repository = pqrs_repository if pqrs_repository is not None else PQRSRepositoryFactory.create()
+            self.prompt_repository = prompt_repository if prompt_repository is not None else PromptRepository()
             
             # Inicializar servicios
-            self.audio_service = AudioServiceFactory.create_openai_service(
+            self.audio_service = audio_service or AudioServiceFactory.create_openai_service(
                 openai_api_key, 
-                config.WHISPER_MODEL
+                config.WHISPER_MODEL,
+                self.openai_client
             )
             self.classifier_service = PQRSClassifierService(
                 self.openai_client, 
@@ -43,7 +55,7 @@ class PQRSOrchestratorService:
                 self.prompt_repository, 
                 self.pqrs_repository
             )
-            self.historico_service = HistoricoQueryService(self.pqrs_repository)
+            self.historico_service = historico_service or HistoricoQueryService(self.pqrs_repository)
             
             # Solo log esencial
             logger.info("🚀 Sistema PQRS inicializado correctamente")
@@ -526,6 +538,9 @@ class PQRSOrchestratorService:
     def get_system_status(self) -> Dict[str, Any]:
         """Obtiene el estado del sistema"""
         try:
+            # Registros del histórico según el backend configurado (0 si aún no se ha cargado)
+            repositorio = self.pqrs_repository
+            registros = repositorio.get_aggregates().total_registros if repositorio.snapshot_version is not None else 0
             status = {
                 "audio_service": {
                     "strategy": type(self.audio_service.strategy).__name__,
@@ -539,9 +554,14 @@ class PQRSOrchestratorService:
                     "status": "active"
                 },
                 "repositories": {
-                    "pqrs_cache_size": len(self.pqrs_repository._historico_df) if self.pqrs_repository._historico_df is not None else 0,
+                    "backend": self.pqrs_repository.BACKEND,
+                    "historico_version": self.pqrs_repository.snapshot_version,
+                    "pqrs_cache_size": registros,
                     "prompts_cache_size": len(self.prompt_repository._prompts_cache),
                     "plantillas_cache_size": len(self.prompt_repository._plantillas_cache)
+                },
+                "historico_service": {
+                    "cache_consultas": self.historico_service.metricas_cache()
                 }
             }
             return status
@@ -4,12 +4,12 @@ from openai import OpenAI
 from src.utils.logger import logger
 from src.config.config import config
 from src.models.pqrs_model import PQRSData, PQRSHistorico
-from src.repositories.pqrs_repository import PromptRepository, PQRSRepository
+from src.repositories.pqrs_repository import PromptRepository, HistoricoRepository
 
 class ResponseGeneratorService:
     """Servicio especializado en generación de respuestas para PQRS"""
     
-    def __init__(self, openai_client: OpenAI, prompt_repository: PromptRepository, pqrs_repository: PQRSRepository):
+    def __init__(self, openai_client: OpenAI, prompt_repository: PromptRepository, pqrs_repository: HistoricoRepository):
         """Inicializa el servicio de generación de respuestas"""
         self.openai_client = openai_client
         self.prompt_repository = prompt_repository
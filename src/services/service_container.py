@@ -0,0 +1,112 @@
+"""
+Contenedor de servicios compartidos del proceso
+
+Construye bajo demanda, una sola vez por proceso, el cliente OpenAI, los
+repositorios y los servicios de SIF-GPT, y entrega las mismas instancias a
+app.py y a todos los blueprints. Así cada worker mantiene un único
+histórico en memoria, un único cliente OpenAI y una sola caché de prompts
+y de consultas.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from openai import OpenAI
+from src.config.config import config
+from src.repositories.pqrs_repository import HistoricoRepository, PromptRepository
+from src.repositories.repository_factory import PQRSRepositoryFactory
+from src.services.audio_service import AudioService, AudioServiceFactory
+from src.services.historico_query_service import HistoricoQueryService
+from src.services.pqrs_orchestrator_service import PQRSOrchestratorService
+from src.services.warmup_service import WarmupService
+from src.utils.logger import logger
+
+
+class ServiceContainer:
+    """Registro perezoso de las instancias compartidas por proceso"""
+
+    def __init__(self, openai_api_key: Optional[str] = None):
+        """
+        Args:
+            openai_api_key: API key de OpenAI (por defecto la de la configuración)
+        """
+        self.openai_api_key = openai_api_key or config.OPENAI_API_KEY or \
+            os.environ.get('OPENAI_API_KEY', 'test-key-for-development')
+        self._instancias: Dict[str, Any] = {}
+        self._errores: Dict[str, str] = {}
+        # Reentrante: construir un servicio puede pedir otros del contenedor
+        self._lock = threading.RLock()
+
+    def _obtener(self, nombre: str, fabrica: Callable[[], Any]) -> Any:
+        """Instancia registrada con ese nombre, construyéndola la primera vez"""
+        if nombre in self._instancias:
+            return self._instancias[nombre]
+        with self._lock:
+            if nombre not in self._instancias:
+                self._instancias[nombre] = fabrica()
+                logger.debug(f"Servicio compartido creado: {nombre}")
+            return self._instancias[nombre]
+
+    @property
+    def openai_client(self) -> OpenAI:
+        return self._obtener('openai_client', lambda: OpenAI(base_url=config.OPENAI_BASE_URL,
+                                                              api_key=self.openai_api_key))
+
+    @property
+    def pqrs_repository(self) -> HistoricoRepository:
+        return self._obtener('pqrs_repository', PQRSRepositoryFactory.create)
+
+    @property
+    def prompt_repository(self) -> PromptRepository:
+        return self._obtener('prompt_repository', PromptRepository)
+
+    @property
+    def historico_service(self) -> HistoricoQueryService:
+        return self._obtener('historico_service', lambda: HistoricoQueryService(self.pqrs_repository))
+
+    @property
+    def audio_service(self) -> AudioService:
+        return self._obtener('audio_service', lambda: AudioServiceFactory.create_openai_service(
+            self.openai_api_key, config.WHISPER_MODEL, self.openai_client))
+
+    @property
+    def orchestrator(self) -> Optional[PQRSOrchestratorService]:
+        """Orquestador de PQRS, o None si no se pudo inicializar (el error se registra una sola vez)"""
+        return self._obtener('orchestrator', self._crear_orquestador)
+
+    @property
+    def warmup(self) -> WarmupService:
+        """Precarga en segundo plano del histórico (con sus índices) y de los prompts"""
+        return self._obtener('warmup', lambda: WarmupService({
+            'historico': lambda: self.pqrs_repository.warm(config.WARMUP_WORKERS),
+            'prompts': self.prompt_repository.warm
+        }, habilitado=config.WARMUP_ENABLED, reintentos=config.WARMUP_REINTENTOS,
+            espera_reintento=config.WARMUP_ESPERA_REINTENTO))
+
+    def _crear_orquestador(self) -> Optional[PQRSOrchestratorService]:
+        try:
+            return PQRSOrchestratorService(
+                self.openai_api_key,
+                openai_client=self.openai_client,
+                pqrs_repository=self.pqrs_repository,
+                prompt_repository=self.prompt_repository,
+                audio_service=self.audio_service,
+                historico_service=self.historico_service
+            )
+        except Exception as e:
+            logger.warning(f"Orquestador de PQRS no disponible: {e}")
+            self._errores['orchestrator'] = str(e)
+            return None
+
+    def estado(self) -> Dict[str, Any]:
+        """Instancias ya construidas (nombre y clase) y errores de inicialización"""
+        with self._lock:
+            return {
+                "instancias": {nombre: type(instancia).__name__ if instancia is not None else None
+                               for nombre, instancia in self._instancias.items()},
+                "errores": dict(self._errores)
+            }
+
+
+# Contenedor global del proceso
+services = ServiceContainer()
@@ -0,0 +1,147 @@
+"""
+Precarga de los recursos compartidos al arrancar
+
+Carga en segundo plano, fuera del camino de las peticiones, el histórico
+con sus índices y los prompts y plantillas. Las tareas se ejecutan en
+paralelo y cada recurso se carga una sola vez aunque una petición lo pida
+mientras tanto (los repositorios usan carga única por recurso). Una tarea
+que falla se reintenta con espera exponencial; si agota los reintentos,
+/api/ready la vuelve a lanzar en la siguiente consulta, de modo que un
+error transitorio (p. ej. el Excel aún copiándose) no deja al worker fuera
+de servicio hasta reiniciarlo. El estado alimenta /api/ready, para que el
+balanceador no envíe tráfico a un worker que todavía no terminó.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from src.utils.logger import logger
+
+
+class WarmupService:
+    """Ejecuta las tareas de precarga en segundo plano, las reintenta y reporta si el proceso está listo"""
+
+    def __init__(self, tareas: Dict[str, Callable[[], Any]], habilitado: bool = True,
+                 reintentos: int = 2, espera_reintento: float = 1.0):
+        """
+        Args:
+            tareas: nombre y función de cada recurso a precargar
+            habilitado: si es False no se precarga nada y el proceso se considera listo
+            reintentos: reintentos de una tarea fallida en la misma ronda
+            espera_reintento: segundos antes del primer reintento (se duplica en cada uno)
+        """
+        self.tareas = dict(tareas)
+        self.habilitado = habilitado
+        self.reintentos = max(0, int(reintentos))
+        self.espera_reintento = max(0.0, float(espera_reintento))
+        self._estado: Dict[str, Dict[str, Any]] = {
+            nombre: {"estado": "pendiente", "segundos": None, "error": None, "intentos": 0} for nombre in self.tareas
+        }
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._terminado = threading.Event()
+        self._inicio: Optional[float] = None
+        self._fin: Optional[float] = None
+
+    def start(self) -> bool:
+        """Inicia la precarga en un hilo de fondo (solo la primera vez)"""
+        if not self.habilitado:
+            return False
+        with self._lock:
+            if self._hilo is not None:
+                return False
+            self._lanzar(list(self.tareas))
+        return True
+
+    def reintentar_fallidas(self) -> bool:
+        """Vuelve a lanzar en segundo plano las tareas con error, si no hay una ronda en curso"""
+        if not self.habilitado:
+            return False
+        with self._lock:
+            if self._hilo is None or not self._terminado.is_set():
+                return False
+            fallidas = [nombre for nombre, tarea in self._estado.items() if tarea["estado"] == "error"]
+            if not fallidas:
+                return False
+            logger.info(f"Reintentando la precarga: {', '.join(fallidas)}")
+            self._lanzar(fallidas)
+        return True
+
+    def _lanzar(self, nombres: List[str]):
+        """Ronda de precarga de las tareas indicadas en un hilo de fondo (se llama con el lock tomado)"""
+        self._terminado.clear()
+        self._fin = None
+        self._hilo = threading.Thread(target=self.run, args=(nombres,), name='warmup', daemon=True)
+        self._hilo.start()
+
+    def run(self, nombres: Optional[List[str]] = None):
+        """Ejecuta en paralelo las tareas indicadas (todas por defecto) y espera a que terminen"""
+        nombres = list(self.tareas) if nombres is None else nombres
+        if self._inicio is None:
+            self._inicio = time.monotonic()
+        logger.info(f"Precarga iniciada: {', '.join(nombres)}")
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(nombres)), thread_name_prefix='warmup') as executor:
+                for nombre in nombres:
+                    executor.submit(self._ejecutar, nombre, self.tareas[nombre])
+        finally:
+            self._fin = time.monotonic()
+            self._terminado.set()
+        if self.listo:
+            logger.info(f"Precarga completada en {self._fin - self._inicio:.2f}s")
+        else:
+            logger.error("Precarga terminada con errores: el proceso no se reportará listo")
+
+    def _ejecutar(self, nombre: str, tarea: Callable[[], Any]):
+        """Ejecuta una tarea con reintentos y espera exponencial entre ellos"""
+        inicio = time.monotonic()
+        for reintento in range(self.reintentos + 1):
+            if reintento:
+                espera = self.espera_reintento * 2 ** (reintento - 1)
+                logger.warning(f"Reintento {reintento} de la precarga de {nombre} en {espera:.1f}s")
+                time.sleep(espera)
+            with self._lock:
+                intentos = self._estado[nombre]["intentos"] + 1
+            self._actualizar(nombre, estado="cargando", intentos=intentos)
+            try:
+                tarea()
+                self._actualizar(nombre, estado="listo", segundos=round(time.monotonic() - inicio, 3), error=None)
+                return
+            except Exception as e:
+                logger.error(f"Error en la precarga de {nombre} (intento {intentos}): {e}")
+                final = reintento == self.reintentos
+                self._actualizar(nombre, estado="error" if final else "reintentando",
+                                 segundos=round(time.monotonic() - inicio, 3), error=str(e))
+
+    def _actualizar(self, nombre: str, **valores):
+        with self._lock:
+            self._estado[nombre] = dict(self._estado[nombre], **valores)
+
+    @property
+    def listo(self) -> bool:
+        """True cuando la precarga terminó sin errores (o si está deshabilitada)"""
+        if not self.habilitado:
+            return True
+        with self._lock:
+            return self._terminado.is_set() and all(t["estado"] == "listo" for t in self._estado.values())
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine la precarga; devuelve ``listo``"""
+        if self.habilitado:
+            self._terminado.wait(timeout)
+        return self.listo
+
+    def estado(self) -> Dict[str, Any]:
+        """Estado general y por tarea de la precarga"""
+        with self._lock:
+            tareas = {nombre: dict(valores) for nombre, valores in self._estado.items()}
+        fin = self._fin if self._fin is not None else time.monotonic()
+        return {
+            "listo": self.listo,
+            "habilitado": self.habilitado,
+            "iniciado": self._inicio is not None,
+            "terminado": self._terminado.is_set(),
+            "segundos": round(fin - self._inicio, 3) if self._inicio is not None else None,
+            "tareas": tareas
+        }
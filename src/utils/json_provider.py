@@ -0,0 +1,56 @@
+"""
+Serialización JSON de las respuestas de la API
+
+Los servicios del histórico devuelven sus resultados como ``HistoricoRows``
+(posiciones de fila sobre el snapshot). Este proveedor los escribe con
+``HistoricoRows.to_json`` en una pasada vectorizada y los inserta en el resto
+de la respuesta, que se serializa como siempre; el JSON resultante es el
+mismo que se obtendría con la lista de diccionarios de ``to_dicts``.
+"""
+
+import json
+import uuid
+from typing import Any, Dict
+from flask.json.provider import DefaultJSONProvider
+from src.models.historico_rows import HistoricoRows
+
+
+class HistoricoJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask con serialización por lotes de ``HistoricoRows``"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """Serialización de respaldo (p. ej. con indentación en modo debug)"""
+        if isinstance(o, HistoricoRows):
+            return o.to_dicts()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serializa ``obj``; los ``HistoricoRows`` anidados se escriben con ``to_json``"""
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if kwargs.get("indent") is not None or kwargs.get("cls") is not None:
+            return json.dumps(obj, **kwargs)
+
+        fragmentos: Dict[str, str] = {}
+        prefijo = f"historico-{uuid.uuid4().hex}-"
+        separators = kwargs.get("separators") or (', ', ': ')
+
+        def reemplazar(valor: Any) -> Any:
+            if isinstance(valor, HistoricoRows):
+                marca = f"{prefijo}{len(fragmentos)}"
+                fragmentos[marca] = valor.to_json(sort_keys=kwargs["sort_keys"],
+                                                  ensure_ascii=kwargs["ensure_ascii"],
+                                                  separators=separators)
+                return marca
+            if isinstance(valor, dict):
+                return {clave: reemplazar(v) for clave, v in valor.items()}
+            if isinstance(valor, (list, tuple)):
+                return [reemplazar(v) for v in valor]
+            return valor
+
+        texto = json.dumps(reemplazar(obj), **kwargs)
+        for marca, fragmento in fragmentos.items():
+            texto = texto.replace(f'"{marca}"', fragmento, 1)
+        return texto
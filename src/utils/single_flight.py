@@ -0,0 +1,50 @@
+"""
+Carga única de recursos compartidos entre hilos
+
+Cuando varios hilos piden a la vez un recurso que aún no está cargado, solo
+uno ejecuta la carga y los demás esperan su resultado. Cada clave tiene su
+propio lock, de modo que recursos distintos pueden cargarse en paralelo.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Marca de clave sin resultado guardado (None es un resultado válido)
+_FALTA = object()
+
+
+class SingleFlight:
+    """Ejecuta una sola vez por clave la carga de un recurso y guarda el resultado"""
+
+    def __init__(self, cache: Optional[Dict[Hashable, Any]] = None):
+        """
+        Args:
+            cache: diccionario donde se guardan los resultados (uno nuevo si no se indica)
+        """
+        self.cache: Dict[Hashable, Any] = {} if cache is None else cache
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_de(self, clave: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(clave)
+            if lock is None:
+                lock = self._locks[clave] = threading.Lock()
+            return lock
+
+    def do(self, clave: Hashable, cargar: Callable[[], Any]) -> Any:
+        """
+        Resultado guardado para la clave, cargándolo si falta.
+
+        Un resultado ``None`` también se guarda. Si la carga falla la excepción
+        llega a quien la ejecutó y no se guarda nada: la siguiente petición
+        vuelve a intentarlo.
+        """
+        valor = self.cache.get(clave, _FALTA)
+        if valor is _FALTA:
+            with self._lock_de(clave):
+                valor = self.cache.get(clave, _FALTA)
+                if valor is _FALTA:
+                    valor = cargar()
+                    self.cache[clave] = valor
+        return valor
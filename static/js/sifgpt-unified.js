@@ -35,6 +35,10 @@ const API_ENDPOINTS = {
     }
 };
 
+// Campos que muestran las tablas de resultados del histórico (proyección 'fields' de la API)
+const CAMPOS_LISTA_HISTORICO = ['numero_radicado', 'nombre', 'fecha_radicacion', 'estado_pqrs'];
+const CAMPOS_LISTA_AVANZADA = ['numero_radicado', 'nombre', 'clasificacion', 'fecha_radicacion', 'estado_pqrs', 'texto_pqrs'];
+
 // Inicialización cuando se carga la página
 document.addEventListener('DOMContentLoaded', function() {
     console.log('🚀 SIF-GPT iniciando...');
@@ -497,10 +501,10 @@ function buscarHistorico() {
     
     if (texto) {
         endpoint = API_ENDPOINTS.historico.buscarTexto;
-        data = { texto: texto };
+        data = { texto: texto, fields: CAMPOS_LISTA_HISTORICO };
     } else if (nombre) {
         endpoint = API_ENDPOINTS.historico.buscarNombre;
-        data = { nombre: nombre };
+        data = { nombre: nombre, fields: CAMPOS_LISTA_HISTORICO };
     }
     
     axios.post(endpoint, data)
@@ -583,7 +587,8 @@ function busquedaAvanzada() {
         texto: texto,
         limit: parseInt(limit),
         ordenar_por: ordenar,
-        orden: 'desc'
+        orden: 'desc',
+        fields: CAMPOS_LISTA_AVANZADA
     };
     
     axios.post(API_ENDPOINTS.advancedHistorico.consultaAvanzada, filtros)
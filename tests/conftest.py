@@ -0,0 +1,32 @@
+"""Fixtures compartidos: Excel del histórico generado y repositorios de cada backend"""
+
+import pytest
+from tests.historico_datos import BACKENDS, crear_repositorio, escribir_excel, filas_historico
+
+
+@pytest.fixture
+def filas():
+    """Filas del Excel de prueba"""
+    return filas_historico()
+
+
+@pytest.fixture
+def excel_historico(tmp_path, filas):
+    """Excel del histórico escrito en un directorio temporal"""
+    return escribir_excel(tmp_path / 'historico.xlsx', filas)
+
+
+@pytest.fixture
+def nuevo_repositorio(tmp_path, excel_historico):
+    """Fábrica de repositorios sobre el Excel de prueba, cada uno con su propio directorio de artefactos"""
+    def crear(backend: str = 'pandas', nombre: str = None):
+        directorio = tmp_path / (nombre or backend)
+        directorio.mkdir(exist_ok=True)
+        return crear_repositorio(backend, excel_historico, directorio)
+    return crear
+
+
+@pytest.fixture
+def repositorios(nuevo_repositorio):
+    """Un repositorio por backend sobre el mismo Excel"""
+    return {backend: nuevo_repositorio(backend) for backend in BACKENDS}
@@ -0,0 +1,112 @@
+"""
+Datos de prueba del histórico de PQRS
+
+Genera libros de Excel pequeños con los encabezados reales del histórico y
+arma repositorios de cada backend apuntando a ellos, con caché y artefactos
+en un directorio temporal.
+"""
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+import pandas as pd
+from src.repositories.historico_cache import HistoricoSnapshotCache
+from src.repositories.partitioned_pqrs_repository import PartitionedPQRSRepository
+from src.repositories.pqrs_repository import HistoricoRepository, PQRSRepository
+from src.repositories.sqlite_pqrs_repository import SQLitePQRSRepository
+
+BACKENDS = ('pandas', 'sqlite', 'particionado')
+
+NOMBRES = ['Jessica', 'Yesica', 'Juan', 'María', 'José', 'Luis', 'Ana', 'Carlos']
+APELLIDOS = ['González', 'Gonzales', 'Pérez', 'Rodríguez', 'Gómez', 'Restrepo', 'Zapata', 'Vélez']
+ASUNTOS = ['reparación de la vía principal', 'hueco en la calle', 'andén dañado frente a la casa',
+           'solicitud de información sobre obra', 'puente peatonal en mal estado', 'reparacion urgente del pavimento']
+CLASES = ['Solicitud de Interés Particular', 'Trámite', 'Solicitud de Información']
+ESTADOS = ['EVACUADO', 'SIN RESPUESTA', 'SOLICITUD DE PRÓRROGA']
+UNIDADES = ['Unidad de Vías', 'Unidad de Espacio Público', 'Unidad de Puentes']
+BARRIOS = ['Belén', 'Laureles', 'Robledo', 'Manrique']
+
+
+def fila_historico(i: int, fecha: datetime, aleatorio: random.Random) -> Dict[str, Any]:
+    """Fila del Excel con el radicado derivado de la fecha y del consecutivo"""
+    radicado = int(fecha.strftime('%Y%m%d') + f"{i:04d}")
+    nombre, apellido = aleatorio.choice(NOMBRES), aleatorio.choice(APELLIDOS)
+    return {
+        'DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF': radicado,
+        'CONTROL DE RADICADO': radicado,
+        'PRIMERNOMBRE': nombre,
+        'PRIMERAPELLIDO': apellido,
+        'SOLICITANTE': f"{nombre} {apellido}",
+        'FECHA RADICACIÓN': pd.Timestamp(fecha),
+        'ASUNTO DE LA PETICIÓN': f"{aleatorio.choice(ASUNTOS)} en {aleatorio.choice(BARRIOS)}",
+        'SEGUIMIENTO DE LA PQRSD': aleatorio.choice(['', 'se envió cuadrilla', 'en revisión técnica']),
+        'OBSERVACIÓN': aleatorio.choice([None, 'ciudadano insiste', 'urgente']),
+        'CLASE DE SOLICITUD': aleatorio.choice(CLASES),
+        'ESTADO': aleatorio.choice(ESTADOS),
+        'CELULAR 1': aleatorio.choice([3001234567, '300 123 4567', None]),
+        'BARRIO, VEREDA O SECTOR': aleatorio.choice(BARRIOS),
+        'UNIDAD': aleatorio.choice(UNIDADES),
+    }
+
+
+def filas_historico(total: int = 60, semilla: int = 7) -> List[Dict[str, Any]]:
+    """Filas repartidas en varios meses de 2024, reproducibles por semilla"""
+    aleatorio = random.Random(semilla)
+    inicio = datetime(2024, 1, 1)
+    return [fila_historico(i, inicio + timedelta(days=aleatorio.randint(0, 240)), aleatorio) for i in range(total)]
+
+
+def filas_mixtas(total: int = 40) -> List[Dict[str, Any]]:
+    """Filas con columnas de tipos mezclados entre lotes: números y texto, fechas con y sin hora, enteros y decimales"""
+    return [{
+        'CONTROL DE RADICADO': f"2024010{i % 9}{i:04d}",
+        'SOLICITANTE': 'Juan Pérez' if i % 3 else 'María Gonzales',
+        'ASUNTO DE LA PETICIÓN': 'hueco en la vía del puente' if i % 2 else 'reparación de andén',
+        'FECHA RADICACIÓN': datetime(2024, 1, 1 + i % 28),
+        'CELULAR 1': i if i < 20 else f"X{i}",
+        'Valor': i if i < 20 else i + 0.5,
+        'Hora': datetime(2024, 2, 1) if i < 20 else datetime(2024, 2, 1, 10, 30),
+        'OBSERVACIÓN': 'algo 2024-02' if i == 20 else None,
+        'ESTADO': 'EVACUADO' if i % 2 else 'SIN RESPUESTA',
+        'UNIDAD': 'Unidad de Vías',
+        'BARRIO, VEREDA O SECTOR': 'Robledo',
+        'CLASE DE SOLICITUD': 'Trámite',
+    } for i in range(total)]
+
+
+def escribir_excel(path: Path, filas: List[Dict[str, Any]]) -> Path:
+    """Escribe las filas como el Excel del histórico"""
+    pd.DataFrame(filas).to_excel(path, index=False)
+    return path
+
+
+def frame_indices() -> pd.DataFrame:
+    """DataFrame ya normalizado con casos borde para los índices (nulos, radicados repetidos y no numéricos)"""
+    return pd.DataFrame({
+        'numero_radicado': [202401010001, '202401010002', 202402150003, None, 'RAD-7', 202401010001],
+        'nombre': ['Jessica González', 'Yesica Gonzales', 'Juan Pérez', 'María Gómez', 'Ana Vélez', 'Luis Zapata'],
+        'primer_nombre': ['Jessica', 'Yesica', 'Juan', 'María', 'Ana', 'Luis'],
+        'primer_apellido': ['González', 'Gonzales', 'Pérez', 'Gómez', 'Vélez', 'Zapata'],
+        'texto_pqrs': ['reparación de la vía principal', 'hueco en la vía', 'puente peatonal dañado',
+                       'reparacion del puente', 'andén dañado', 'información sobre obra'],
+        'seguimiento': ['', 'se envió cuadrilla', '', 'reparaciones pendientes', '', ''],
+        'fecha_radicacion': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-02-15', None, '2024-03-10', '2024-01-05']),
+        'estado_pqrs': pd.Categorical(['EVACUADO', 'SIN RESPUESTA', 'EVACUADO', 'EN TRÁMITE', 'EVACUADO', None]),
+        'unidad': ['Unidad de Vías', 'Unidad de Vías', 'Unidad de Puentes', 'Unidad de Puentes',
+                   'Unidad de Espacio Público', 'Unidad de Vías'],
+    })
+
+
+def crear_repositorio(backend: str, excel: Path, directorio: Path) -> HistoricoRepository:
+    """Repositorio del backend indicado sobre ``excel``, con sus artefactos en ``directorio`` y sin vigilante"""
+    if backend == 'sqlite':
+        repositorio = SQLitePQRSRepository(directorio / 'historico.sqlite3')
+    elif backend == 'particionado':
+        repositorio = PartitionedPQRSRepository(directorio / 'particiones')
+    else:
+        repositorio = PQRSRepository()
+    repositorio.historico_excel_path = Path(excel)
+    repositorio.snapshot_cache = HistoricoSnapshotCache(directorio / 'cache', True)
+    repositorio.watch_interval = 0
+    return repositorio
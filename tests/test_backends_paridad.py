@@ -0,0 +1,71 @@
+"""Paridad entre backends: las mismas consultas devuelven las mismas filas en el mismo orden"""
+
+import pytest
+from src.services.historico_query_service import HistoricoQueryService
+from tests.historico_datos import BACKENDS, crear_repositorio, escribir_excel, filas_historico, filas_mixtas
+
+CONSULTAS = [
+    ('nombre', termino) for termino in ['gonzales', 'Carlos', 'maria gonzalez', 'yesica', 'ar', 'Pérez', 'zzz']
+] + [
+    ('texto', termino) for termino in ['puente', 'reparacion', 'via', 'hueco en la via', 'zzqqxx', '2024']
+] + [
+    ('avanzada', filtros) for filtros in [
+        {'texto': 'puente'},
+        {'texto': '2024-03'},
+        {'texto': 'via', 'ordenar_por': 'nombre'},
+        {'texto': 'Robledo'},
+        {'texto': '[0-9]{4}'},
+        {'nombre': 'gonz'},
+        {'nombre': 'ar', 'barrio': 'rob'},
+        {'clasificacion': 'inf', 'estado': 'pr'},
+        {'radicado': '202402'},
+        {'radicado': 'abc'},
+        {'fecha_inicio': '2024-02-01', 'fecha_fin': '2024-05-31', 'ordenar_por': 'fecha_radicacion', 'orden': 'desc'},
+        {'unidad': 'v', 'ordenar_por': 'estado_pqrs'},
+        {'texto': '10:30'},
+        {'texto': 'X2'},
+        {'texto': '20.5'},
+        {'texto': '2024-02-01 00'},
+    ]
+]
+
+
+@pytest.fixture(scope='module', params=['generado', 'mixto'])
+def servicios(request, tmp_path_factory):
+    """Un servicio de consultas por backend sobre el mismo Excel"""
+    directorio = tmp_path_factory.mktemp(request.param)
+    filas = filas_historico() if request.param == 'generado' else filas_mixtas()
+    excel = escribir_excel(directorio / 'historico.xlsx', filas)
+    resultado = {}
+    for backend in BACKENDS:
+        (directorio / backend).mkdir()
+        resultado[backend] = HistoricoQueryService(crear_repositorio(backend, excel, directorio / backend))
+    return resultado
+
+
+def _consultar(servicio: HistoricoQueryService, tipo: str, argumento):
+    if tipo == 'nombre':
+        return servicio.buscar_por_nombre(argumento, 1000)
+    if tipo == 'texto':
+        return servicio.buscar_por_texto(argumento, 1000)
+    return servicio.consulta_avanzada(dict(argumento, limit=0))
+
+
+@pytest.mark.parametrize('tipo,argumento', CONSULTAS, ids=lambda valor: str(valor))
+def test_mismos_resultados_en_todos_los_backends(servicios, tipo, argumento):
+    respuestas = {backend: _consultar(servicio, tipo, argumento) for backend, servicio in servicios.items()}
+    esperada = respuestas['pandas']
+    assert 'error' not in esperada, esperada
+
+    for backend, respuesta in respuestas.items():
+        assert respuesta['success'] == esperada['success'], backend
+        assert respuesta['total_resultados'] == esperada['total_resultados'], backend
+        if esperada['success']:
+            assert respuesta['datos'].to_dicts() == esperada['datos'].to_dicts(), backend
+            assert respuesta['paginacion']['total'] == esperada['paginacion']['total'], backend
+
+
+def test_consultas_cubren_resultados_no_vacios(servicios):
+    pandas = servicios['pandas']
+    con_resultados = [c for c in CONSULTAS if _consultar(pandas, *c)['success']]
+    assert len(con_resultados) >= len(CONSULTAS) // 3
@@ -0,0 +1,39 @@
+"""Bitmaps por valor de las columnas categóricas"""
+
+import numpy as np
+import pandas as pd
+from src.indexes.bitmap_index import BitmapIndex
+from tests.historico_datos import frame_indices
+
+
+def test_bitmap_por_patron_y_actualizacion():
+    df = frame_indices()
+    indice = BitmapIndex.from_frame(df, 'estado_pqrs')
+
+    assert np.flatnonzero(indice.unpack(indice.bitmap_for('evacuado'))).tolist() == [0, 2, 4]
+    assert indice.estimate('SIN|TRÁMITE') == 2
+    assert BitmapIndex.test(indice.bitmap_for('evacuado'), np.array([0, 1, 4])).tolist() == [True, False, True]
+
+    # Fila 1 pasa a EVACUADO y se agrega una fila al final
+    serie = pd.Series(pd.Categorical(list(df['estado_pqrs']) + ['SIN RESPUESTA'], categories=df['estado_pqrs'].cat.categories))
+    serie.iloc[1] = 'EVACUADO'
+    actualizado = indice.updated(serie, np.array([1]))
+    reconstruido = BitmapIndex(serie)
+    for patron in ['EVACUADO', 'SIN', 'TRÁMITE']:
+        assert (actualizado.unpack(actualizado.bitmap_for(patron)) ==
+                reconstruido.unpack(reconstruido.bitmap_for(patron))).all()
+        assert actualizado.estimate(patron) == reconstruido.estimate(patron)
+
+
+def test_muchas_categorias_usa_los_codigos():
+    barrios = pd.Series(pd.Categorical([f"Barrio {i % 100:03d}" for i in range(500)] + [None]))
+    indice = BitmapIndex(barrios)
+    assert indice._bitmaps is None
+
+    esperado = barrios.str.contains('Barrio 01', na=False).to_numpy()
+    categorias = indice.match_categories('Barrio 01')
+    assert indice.positions(categorias).tolist() == np.flatnonzero(esperado).tolist()
+    assert indice.estimate('Barrio 01') == esperado.sum()
+    candidatos = np.array([0, 10, 11, 110, 500])
+    assert indice.contains(categorias, candidatos).tolist() == esperado[candidatos].tolist()
+    assert (indice.unpack(indice.bitmap_for('Barrio 01')) == esperado).all()
@@ -0,0 +1,13 @@
+"""Índice de autocompletado por prefijo de palabra"""
+
+from src.indexes.completion_index import CompletionIndex
+from tests.historico_datos import frame_indices
+
+
+def test_sugerencias_por_prefijo_de_palabra():
+    indice = CompletionIndex.from_frame(frame_indices())
+
+    assert 'Yesica Gonzales' in indice.suggest('gonz')
+    assert 'Unidad de Puentes' in indice.suggest('puen')
+    assert indice.suggest('') == []
+    assert indice.suggest('zzz') == []
@@ -0,0 +1,23 @@
+"""Índice ordenado de fechas de radicación"""
+
+import numpy as np
+import pandas as pd
+from src.indexes.date_index import DateIndex
+from tests.historico_datos import frame_indices
+
+
+def test_fechas_rango_orden_y_actualizacion():
+    df = frame_indices()
+    indice = DateIndex.from_frame(df)
+
+    assert indice.range('2024-01-01', '2024-01-31').tolist() == [0, 1, 5]
+    assert indice.count('2024-02-01') == 2
+    assert indice.null_positions.tolist() == [3]
+    assert indice.ordered(descending=True)[0].tolist() == [4, 2, 5, 0, 1]
+    assert indice.min == pd.Timestamp('2024-01-01') and indice.max == pd.Timestamp('2024-03-10')
+
+    fechas = df['fecha_radicacion'].copy()
+    fechas.iloc[3] = pd.Timestamp('2024-01-02')
+    actualizado = indice.updated(fechas, np.array([3]))
+    assert actualizado.ordered()[0].tolist() == DateIndex(fechas).ordered()[0].tolist()
+    assert actualizado.null_positions.tolist() == []
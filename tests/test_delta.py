@@ -0,0 +1,92 @@
+"""Ingesta incremental: el delta publica lo mismo que una reconstrucción completa sin tocar el snapshot anterior"""
+
+import random
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from tests.historico_datos import ESTADOS, crear_repositorio, escribir_excel, fila_historico
+
+
+def _cambiar_fuente(excel, filas):
+    """Actualiza el estado de dos filas y agrega tres al final"""
+    nuevas = [dict(fila) for fila in filas]
+    for i in (2, 10):
+        nuevas[i]['ESTADO'] = next(e for e in ESTADOS if e != nuevas[i]['ESTADO'])
+    aleatorio = random.Random(3)
+    nuevas += [fila_historico(900 + i, datetime(2024, 10, i + 1), aleatorio) for i in range(3)]
+    escribir_excel(excel, nuevas)
+    return nuevas
+
+
+def test_delta_equivale_a_reconstruir(nuevo_repositorio, excel_historico, filas, tmp_path):
+    repositorio = nuevo_repositorio('pandas')
+    repositorio.incremental = True
+    anterior = repositorio.get_snapshot()
+    anterior.warm()
+    for columna in ('estado_pqrs', 'unidad'):
+        anterior.bitmap_index(columna)
+    copia = anterior.df.copy(deep=True)
+
+    _cambiar_fuente(excel_historico, filas)
+    assert repositorio.reload() is True
+    nuevo = repositorio.get_snapshot()
+    assert nuevo.source == 'delta'
+    assert len(nuevo) == len(filas) + 3
+
+    # El snapshot anterior sigue intacto para las peticiones en curso
+    pd.testing.assert_frame_equal(anterior.df, copia)
+    assert anterior.df['estado_pqrs'].iloc[2] == filas[2]['ESTADO']
+
+    (tmp_path / 'completo').mkdir()
+    completo = crear_repositorio('pandas', excel_historico, tmp_path / 'completo').get_snapshot()
+    assert completo.source == 'excel'
+    assert nuevo.rows().to_dicts() == completo.rows().to_dicts()
+
+    # Índices y agregados actualizados con el delta
+    for radicado in completo.df['numero_radicado'].iloc[[0, 2, -1]]:
+        assert nuevo.radicado_index.lookup(radicado).tolist() == completo.radicado_index.lookup(radicado).tolist()
+    assert np.array_equal(nuevo.date_index.ordered(True)[0], completo.date_index.ordered(True)[0])
+    assert nuevo.aggregates.to_dict() == completo.aggregates.to_dict()
+    for estado in ESTADOS:
+        bitmap = nuevo.bitmap_index('estado_pqrs')
+        assert bitmap.estimate(estado) == completo.bitmap_index('estado_pqrs').estimate(estado)
+        assert np.array_equal(bitmap.unpack(bitmap.bitmap_for(estado)),
+                              (completo.df['estado_pqrs'] == estado).to_numpy())
+    assert nuevo.text_index.search('reparacion')[0].tolist() == completo.text_index.search('reparacion')[0].tolist()
+
+
+def test_delta_se_publica_con_los_indices_construidos(nuevo_repositorio, excel_historico, filas, monkeypatch):
+    repositorio = nuevo_repositorio('pandas')
+    repositorio.incremental = True
+    repositorio.get_snapshot().warm()
+    publicados = {}
+    instalar = repositorio._install_snapshot
+
+    def registrar(snapshot):
+        publicados[snapshot.source] = set(snapshot._indexes)
+        instalar(snapshot)
+
+    monkeypatch.setattr(repositorio, '_install_snapshot', registrar)
+    _cambiar_fuente(excel_historico, filas)
+    assert repositorio.reload() is True
+    assert {'texto', 'nombre', 'sugerencias', 'filas', 'trigram:nombre'} <= publicados['delta']
+
+
+def test_registros_eliminados_fuerzan_reconstruccion(nuevo_repositorio, excel_historico, filas):
+    repositorio = nuevo_repositorio('pandas')
+    repositorio.incremental = True
+    repositorio.get_snapshot()
+
+    escribir_excel(excel_historico, filas[1:])
+    assert repositorio.reload() is True
+    nuevo = repositorio.get_snapshot()
+    assert nuevo.source != 'delta'
+    assert len(nuevo) == len(filas) - 1
+
+
+def test_sin_cambios_no_publica_snapshot(nuevo_repositorio):
+    repositorio = nuevo_repositorio('pandas')
+    snapshot = repositorio.get_snapshot()
+
+    assert repositorio.reload() is False
+    assert repositorio.get_snapshot() is snapshot
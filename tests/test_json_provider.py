@@ -0,0 +1,57 @@
+"""Proveedor JSON: los HistoricoRows se serializan igual que su lista de diccionarios"""
+
+import json
+from flask import Flask, jsonify
+from src.utils.json_provider import HistoricoJSONProvider
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+    app.json = HistoricoJSONProvider(app)
+    return app
+
+
+def _respuesta(snapshot):
+    filas = snapshot.rows([3, 0, 7])
+    return {
+        "success": True,
+        "datos": filas,
+        "proyectados": filas.proyectar(['numero_radicado', 'estado_pqrs']),
+        "vacios": snapshot.rows([]),
+        "anidados": [{"filas": snapshot.rows([1])}, "texto con tilde á"],
+    }
+
+
+def _esperado(snapshot, **kwargs) -> str:
+    respuesta = _respuesta(snapshot)
+    for clave in ("datos", "proyectados", "vacios"):
+        respuesta[clave] = respuesta[clave].to_dicts()
+    respuesta["anidados"][0]["filas"] = respuesta["anidados"][0]["filas"].to_dicts()
+    return json.dumps(respuesta, **kwargs)
+
+
+def test_dumps_igual_a_to_dicts(nuevo_repositorio):
+    snapshot = nuevo_repositorio('pandas').get_snapshot()
+    proveedor = _app().json
+
+    assert proveedor.dumps(_respuesta(snapshot)) == _esperado(snapshot, ensure_ascii=True, sort_keys=True)
+    assert proveedor.dumps(_respuesta(snapshot), ensure_ascii=False, sort_keys=False, separators=(',', ':')) == \
+        _esperado(snapshot, ensure_ascii=False, sort_keys=False, separators=(',', ':'))
+    # Con indentación se usa la serialización de respaldo
+    assert proveedor.dumps(_respuesta(snapshot), indent=2) == _esperado(snapshot, ensure_ascii=True, sort_keys=True,
+                                                                          indent=2)
+
+
+def test_jsonify_en_una_ruta(nuevo_repositorio):
+    snapshot = nuevo_repositorio('pandas').get_snapshot()
+    app = _app()
+
+    @app.route('/filas')
+    def filas():
+        return jsonify(_respuesta(snapshot))
+
+    respuesta = app.test_client().get('/filas')
+    assert respuesta.status_code == 200
+    assert respuesta.get_json() == json.loads(_esperado(snapshot))
+    assert [fila['numero_radicado'] for fila in respuesta.get_json()['datos']] == \
+        [str(snapshot.df['numero_radicado'].iloc[i]) for i in (3, 0, 7)]
@@ -0,0 +1,16 @@
+"""Índice difuso y fonético de nombres"""
+
+from src.indexes.name_index import NameIndex
+from tests.historico_datos import frame_indices
+
+
+def test_nombres_tolera_variantes_y_exige_todas_las_palabras():
+    indice = NameIndex.from_frame(frame_indices())
+
+    posiciones, puntajes = indice.search('jessica gonzalez')
+    assert posiciones[0] == 0
+    assert set(posiciones.tolist()) == {0, 1}
+    assert puntajes[0] > puntajes[1]
+
+    assert indice.search('gonz')[0].tolist() == [0, 1]
+    assert indice.search('juan zapata')[0].tolist() == []
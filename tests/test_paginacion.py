@@ -0,0 +1,130 @@
+"""Paginación por cursor: orden estable, validación del cursor y continuidad entre recargas"""
+
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.historico_rows import HistoricoRows
+from src.models.historico_orden import claves_orden, ordenar
+from src.services.historico_paginacion import CursorHistorico, paginar, verificar_cursor
+from src.services.historico_query_service import HistoricoQueryService
+from tests.historico_datos import BACKENDS, escribir_excel, fila_historico
+
+
+def _filas_ordenadas(descendente: bool) -> HistoricoRows:
+    df = pd.DataFrame({
+        'numero_radicado': [str(i) for i in range(8)],
+        'fecha_radicacion': pd.to_datetime(['2024-01-02', None, '2024-01-01', '2024-01-02',
+                                            '2024-01-03', '2024-01-02', None, '2024-01-01']),
+    })
+    posiciones = np.arange(len(df))
+    claves = claves_orden(df['fecha_radicacion'])
+    orden = ordenar(posiciones, claves, descendente)
+    return HistoricoRows.from_frame(df.iloc[orden], ids=posiciones[orden], claves=claves[orden], descendente=descendente)
+
+
+def _paginas(filas: HistoricoRows, tamano: int):
+    cursor, vistos = None, []
+    while True:
+        pagina = paginar(filas, tamano, cursor, consulta='q', version='v1')
+        vistos.extend(pagina.filas.ids.tolist())
+        if pagina.cursor_siguiente is None:
+            return vistos
+        cursor = CursorHistorico.decode(pagina.cursor_siguiente)
+
+
+@pytest.mark.parametrize('descendente', [False, True])
+@pytest.mark.parametrize('tamano', [1, 2, 3, 8])
+def test_paginas_recorren_el_orden_completo_con_empates_y_nulos(descendente, tamano):
+    filas = _filas_ordenadas(descendente)
+
+    assert _paginas(filas, tamano) == filas.ids.tolist()
+    # Empates por id ascendente y nulos al final en ambos sentidos
+    esperado = [4, 0, 3, 5, 2, 7, 1, 6] if descendente else [2, 7, 0, 3, 5, 4, 1, 6]
+    assert filas.ids.tolist() == esperado
+
+
+def test_cursor_codifica_y_decodifica():
+    claves = np.array(['2024-01-02T00:00'], dtype='datetime64[ns]')
+    cursor = CursorHistorico(CursorHistorico.clave_de(claves, 0), 5, 'q', 'v1')
+    copia = CursorHistorico.decode(cursor.encode())
+
+    assert (copia.clave, copia.fila, copia.consulta, copia.version) == (cursor.clave, 5, 'q', 'v1')
+    assert CursorHistorico.clave_de(np.array([np.nan]), 0) is None
+    with pytest.raises(ValueError):
+        CursorHistorico.decode('no-es-un-cursor')
+
+
+def test_cursor_de_otra_consulta_o_version_se_rechaza():
+    cursor = CursorHistorico(None, 3, 'q', 'v1')
+
+    verificar_cursor(cursor, 'q', 'v1')
+    verificar_cursor(None, 'otra', 'v2')
+    with pytest.raises(ValueError, match='otra consulta'):
+        verificar_cursor(cursor, 'otra', 'v1')
+    with pytest.raises(ValueError, match='otra versión'):
+        verificar_cursor(cursor, 'q', 'v2')
+    with pytest.raises(ValueError, match='otra versión'):
+        paginar(_filas_ordenadas(False), 2, cursor, consulta='q', version='v2')
+
+
+def _consultas(servicio: HistoricoQueryService):
+    """Consultas paginadas del servicio: cada una recibe (tamaño, cursor) y devuelve la respuesta"""
+    avanzada = {'texto': 'reparacion', 'ordenar_por': 'fecha_radicacion', 'orden': 'desc'}
+    return {
+        'nombre': lambda tamano, cursor: servicio.buscar_por_nombre('gonzalez', tamano, cursor),
+        'texto': lambda tamano, cursor: servicio.buscar_por_texto('via', tamano, cursor),
+        'avanzada': lambda tamano, cursor: servicio.consulta_avanzada(
+            dict(avanzada, tamano_pagina=tamano, **({'cursor': cursor} if cursor else {}))),
+    }
+
+
+def _radicados(respuesta) -> list:
+    assert respuesta['success'], respuesta
+    return [fila['numero_radicado'] for fila in respuesta['datos'].to_dicts()]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cursor_continua_tras_recarga_sin_cambios(nuevo_repositorio, backend):
+    repositorio = nuevo_repositorio(backend)
+    servicio = HistoricoQueryService(repositorio)
+
+    for nombre, consultar in _consultas(servicio).items():
+        completo = _radicados(consultar(1000, None))
+        assert len(completo) > 3, nombre
+
+        primera = consultar(3, None)
+        cursor = primera['paginacion']['cursor_siguiente']
+        assert cursor is not None
+        assert repositorio.reload() is False
+
+        vistos = _radicados(primera)
+        while cursor:
+            respuesta = consultar(3, cursor)
+            vistos.extend(_radicados(respuesta))
+            assert respuesta['paginacion']['version'] == repositorio.snapshot_version
+            cursor = respuesta['paginacion']['cursor_siguiente']
+        assert vistos == completo, nombre
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cursor_de_version_anterior_se_rechaza_tras_recarga(nuevo_repositorio, excel_historico, filas, backend):
+    repositorio = nuevo_repositorio(backend)
+    servicio = HistoricoQueryService(repositorio)
+    cursores = {nombre: consultar(3, None)['paginacion']['cursor_siguiente']
+                for nombre, consultar in _consultas(servicio).items()}
+    version = repositorio.snapshot_version
+
+    aleatorio = random.Random(1)
+    escribir_excel(excel_historico, filas + [fila_historico(900 + i, pd.Timestamp('2024-09-01'), aleatorio)
+                                             for i in range(3)])
+    assert repositorio.reload() is True
+    assert repositorio.snapshot_version != version
+
+    for nombre, consultar in _consultas(servicio).items():
+        respuesta = consultar(3, cursores[nombre])
+        assert respuesta['success'] is False, nombre
+        assert 'versión' in respuesta['error']
+        # La misma consulta sin cursor vuelve a empezar sobre la versión nueva
+        assert consultar(3, None)['paginacion']['version'] == repositorio.snapshot_version
+
@@ -0,0 +1,62 @@
+"""Histórico particionado por mes: poda por fecha y radicado, y carga bajo demanda"""
+
+import pandas as pd
+from tests.historico_datos import escribir_excel
+
+
+def _meses(filas) -> list:
+    return sorted({fila['FECHA RADICACIÓN'].strftime('%Y-%m') for fila in filas if fila['FECHA RADICACIÓN'] is not None})
+
+
+def test_agregados_sin_abrir_particiones(nuevo_repositorio, filas):
+    repositorio = nuevo_repositorio('particionado')
+
+    agregados = repositorio.get_aggregates()
+    assert agregados.total_registros == len(filas)
+    assert repositorio._particiones.claves == _meses(filas)
+    assert repositorio.particiones_cargadas == []
+
+
+def test_rango_de_fechas_abre_solo_sus_meses(nuevo_repositorio, filas):
+    repositorio = nuevo_repositorio('particionado')
+
+    snapshot = repositorio.get_query_snapshot(pd.Timestamp('2024-03-01'), pd.Timestamp('2024-04-30'))
+    assert repositorio.particiones_cargadas == [('2024-03', '2024-04')]
+    esperados = sorted(str(f['DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF']) for f in filas
+                       if pd.Timestamp('2024-03-01') <= f['FECHA RADICACIÓN'] < pd.Timestamp('2024-05-01'))
+    assert sorted(snapshot.df['numero_radicado'].astype(str)) == esperados
+
+    rango = repositorio.get_historico_by_date_range('2024-03-01', '2024-04-30')
+    assert sorted(fila['numero_radicado'] for fila in rango.to_dicts()) == esperados
+
+
+def test_radicado_y_prefijo_podan_por_rango(nuevo_repositorio, filas):
+    repositorio = nuevo_repositorio('particionado')
+    fila = filas[5]
+    radicado = str(fila['DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF'])
+    mes = fila['FECHA RADICACIÓN'].strftime('%Y-%m')
+
+    registro = repositorio.get_historico_by_radicado(radicado)
+    assert registro is not None and registro.numero_radicado == radicado
+    assert repositorio.particiones_cargadas == [(mes,)]
+
+    particiones = repositorio._particiones
+    assert particiones.podar(prefijo=mes.replace('-', '')) == [mes]
+    assert particiones.podar(radicados=['999']) == []
+    assert particiones.podar(rango_radicados=('202401010000', '202401319999')) == ['2024-01']
+    assert particiones.podar(rango_radicados=('abc', '1')) == []
+
+
+def test_filas_sin_fecha_en_su_particion(nuevo_repositorio, excel_historico, filas):
+    filas[0]['FECHA RADICACIÓN'] = None
+    escribir_excel(excel_historico, filas)
+    repositorio = nuevo_repositorio('particionado')
+
+    repositorio.warm()
+    particiones = repositorio._particiones
+    assert 'sin_fecha' in particiones.claves
+    # Un rango de fechas excluye los registros sin fecha; sin criterios se abren todas
+    assert 'sin_fecha' not in particiones.podar(pd.Timestamp('2024-01-01'))
+    assert len(repositorio.get_all_historico()) == len(filas)
+    assert repositorio.get_snapshot().df['numero_radicado'].astype(str).tolist() == \
+        [str(f['DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF']) for f in filas]
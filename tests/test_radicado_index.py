@@ -0,0 +1,27 @@
+"""Índice de radicados: búsqueda exacta, por prefijo, por rango y extensión con filas nuevas"""
+
+from src.indexes.radicado_index import RadicadoIndex
+from tests.historico_datos import frame_indices
+
+
+def test_radicado_lookup_prefijo_y_rango():
+    indice = RadicadoIndex.from_frame(frame_indices())
+
+    assert indice.lookup('202401010001').tolist() == [0, 5]
+    assert indice.lookup(202401010002).tolist() == [1]
+    assert indice.lookup('RAD-7').tolist() == [4]
+    assert indice.lookup('999').tolist() == []
+    assert indice.prefix('20240101').tolist() == [0, 5, 1]
+    assert sorted(indice.range('202401010002', '202402150003').tolist()) == [1, 2]
+
+
+def test_radicado_extend_equivale_a_reconstruir():
+    df = frame_indices()
+    nuevos = ['202401010002', 'RAD-8', 202312310009]
+    extendido = RadicadoIndex.from_frame(df).extend(nuevos)
+    completo = RadicadoIndex(df['numero_radicado'].tolist() + nuevos)
+
+    for radicado in ['202401010002', 'RAD-8', '202312310009', '202401010001']:
+        assert extendido.lookup(radicado).tolist() == completo.lookup(radicado).tolist()
+    assert extendido.prefix('2024').tolist() == completo.prefix('2024').tolist()
+    assert len(extendido) == len(completo)
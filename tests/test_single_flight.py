@@ -0,0 +1,30 @@
+"""Carga única por clave: los resultados, incluido None, se guardan y los errores no"""
+
+import pytest
+from src.utils.single_flight import SingleFlight
+
+
+def test_guarda_resultados_none():
+    llamadas = []
+    cargas = SingleFlight()
+
+    def cargar():
+        llamadas.append(1)
+        return None
+
+    assert cargas.do('formato', cargar) is None
+    assert cargas.do('formato', cargar) is None
+    assert len(llamadas) == 1
+    assert cargas.cache == {'formato': None}
+
+
+def test_error_no_se_guarda():
+    cargas = SingleFlight()
+
+    def fallar():
+        raise RuntimeError('sin datos')
+
+    with pytest.raises(RuntimeError):
+        cargas.do('indice', fallar)
+    assert 'indice' not in cargas.cache
+    assert cargas.do('indice', lambda: 3) == 3
@@ -0,0 +1,85 @@
+"""Backend SQLite: construcción, reutilización de la base y consultas del repositorio"""
+
+import pytest
+from src.repositories.pqrs_repository import HistoricoRepository, PQRSRepository
+from src.services.historico_paginacion import CursorHistorico
+from src.services.historico_query_service import HistoricoQueryService
+from tests.historico_datos import crear_repositorio, escribir_excel
+
+
+RADICADO = 'DOCUMENTO-CarguedeinformaciónalaplicativoPQRSDdelSIF'
+
+
+def _radicados(filas) -> list:
+    return [fila['numero_radicado'] for fila in filas.to_dicts()]
+
+
+def test_no_expone_dataframe(nuevo_repositorio):
+    sqlite = nuevo_repositorio('sqlite')
+    assert isinstance(sqlite, HistoricoRepository)
+    assert not isinstance(sqlite, PQRSRepository)
+    assert not hasattr(sqlite, 'get_snapshot') and not hasattr(sqlite, 'get_query_snapshot')
+
+
+def test_consulta_avanzada_igual_que_pandas(repositorios):
+    filtros = {'texto': 'reparacion', 'ordenar_por': 'fecha_radicacion', 'orden': 'desc'}
+    categoricos = HistoricoQueryService.FILTROS_CATEGORICOS
+    despues_de = {}
+    for pagina in range(3):
+        resultados = {backend: repositorios[backend].consulta_avanzada(filtros, categoricos, despues_de.get(backend), 4)
+                      for backend in ('sqlite', 'pandas')}
+        sqlite, pandas = resultados['sqlite'], resultados['pandas']
+        assert sqlite.filas.to_dicts() == pandas.filas.to_dicts()
+        assert (sqlite.total, sqlite.version) == (pandas.total, pandas.version)
+        assert sqlite.frame['numero_radicado'].astype(str).tolist() == _radicados(sqlite.filas)
+        for backend, resultado in resultados.items():
+            filas = resultado.filas
+            despues_de[backend] = (CursorHistorico.clave_de(filas.claves, len(filas) - 1), filas.ids[-1])
+
+
+def test_consultas_del_repositorio_igual_que_pandas(repositorios, filas):
+    sqlite, pandas = repositorios['sqlite'], repositorios['pandas']
+    radicado = str(filas[4][RADICADO])
+
+    assert sqlite.snapshot_version is None
+    assert sqlite.get_historico_by_radicado(radicado) == pandas.get_historico_by_radicado(radicado)
+    assert sqlite.snapshot_version == pandas.snapshot_version
+    assert sqlite.get_historico_by_radicado('999') is None
+
+    buscados = [radicado, str(filas[7][RADICADO]), 'no-existe']
+    assert {k: v.to_dict() for k, v in sqlite.get_historico_by_radicados(buscados).items()} == \
+        {k: v.to_dict() for k, v in pandas.get_historico_by_radicados(buscados).items()}
+    assert _radicados(sqlite.get_historico_by_radicado_prefix('202403')) == \
+        _radicados(pandas.get_historico_by_radicado_prefix('202403'))
+    assert _radicados(sqlite.get_historico_by_radicado_range('202402010000', '202404309999')) == \
+        _radicados(pandas.get_historico_by_radicado_range('202402010000', '202404309999'))
+    assert sqlite.get_historico_by_date_range('2024-02-01', '2024-03-15').to_dicts() == \
+        pandas.get_historico_by_date_range('2024-02-01', '2024-03-15').to_dicts()
+    assert sqlite.get_all_historico().to_dicts() == pandas.get_all_historico().to_dicts()
+    assert sqlite.get_columns() == pandas.get_columns()
+    assert sqlite.get_aggregates().to_dict() == pandas.get_aggregates().to_dict()
+    assert sqlite.get_completion_index().suggest('gonz') == pandas.get_completion_index().suggest('gonz')
+
+
+def test_base_vigente_se_reutiliza(nuevo_repositorio, excel_historico, tmp_path, monkeypatch):
+    repositorio = nuevo_repositorio('sqlite')
+    repositorio.warm()
+    version = repositorio.snapshot_version
+
+    otro = crear_repositorio('sqlite', excel_historico, tmp_path / 'sqlite')
+    monkeypatch.setattr(otro, '_build_database', lambda source_key: pytest.fail('la base vigente se reconstruyó'))
+    assert otro.get_aggregates().total_registros == repositorio.get_aggregates().total_registros
+    assert otro.snapshot_version == version
+
+
+def test_recarga_publica_la_base_nueva(nuevo_repositorio, excel_historico, filas):
+    repositorio = nuevo_repositorio('sqlite')
+    repositorio.warm()
+    version = repositorio.snapshot_version
+
+    escribir_excel(excel_historico, filas[:-5])
+    assert repositorio.reload() is True
+    assert repositorio.snapshot_version != version
+    assert repositorio.get_aggregates().total_registros == len(filas) - 5
+    assert repositorio.get_historico_by_radicado(str(filas[-1][RADICADO])) is None
+    assert repositorio.reload() is False
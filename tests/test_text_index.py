@@ -0,0 +1,33 @@
+"""Índice invertido BM25F de los campos de texto"""
+
+import numpy as np
+from src.indexes.text_index import TextIndex
+from tests.historico_datos import frame_indices
+
+
+def test_texto_bm25_exige_todos_los_terminos_y_ordena_por_puntaje():
+    indice = TextIndex.from_frame(frame_indices())
+
+    posiciones, puntajes = indice.search('reparación')
+    # Sin tildes y con la misma raíz en texto y seguimiento
+    assert set(posiciones.tolist()) == {0, 3}
+    assert np.all(np.diff(puntajes) <= 0)
+
+    posiciones, _ = indice.search('puente dañado')
+    assert posiciones.tolist() == [2]
+    assert indice.search('inexistente')[0].tolist() == []
+    assert indice.search('la de')[0].tolist() == []
+
+
+def test_texto_ordena_con_los_puntajes_float32_que_devuelve():
+    indice = TextIndex.from_frame(frame_indices())
+    # Las sumas en float64 difieren, pero coinciden al redondear a float32
+    docs = np.array([0, 1], dtype=np.int32)
+    indice._postings = {
+        'puent': (docs, np.array([1.0, 1.0], dtype=np.float32)),
+        'obr': (docs, np.array([0.0, 2.0 ** -24], dtype=np.float32)),
+    }
+
+    posiciones, puntajes = indice.search('puente obra')
+    assert puntajes[0] == puntajes[1]
+    assert posiciones.tolist() == [0, 1]
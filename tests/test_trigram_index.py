@@ -0,0 +1,14 @@
+"""Índice de trigramas para filtros por subcadena"""
+
+from src.indexes.trigram_index import TrigramIndex
+from tests.historico_datos import frame_indices
+
+
+def test_trigramas_busca_subcadenas_y_regex():
+    indice = TrigramIndex.from_frame(frame_indices(), 'unidad')
+
+    assert indice.search('vías').tolist() == [0, 1, 5]
+    assert indice.search('PUENTES').tolist() == [2, 3]
+    assert indice.search('^Unidad de (V|E)').tolist() == [0, 1, 4, 5]
+    assert indice.search('zzz').tolist() == []
+    assert indice.estimate('vías') >= 3
@@ -0,0 +1,59 @@
+"""Precarga en segundo plano: reintentos con espera y relanzamiento de las tareas fallidas"""
+
+from src.services.warmup_service import WarmupService
+
+
+class _TareaInestable:
+    """Falla las primeras ``fallos`` veces"""
+
+    def __init__(self, fallos: int):
+        self.fallos = fallos
+        self.llamadas = 0
+
+    def __call__(self):
+        self.llamadas += 1
+        if self.llamadas <= self.fallos:
+            raise RuntimeError(f"fallo {self.llamadas}")
+
+
+def test_reintenta_hasta_completar():
+    tarea = _TareaInestable(fallos=2)
+    warmup = WarmupService({'historico': tarea, 'prompts': lambda: None}, reintentos=2, espera_reintento=0)
+
+    assert warmup.start() is True
+    assert warmup.start() is False
+    assert warmup.esperar(5) is True
+    estado = warmup.estado()['tareas']
+    assert estado['historico']['estado'] == 'listo'
+    assert estado['historico']['intentos'] == 3
+    assert estado['historico']['error'] is None
+    assert estado['prompts']['intentos'] == 1
+
+
+def test_fallidas_se_relanzan_solo_al_terminar_la_ronda():
+    tarea = _TareaInestable(fallos=2)
+    warmup = WarmupService({'historico': tarea, 'prompts': lambda: None}, reintentos=1, espera_reintento=0)
+
+    assert warmup.reintentar_fallidas() is False
+    warmup.start()
+    assert warmup.esperar(5) is False
+    estado = warmup.estado()
+    assert estado['terminado'] and not estado['listo']
+    assert estado['tareas']['historico']['estado'] == 'error'
+    assert estado['tareas']['historico']['error'] == 'fallo 2'
+
+    assert warmup.reintentar_fallidas() is True
+    assert warmup.esperar(5) is True
+    assert tarea.llamadas == 3
+    # Solo se relanzó la tarea con error
+    assert warmup.estado()['tareas']['prompts']['intentos'] == 1
+    assert warmup.reintentar_fallidas() is False
+
+
+def test_deshabilitada_queda_lista_sin_ejecutar():
+    tarea = _TareaInestable(fallos=0)
+    warmup = WarmupService({'historico': tarea}, habilitado=False)
+
+    assert warmup.start() is False
+    assert warmup.listo and warmup.esperar(0)
+    assert tarea.llamadas == 0